@@ -0,0 +1,29 @@
+"""add orders strategy/status index
+
+Revision ID: 0004_orders_strategy_status
+Revises: 0003_add_token_expiry
+Create Date: 2024-06-01 00:00:00.000000
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_orders_strategy_status"
+down_revision: str = "0003_add_token_expiry"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_orders_strategy_status",
+        "orders",
+        ["strategy_id", "status"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_orders_strategy_status", table_name="orders")
@@ -0,0 +1,119 @@
+"""partition strategy_executions, telemetry_events and audit_logs by month
+
+Revision ID: 0005_partition_history_tables
+Revises: 0004_orders_strategy_status
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from collections.abc import Sequence
+from datetime import datetime
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_partition_history_tables"
+down_revision: str = "0004_orders_strategy_status"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+# Partisi bulan berjalan + N bulan ke depan; selanjutnya dibuat oleh retention service.
+PREMAKE_MONTHS = 2
+
+FOREIGN_KEYS = {
+    "strategy_executions": {"strategy_id": "strategies.id", "user_id": "users.id"},
+    "telemetry_events": {"user_id": "users.id"},
+    "audit_logs": {"user_id": "users.id"},
+}
+
+PARTITIONED_INDEXES = {
+    "strategy_executions": {
+        "ix_strategy_exec_strategy": "strategy_id, created_at",
+        "ix_strategy_exec_status": "status",
+    },
+    "telemetry_events": {
+        "ix_telemetry_events_event_type": "event_type",
+    },
+    "audit_logs": {
+        "ix_audit_logs_action": "action",
+        "ix_audit_logs_ip": "ip_address",
+    },
+}
+
+PLAIN_INDEXES = {
+    "strategy_executions": {
+        "ix_strategy_exec_strategy": "strategy_id",
+        "ix_strategy_exec_status": "status",
+    },
+    "telemetry_events": {
+        "ix_telemetry_events_event_type": "event_type",
+    },
+    "audit_logs": {
+        "ix_audit_logs_action": "action",
+        "ix_audit_logs_ip": "ip_address",
+    },
+}
+
+
+def _add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def _months(table: str) -> list[datetime]:
+    first = op.get_bind().execute(sa.text(f"SELECT min(created_at) FROM {table}")).scalar()
+    now = datetime.utcnow()
+    month = datetime((first or now).year, (first or now).month, 1)
+    last = _add_months(datetime(now.year, now.month, 1), PREMAKE_MONTHS)
+    months = []
+    while month <= last:
+        months.append(month)
+        month = _add_months(month, 1)
+    return months
+
+
+def _finish(table: str, primary_key: str, indexes: dict[str, str]) -> None:
+    op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY ({primary_key})")
+    for column, target in FOREIGN_KEYS[table].items():
+        ref_table, ref_column = target.split(".")
+        op.execute(
+            f"ALTER TABLE {table} ADD CONSTRAINT {table}_{column}_fkey "
+            f"FOREIGN KEY ({column}) REFERENCES {ref_table} ({ref_column})"
+        )
+    for name, columns in indexes.items():
+        op.execute(f"CREATE INDEX {name} ON {table} ({columns})")
+
+
+def _swap(table: str, staging: str) -> None:
+    # Data disalin sebelum constraint/index dibuat agar salinan tidak membayar biaya index per baris.
+    op.execute(f"INSERT INTO {staging} SELECT * FROM {table}")
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {staging}.id")
+    op.execute(f"DROP TABLE {table}")
+    op.execute(f"ALTER TABLE {staging} RENAME TO {table}")
+
+
+def upgrade() -> None:
+    for table, indexes in PARTITIONED_INDEXES.items():
+        staging = f"{table}_partitioned"
+        op.execute(
+            f"CREATE TABLE {staging} (LIKE {table} INCLUDING DEFAULTS) "
+            "PARTITION BY RANGE (created_at)"
+        )
+        for month in _months(table):
+            op.execute(
+                f"CREATE TABLE {table}_p{month:%Y%m} PARTITION OF {staging} "
+                f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{_add_months(month, 1):%Y-%m-%d}')"
+            )
+        # Penampung baris di luar rentang partisi; seharusnya selalu kosong.
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {staging} DEFAULT")
+        _swap(table, staging)
+        _finish(table, "id, created_at", indexes)
+
+
+def downgrade() -> None:
+    for table, indexes in PLAIN_INDEXES.items():
+        staging = f"{table}_plain"
+        op.execute(f"CREATE TABLE {staging} (LIKE {table} INCLUDING DEFAULTS)")
+        _swap(table, staging)
+        _finish(table, "id", indexes)
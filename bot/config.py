@@ -14,6 +14,13 @@ class BotSettings(BaseSettings):
     user_token_ttl_seconds: int = 86_400
     user_token_refresh_threshold_seconds: int = 3_600
     app_secret_key: str = "change-me-super-secret-32bytes"
+    token_cache_size: int = 10_000
+    token_cache_max_age_seconds: int = 60
+    core_api_retry_attempts: int = 3
+    core_api_hedge_delay_seconds: float = 3.0
+    slow_update_threshold_ms: int = 1_000
+    trace_export_path: str | None = None
+    trace_sample_rate: float = 0.01
 
     class Config:
         env_file = ".env"
@@ -100,6 +100,7 @@ async def cancel_confirm(callback: CallbackQuery) -> None:
             params={"telegram_id": telegram_id_str},
             payload={},
             user_token=token,
+            idempotency_key=f"cancel:{telegram_id_str}:{order_id_str}",
         )
     except Exception as exc:  # noqa: BLE001
         await callback.answer(f"Gagal: {exc}", show_alert=True)
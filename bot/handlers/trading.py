@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import uuid
+
 from aiogram import F, Router
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
@@ -15,7 +17,7 @@ from bot.keyboards import (
     trade_type_keyboard,
     trading_main_keyboard,
 )
-from bot.services.api_client import core_api_client
+from bot.services.api_client import core_api_client, is_upstream_error
 from bot.utils.auth import get_user_token
 from bot.utils.market import get_top_pairs
 from bot.utils.messages import ORDER_SUMMARY_TEMPLATE
@@ -268,7 +270,11 @@ async def _finalize_order(
         amount=amount_label,
         price=f"{price:,.0f} IDR" if price else "Market",
     )
-    await state.update_data(amount=amount_coin, idr_amount=idr_amount)
+    await state.update_data(
+        amount=amount_coin,
+        idr_amount=idr_amount,
+        idempotency_key=uuid.uuid4().hex,
+    )
     await state.set_state(TradeStates.waiting_confirmation)
     await message.answer(summary, reply_markup=confirmation_keyboard())
 
@@ -362,9 +368,20 @@ async def trade_confirm(callback: CallbackQuery, state: FSMContext) -> None:
         await state.clear()
         return
     try:
-        response = await core_api_client.post("/api/orders", payload, user_token=token)
+        response = await core_api_client.post(
+            "/api/orders",
+            payload,
+            user_token=token,
+            idempotency_key=data.get("idempotency_key"),
+        )
     except Exception as exc:  # noqa: BLE001
-        await callback.message.edit_text(f"Gagal mengirim order: {exc}")
+        if is_upstream_error(exc):
+            await callback.message.edit_text(
+                "Indodax tidak merespons; status order belum pasti. "
+                "Cek /orders sebelum mengirim ulang."
+            )
+        else:
+            await callback.message.edit_text(f"Gagal mengirim order: {exc}")
         await callback.answer()
         await state.clear()
         return
@@ -5,13 +5,18 @@ from aiohttp import web
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
-from aiogram.fsm.storage.redis import RedisStorage
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from redis.asyncio import Redis
 
 from bot.config import get_settings
 from bot.handlers import alerts, auth, market, orders, portfolio, start, strategy, trading
 from bot.services.api_client import core_api_client
 from bot.services.token_store import token_store
+from bot.utils.telemetry import (
+    HandlerNameMiddleware,
+    TimedRedisStorage,
+    UpdateLatencyMiddleware,
+)
 
 
 async def main() -> None:
@@ -19,13 +24,16 @@ async def main() -> None:
     logging.basicConfig(level=settings.log_level)
 
     redis = Redis.from_url(str(settings.redis_url))
-    storage = RedisStorage(redis=redis)
+    storage = TimedRedisStorage(redis=redis)
 
     bot = Bot(
         token=settings.telegram_bot_token,
         default=DefaultBotProperties(parse_mode=ParseMode.HTML),
     )
     dp = Dispatcher(storage=storage)
+    dp.update.outer_middleware(UpdateLatencyMiddleware())
+    dp.message.middleware(HandlerNameMiddleware())
+    dp.callback_query.middleware(HandlerNameMiddleware())
 
     dp.include_router(start.router)
     dp.include_router(auth.router)
@@ -54,8 +62,13 @@ async def main() -> None:
         )
         return web.json_response({"success": True})
 
+    async def metrics(_: web.Request) -> web.Response:
+        body = await asyncio.get_running_loop().run_in_executor(None, generate_latest)
+        return web.Response(body=body, headers={"Content-Type": CONTENT_TYPE_LATEST})
+
     app = web.Application()
     app.router.add_post("/internal/notify", notify)
+    app.router.add_get("/metrics", metrics)
     runner = web.AppRunner(app)
     await runner.setup()
     site = web.TCPSite(runner, settings.bot_internal_host, settings.bot_internal_port)
@@ -1,16 +1,33 @@
 from __future__ import annotations
 
+import asyncio
+import random
+import time
 from typing import Any
 
 import httpx
 
 from bot.config import get_settings
+from bot.utils.telemetry import record_core_call
+from bot.utils.tracing import tracer
+
+_RETRYABLE_STATUS = {409, 502, 503, 504}
+
+
+def is_upstream_error(exc: BaseException) -> bool:
+    """502 dari core karena Indodax gagal menjawab; hasil order belum pasti."""
+    return (
+        isinstance(exc, httpx.HTTPStatusError)
+        and "x-upstream-error" in exc.response.headers
+    )
 
 
 class CoreAPIClient:
     def __init__(self) -> None:
         settings = get_settings()
         self._client = httpx.AsyncClient(base_url=str(settings.core_api_base_url), timeout=10.0)
+        self._retry_attempts = max(settings.core_api_retry_attempts, 1)
+        self._hedge_delay = settings.core_api_hedge_delay_seconds
 
     def _headers(self, user_token: str | None = None) -> dict[str, str]:
         headers: dict[str, str] = {}
@@ -18,6 +35,25 @@ class CoreAPIClient:
             headers["Authorization"] = f"Bearer {user_token}"
         return headers
 
+    async def _send(
+        self, method: str, path: str, *, headers: dict[str, str], **kwargs: Any
+    ) -> httpx.Response:
+        started = time.perf_counter()
+        status: int | str = "error"
+        try:
+            with tracer.span(f"core {method} {path}", kind="client") as span:
+                response = await self._client.request(
+                    method,
+                    path,
+                    headers={**headers, "traceparent": span.context.traceparent()},
+                    **kwargs,
+                )
+                status = response.status_code
+                span.set("http.status_code", status)
+                return response
+        finally:
+            record_core_call(method, path, time.perf_counter() - started, status)
+
     async def post(
         self,
         path: str,
@@ -25,15 +61,67 @@ class CoreAPIClient:
         *,
         params: dict[str, Any] | None = None,
         user_token: str | None = None,
+        idempotency_key: str | None = None,
     ) -> dict[str, Any]:
-        response = await self._client.post(
-            path,
-            json=payload,
-            params=params,
-            headers=self._headers(user_token),
-        )
-        response.raise_for_status()
-        return response.json()
+        headers = self._headers(user_token)
+        if not idempotency_key:
+            response = await self._send(
+                "POST", path, json=payload, params=params, headers=headers
+            )
+            response.raise_for_status()
+            return response.json()
+        headers["Idempotency-Key"] = idempotency_key
+        for attempt in range(self._retry_attempts):
+            last_attempt = attempt == self._retry_attempts - 1
+            if attempt:
+                await asyncio.sleep(0.25 * 2 ** (attempt - 1) + random.uniform(0, 0.25))
+            try:
+                response = await self._hedged_post(path, payload, params, headers)
+            except httpx.TransportError:
+                if last_attempt:
+                    raise
+                continue
+            # 502 dari core sendiri berarti Indodax gagal menjawab; hasil order belum pasti.
+            upstream_error = "x-upstream-error" in response.headers
+            if response.status_code in _RETRYABLE_STATUS and not upstream_error and not last_attempt:
+                continue
+            response.raise_for_status()
+            return response.json()
+        raise RuntimeError("unreachable")  # pragma: no cover
+
+    async def _hedged_post(
+        self,
+        path: str,
+        payload: dict[str, Any] | None,
+        params: dict[str, Any] | None,
+        headers: dict[str, str],
+    ) -> httpx.Response:
+        def send() -> asyncio.Task[httpx.Response]:
+            return asyncio.create_task(
+                self._send("POST", path, json=payload, params=params, headers=headers)
+            )
+
+        first = send()
+        if self._hedge_delay <= 0:
+            return await first
+        done, _ = await asyncio.wait({first}, timeout=self._hedge_delay)
+        if done:
+            return first.result()
+        pending = {first, send()}
+        error: BaseException | None = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error  # type: ignore[misc]
+        finally:
+            for task in pending:
+                task.cancel()
 
     async def get(
         self,
@@ -42,8 +130,8 @@ class CoreAPIClient:
         *,
         user_token: str | None = None,
     ) -> dict[str, Any]:
-        response = await self._client.get(
-            path, params=params, headers=self._headers(user_token)
+        response = await self._send(
+            "GET", path, params=params, headers=self._headers(user_token)
         )
         response.raise_for_status()
         return response.json()
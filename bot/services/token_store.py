@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timezone
 
 from bot.utils.crypto import (
@@ -13,6 +16,13 @@ from redis.asyncio import Redis
 from bot.config import get_settings
 
 
+@dataclass(slots=True)
+class _CachedToken:
+    token: str
+    expires_at: float | None
+    fresh_until: float
+
+
 class TokenStore:
     def __init__(self) -> None:
         settings = get_settings()
@@ -22,10 +32,40 @@ class TokenStore:
         self._prefix = "user_token"
         self._ttl_seconds = settings.user_token_ttl_seconds
         self._secret_key = settings.app_secret_key
+        self._cache: OrderedDict[int, _CachedToken] = OrderedDict()
+        self._cache_size = settings.token_cache_size
+        self._cache_max_age = settings.token_cache_max_age_seconds
 
     def _key(self, telegram_id: int) -> str:
         return f"{self._prefix}:{telegram_id}"
 
+    def _remember(self, telegram_id: int, token: str, ttl: int | None) -> None:
+        if self._cache_size <= 0:
+            return
+        now = time.monotonic()
+        self._cache[telegram_id] = _CachedToken(
+            token=token,
+            expires_at=now + ttl if ttl is not None else None,
+            fresh_until=now + self._cache_max_age,
+        )
+        self._cache.move_to_end(telegram_id)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+    def _cached(self, telegram_id: int) -> tuple[str, int | None] | None:
+        entry = self._cache.get(telegram_id)
+        if entry is None:
+            return None
+        now = time.monotonic()
+        if now >= entry.fresh_until or (
+            entry.expires_at is not None and now >= entry.expires_at
+        ):
+            self._cache.pop(telegram_id, None)
+            return None
+        self._cache.move_to_end(telegram_id)
+        ttl = int(entry.expires_at - now) if entry.expires_at is not None else None
+        return entry.token, ttl
+
     async def set_token(
         self,
         telegram_id: int,
@@ -43,13 +83,19 @@ class TokenStore:
                 ttl = delta
         payload = encrypt_token_value(token, self._secret_key)
         await self._redis.set(self._key(telegram_id), payload, ex=max(ttl, 1))
+        self._remember(telegram_id, token, max(ttl, 1))
 
     async def get_token_with_ttl(self, telegram_id: int) -> tuple[str | None, int | None]:
+        cached = self._cached(telegram_id)
+        if cached is not None:
+            return cached
         key = self._key(telegram_id)
-        payload = await self._redis.get(key)
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.get(key)
+            pipe.ttl(key)
+            payload, ttl = await pipe.execute()
         if payload is None:
             return None, None
-        ttl = await self._redis.ttl(key)
         try:
             token = decrypt_token_value(payload, self._secret_key)
         except TokenEncryptionError:
@@ -62,12 +108,15 @@ class TokenStore:
                 pass
         if ttl is not None and ttl < 0:
             ttl = None
+        self._remember(telegram_id, token, ttl)
         return token, ttl
 
     async def delete_token(self, telegram_id: int) -> None:
+        self._cache.pop(telegram_id, None)
         await self._redis.delete(self._key(telegram_id))
 
     async def close(self) -> None:
+        self._cache.clear()
         await self._redis.close()
         await self._redis.wait_closed()
 
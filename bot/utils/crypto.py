@@ -5,6 +5,7 @@ from __future__ import annotations
 import base64
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
@@ -27,11 +28,15 @@ def _derive_key(secret: str) -> _CryptoMaterial:
     return _CryptoMaterial(key=key)
 
 
+@lru_cache(maxsize=4)
+def _cipher(secret: str) -> AESGCM:
+    return AESGCM(_derive_key(secret).key)
+
+
 def encrypt_token_value(token: str, secret: str) -> str:
     """Encrypt token with AES-GCM and return transport-safe blob."""
 
-    material = _derive_key(secret)
-    aesgcm = AESGCM(material.key)
+    aesgcm = _cipher(secret)
     nonce = os.urandom(12)
     ciphertext = aesgcm.encrypt(nonce, token.encode("utf-8"), None)
     payload = base64.urlsafe_b64encode(nonce + ciphertext).decode("ascii")
@@ -48,7 +53,5 @@ def decrypt_token_value(value: str, secret: str) -> str:
     if len(data) <= 12:
         raise TokenEncryptionError("Payload token terenkripsi rusak")
     nonce, ciphertext = data[:12], data[12:]
-    material = _derive_key(secret)
-    aesgcm = AESGCM(material.key)
-    plaintext = aesgcm.decrypt(nonce, ciphertext, None)
+    plaintext = _cipher(secret).decrypt(nonce, ciphertext, None)
     return plaintext.decode("utf-8")
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import logging
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.fsm.storage.base import StateType, StorageKey
+from aiogram.fsm.storage.redis import RedisStorage
+from aiogram.types import TelegramObject
+from prometheus_client import Counter, Histogram
+
+from bot.config import get_settings
+from bot.utils.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+UPDATE_SECONDS = Histogram(
+    "bot_update_duration_seconds", "Durasi penanganan update per handler", ("handler",), buckets=_BUCKETS
+)
+UPDATE_CORE_CALLS = Histogram(
+    "bot_update_core_calls",
+    "Jumlah panggilan core API per update",
+    ("handler",),
+    buckets=(0, 1, 2, 3, 4, 5, 8, 13),
+)
+CORE_CALL_SECONDS = Histogram(
+    "bot_core_call_duration_seconds",
+    "Latensi panggilan core API",
+    ("method", "path", "status"),
+    buckets=_BUCKETS,
+)
+FSM_STORAGE_SECONDS = Histogram(
+    "bot_fsm_storage_duration_seconds", "Latensi operasi storage FSM", ("operation",), buckets=_BUCKETS
+)
+SLOW_UPDATES = Counter("bot_slow_updates_total", "Update yang melebihi ambang lambat", ("handler",))
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+@dataclass
+class UpdateTrace:
+    started: float = field(default_factory=time.perf_counter)
+    handler: str = "unhandled"
+    core_calls: list[dict[str, Any]] = field(default_factory=list)
+    fsm_seconds: float = 0.0
+    fsm_ops: int = 0
+    trace_id: str | None = None
+
+    def breakdown(self, total: float) -> dict[str, Any]:
+        core_seconds = sum(call["seconds"] for call in self.core_calls)
+        return {
+            "handler": self.handler,
+            "trace_id": self.trace_id,
+            "total_ms": round(total * 1000, 1),
+            "core_ms": round(core_seconds * 1000, 1),
+            "fsm_ms": round(self.fsm_seconds * 1000, 1),
+            "other_ms": round((total - core_seconds - self.fsm_seconds) * 1000, 1),
+            "fsm_ops": self.fsm_ops,
+            "core_calls": [
+                {**call, "seconds": round(call["seconds"] * 1000, 1)} for call in self.core_calls
+            ],
+        }
+
+
+_current: ContextVar[UpdateTrace | None] = ContextVar("bot_update_trace", default=None)
+
+
+def record_core_call(method: str, path: str, seconds: float, status: int | str) -> None:
+    normalized = _ID_SEGMENT.sub("/{id}", path)
+    CORE_CALL_SECONDS.labels(method, normalized, str(status)).observe(seconds)
+    trace = _current.get()
+    if trace is not None:
+        trace.core_calls.append(
+            {"method": method, "path": normalized, "status": status, "seconds": seconds}
+        )
+
+
+def record_fsm(operation: str, seconds: float) -> None:
+    FSM_STORAGE_SECONDS.labels(operation).observe(seconds)
+    trace = _current.get()
+    if trace is not None:
+        trace.fsm_seconds += seconds
+        trace.fsm_ops += 1
+
+
+class UpdateLatencyMiddleware(BaseMiddleware):
+    """Outer middleware: mengukur satu update penuh dan mencatat update lambat."""
+
+    def __init__(self, slow_threshold_ms: int | None = None) -> None:
+        threshold = (
+            get_settings().slow_update_threshold_ms
+            if slow_threshold_ms is None
+            else slow_threshold_ms
+        )
+        self._slow_seconds = threshold / 1000
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        trace = UpdateTrace()
+        token = _current.set(trace)
+        try:
+            with tracer.span("telegram update", kind="server") as span:
+                trace.trace_id = span.context.trace_id
+                try:
+                    return await handler(event, data)
+                finally:
+                    span.name = f"telegram {trace.handler}"
+        finally:
+            _current.reset(token)
+            total = time.perf_counter() - trace.started
+            UPDATE_SECONDS.labels(trace.handler).observe(total)
+            UPDATE_CORE_CALLS.labels(trace.handler).observe(len(trace.core_calls))
+            if total >= self._slow_seconds:
+                SLOW_UPDATES.labels(trace.handler).inc()
+                logger.warning("Update lambat", extra=trace.breakdown(total))
+
+
+class HandlerNameMiddleware(BaseMiddleware):
+    """Inner middleware: menamai trace dengan handler yang akhirnya dipanggil."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        trace = _current.get()
+        handler_object = data.get("handler")
+        if trace is not None and handler_object is not None:
+            callback = handler_object.callback
+            trace.handler = f"{callback.__module__.rsplit('.', 1)[-1]}.{callback.__name__}"
+        return await handler(event, data)
+
+
+class TimedRedisStorage(RedisStorage):
+    async def _timed(self, operation: str, coro: Awaitable[Any]) -> Any:
+        started = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            record_fsm(operation, time.perf_counter() - started)
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        await self._timed("set_state", super().set_state(key, state))
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        return await self._timed("get_state", super().get_state(key))
+
+    async def set_data(self, key: StorageKey, data: dict[str, Any]) -> None:
+        await self._timed("set_data", super().set_data(key, data))
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        return await self._timed("get_data", super().get_data(key))
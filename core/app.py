@@ -1,7 +1,8 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from core.config import get_settings
+from core.lifespan import lifespan
 from core.routers import (
     alerts,
     auth,
@@ -13,11 +14,12 @@ from core.routers import (
     strategies,
     system,
 )
-from core.services.notification_service import notification_service
+from core.utils.metrics import MetricsMiddleware, render
+from core.utils.tracing import TracingMiddleware
 
 settings = get_settings()
 
-app = FastAPI(title="Indodax Trading Core API", version="0.1.0")
+app = FastAPI(title="Indodax Trading Core API", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -27,6 +29,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(TracingMiddleware)
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(auth.router)
 app.include_router(market.router)
 app.include_router(orders.router)
@@ -43,11 +48,7 @@ async def health() -> dict[str, str]:
     return {"status": "ok", "env": settings.app_env}
 
 
-@app.on_event("startup")
-async def startup() -> None:
-    await notification_service.start()
-
-
-@app.on_event("shutdown")
-async def shutdown() -> None:
-    await notification_service.stop()
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    body, content_type = render()
+    return Response(content=body, media_type=content_type)
@@ -7,6 +7,7 @@ class Settings(BaseSettings):
     app_env: str = "development"
     app_secret_key: str
     database_url: AnyUrl
+    database_replica_url: AnyUrl | None = None
     redis_url: AnyUrl
     core_host: str = "0.0.0.0"
     core_port: int = 8000
@@ -15,6 +16,44 @@ class Settings(BaseSettings):
     bot_internal_webhook: AnyUrl | None = None
     user_token_ttl_seconds: int = 86_400
     user_token_rotation_threshold_seconds: int = 3_600
+    idempotency_ttl_seconds: int = 86_400
+    token_cache_max_size: int = 10_000
+    token_cache_ttl_seconds: int = 300
+    idempotency_lock_ttl_seconds: int = 30
+    safety_refresh_seconds: int = 30
+    rate_limit_orders: str = "30/60"
+    rate_limit_cancels: str = "30/60"
+    rate_limit_auth: str = "10/60"
+    rate_limit_market: str = "120/60"
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: float = 10.0
+    db_pool_recycle_seconds: int = 1_800
+    db_pool_pre_ping: bool = True
+    db_prepared_statement_cache_size: int = 256
+    db_replica_retry_seconds: int = 30
+    redis_max_connections: int = 50
+    redis_pool_timeout_seconds: float = 5.0
+    redis_socket_timeout_seconds: float = 5.0
+    redis_health_check_interval_seconds: int = 30
+    startup_warmup_timeout_seconds: float = 5.0
+    startup_warm_db_connections: int = 2
+    trace_export_path: str | None = None
+    trace_sample_rate: float = 0.01
+    indodax_slo_window_seconds: int = 300
+    indodax_slo_min_requests: int = 20
+    indodax_slo_error_rate: float = 0.25
+    indodax_slo_latency_p99_ms: float = 5_000
+    indodax_slo_breach_seconds: int = 120
+    indodax_slo_check_seconds: int = 15
+    indodax_slo_auto_pause: bool = True
+    retention_enabled: bool = True
+    retention_interval_seconds: int = 21_600
+    retention_premake_months: int = 2
+    retention_archive_dir: str | None = "/var/lib/indodax/archive"
+    retention_strategy_executions_months: int = 3
+    retention_telemetry_events_months: int = 3
+    retention_audit_logs_months: int = 12
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.encryption import decrypt_value
+from core.models import UserIndodaxKeys
+from core.repositories.key_repository import user_key_repository
+
+
+@dataclass(slots=True)
+class UserContext:
+    """User terautentikasi yang di-resolve sekali per request.
+
+    API key aktif ikut dimuat bila user diambil dari database; bila identitas
+    berasal dari cache token, key baru dimuat saat service membutuhkannya.
+    """
+
+    user_id: int
+    telegram_id: int
+    key: UserIndodaxKeys | None = None
+    key_loaded: bool = False
+
+    async def active_key(self, session: AsyncSession) -> UserIndodaxKeys | None:
+        if not self.key_loaded:
+            self.key = await user_key_repository.get_active_key(session, self.user_id)
+            self.key_loaded = True
+        return self.key
+
+    async def credentials(self, session: AsyncSession) -> tuple[str, str]:
+        key = await self.active_key(session)
+        if key is None:
+            raise ValueError("User belum menghubungkan API key")
+        return (
+            decrypt_value(key.api_key_nonce, key.api_key_ciphertext),
+            decrypt_value(key.api_secret_nonce, key.api_secret_ciphertext),
+        )
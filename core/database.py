@@ -1,23 +1,210 @@
-from typing import AsyncIterator
+import logging
+import time
+from typing import Any, AsyncIterator
 
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
 
 from core.config import get_settings
+from core.utils.metrics import (
+    DB_POOL_CHECKOUT_SECONDS,
+    DB_POOL_CONNECTIONS,
+    DB_POOL_TIMEOUTS,
+    DB_READ_ROUTING,
+)
+from core.utils.tracing import tracer
+
+logger = logging.getLogger(__name__)
 
 _settings = get_settings()
 
-engine: AsyncEngine = create_async_engine(
-    str(_settings.database_url),
-    echo=False,
-    future=True,
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Pool yang mencatat waktu tunggu checkout (termasuk membuka koneksi baru)."""
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            DB_POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - started)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": self.size(),
+            "in_use": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+        }
+
+
+def engine_options(settings: Any, url: str | None = None) -> dict[str, Any]:
+    options: dict[str, Any] = {
+        "poolclass": InstrumentedPool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    if str(url or settings.database_url).startswith("postgresql+asyncpg"):
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.db_prepared_statement_cache_size
+        }
+    return options
+
+
+def _start_query_span(conn, cursor, statement, parameters, context, executemany) -> None:
+    current = tracer.current()
+    if current is None or not current.sampled or tracer.exporter is None:
+        return
+    context._trace_span = tracer.start(
+        "db.query",
+        kind="client",
+        attributes={
+            "db.system": "postgresql",
+            "db.statement": statement[:500],
+            "db.instance": conn.engine.url.host or "",
+        },
+    )
+
+
+def _end_query_span(conn, cursor, statement, parameters, context, executemany) -> None:
+    span = getattr(context, "_trace_span", None)
+    if span is not None:
+        context._trace_span = None
+        tracer.end(span)
+
+
+def _fail_query_span(exception_context) -> None:
+    context = exception_context.execution_context
+    span = getattr(context, "_trace_span", None) if context is not None else None
+    if span is not None:
+        context._trace_span = None
+        tracer.end(span, exception_context.original_exception)
+
+
+def _create_engine(name: str, url: str) -> AsyncEngine:
+    created = create_async_engine(url, echo=False, future=True, **engine_options(_settings, url))
+    sync_engine = created.sync_engine
+
+    def _update_pool_gauges(*_: Any) -> None:
+        pool = sync_engine.pool
+        if isinstance(pool, InstrumentedPool):
+            for state, value in pool.stats().items():
+                if state != "size":
+                    DB_POOL_CONNECTIONS.labels(name, state).set(value)
+
+    event.listen(sync_engine, "checkout", _update_pool_gauges)
+    event.listen(sync_engine, "checkin", _update_pool_gauges)
+    event.listen(sync_engine, "before_cursor_execute", _start_query_span)
+    event.listen(sync_engine, "after_cursor_execute", _end_query_span)
+    event.listen(sync_engine, "handle_error", _fail_query_span)
+    return created
+
+
+engine: AsyncEngine = _create_engine("primary", str(_settings.database_url))
+replica_engine: AsyncEngine | None = (
+    _create_engine("replica", str(_settings.database_replica_url))
+    if _settings.database_replica_url
+    else None
 )
 
+
+def _engine_pool_stats(target: AsyncEngine) -> dict[str, Any]:
+    pool = target.sync_engine.pool
+    stats = pool.stats() if isinstance(pool, InstrumentedPool) else {}
+    return {
+        **stats,
+        "max_overflow": _settings.db_max_overflow,
+        "timeout_seconds": _settings.db_pool_timeout_seconds,
+        "recycle_seconds": _settings.db_pool_recycle_seconds,
+        "pre_ping": _settings.db_pool_pre_ping,
+    }
+
+
+def pool_stats() -> dict[str, Any]:
+    stats = _engine_pool_stats(engine)
+    if replica_engine is not None:
+        stats["replica"] = {
+            **_engine_pool_stats(replica_engine),
+            "available": read_router.replica_available(),
+        }
+    return stats
+
+
 async_session_factory = sessionmaker(
     engine, expire_on_commit=False, class_=AsyncSession
 )
+replica_session_factory = (
+    sessionmaker(replica_engine, expire_on_commit=False, class_=AsyncSession)
+    if replica_engine is not None
+    else None
+)
+
+
+class ReadRouter:
+    """Arahkan sesi baca ke replica; jatuh ke primary bila replica tidak bisa dihubungi."""
+
+    header = "x-consistent-read"
+
+    def __init__(self) -> None:
+        self._retry_seconds = _settings.db_replica_retry_seconds
+        self._down_until = 0.0
+
+    def replica_available(self) -> bool:
+        return replica_session_factory is not None and time.monotonic() >= self._down_until
+
+    def wants_primary(self, request: Request) -> bool:
+        return request.headers.get(self.header, "").lower() in {"1", "true", "yes"}
+
+    def mark_down(self, exc: BaseException) -> None:
+        self._down_until = time.monotonic() + self._retry_seconds
+        logger.warning(
+            "Replica database tidak tersedia, baca dialihkan ke primary",
+            extra={"error": str(exc), "retry_seconds": self._retry_seconds},
+        )
+
+    async def open(self, request: Request) -> tuple[AsyncSession, str]:
+        if replica_session_factory is None:
+            return async_session_factory(), "primary"
+        if self.wants_primary(request):
+            DB_READ_ROUTING.labels("primary", "consistent").inc()
+            return async_session_factory(), "primary"
+        if not self.replica_available():
+            DB_READ_ROUTING.labels("primary", "fallback").inc()
+            return async_session_factory(), "primary"
+        session = replica_session_factory()
+        try:
+            # Ambil koneksi di sini agar kegagalan replica masih bisa dialihkan.
+            await session.connection()
+        except (OSError, DBAPIError, PoolTimeoutError) as exc:
+            await session.close()
+            self.mark_down(exc)
+            DB_READ_ROUTING.labels("primary", "fallback").inc()
+            return async_session_factory(), "primary"
+        DB_READ_ROUTING.labels("replica", "read").inc()
+        return session, "replica"
+
+
+read_router = ReadRouter()
 
 
 async def get_session() -> AsyncIterator[AsyncSession]:
     async with async_session_factory() as session:
         yield session
+
+
+async def get_read_session(request: Request) -> AsyncIterator[AsyncSession]:
+    """Sesi untuk endpoint baca; kirim ``X-Consistent-Read: 1`` untuk membaca dari primary."""
+    session, _ = await read_router.open(request)
+    async with session:
+        yield session
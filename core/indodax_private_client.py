@@ -2,12 +2,15 @@ from __future__ import annotations
 
 import hashlib
 import hmac
+import time
 from typing import Any
 from urllib.parse import urlencode
 
 import httpx
 
 from core.utils.nonce import nonce_manager
+from core.utils.tracing import tracer
+from core.utils.upstream import instrumented_transport
 
 
 class IndodaxPrivateClientError(Exception):
@@ -18,7 +21,8 @@ class IndodaxPrivateClient:
     BASE_URL = "https://indodax.com/tapi"
 
     def __init__(self, *, timeout: float = 10.0) -> None:
-        self._client = httpx.AsyncClient(base_url=self.BASE_URL, timeout=timeout)
+        self._timeout = timeout
+        self._client: httpx.AsyncClient | None = None
 
     async def _sign(self, body: dict[str, Any], api_secret: str) -> str:
         payload = urlencode(body)
@@ -34,6 +38,7 @@ class IndodaxPrivateClient:
         body: dict[str, Any],
         api_key: str,
         api_secret: str,
+        timings: dict[str, float] | None = None,
     ) -> dict[str, Any]:
         body.update({"method": method})
         payload = urlencode(body)
@@ -42,9 +47,14 @@ class IndodaxPrivateClient:
             "Sign": await self._sign(body, api_secret),
             "Content-Type": "application/x-www-form-urlencoded",
         }
-        response = await self._client.post("", content=payload, headers=headers)
-        response.raise_for_status()
-        data = response.json()
+        with tracer.leaf(f"indodax private {method}", **{"indodax.method": method}):
+            if timings is not None:
+                timings["exchange_sent_at"] = time.time()
+            response = await self.http.post("", content=payload, headers=headers)
+            if timings is not None:
+                timings["exchange_ack_at"] = time.time()
+            response.raise_for_status()
+            data = response.json()
         if not data.get("success"):
             raise IndodaxPrivateClientError(data.get("error", "Unknown error"))
         return data
@@ -56,14 +66,32 @@ class IndodaxPrivateClient:
         params: dict[str, Any],
         api_key: str,
         api_secret: str,
+        *,
+        nonce: int | None = None,
+        timings: dict[str, float] | None = None,
     ) -> dict[str, Any]:
-        nonce = await nonce_manager.get_next_nonce(user_id)
+        if nonce is None:
+            nonce = await nonce_manager.get_next_nonce(user_id)
         body = {"nonce": nonce}
         body.update(params)
-        return await self._request(method, body, api_key, api_secret)
+        return await self._request(method, body, api_key, api_secret, timings)
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.BASE_URL,
+                timeout=self._timeout,
+                transport=instrumented_transport(
+                    "private", httpx.Limits(max_connections=50, max_keepalive_connections=20)
+                ),
+            )
+        return self._client
 
     async def close(self) -> None:
-        await self._client.aclose()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
 
 private_client = IndodaxPrivateClient()
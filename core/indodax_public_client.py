@@ -5,19 +5,24 @@ from typing import Any, Optional
 
 import httpx
 
+from core.utils.tracing import tracer
+from core.utils.upstream import instrumented_transport
+
 
 class IndodaxPublicClient:
     BASE_URL = "https://indodax.com/api"
 
     def __init__(self, *, timeout: float = 10.0) -> None:
-        self._client = httpx.AsyncClient(base_url=self.BASE_URL, timeout=timeout)
+        self._timeout = timeout
+        self._client: httpx.AsyncClient | None = None
         self._lock = asyncio.Lock()
         self._cache: dict[str, tuple[float, dict[str, Any]]] = {}
 
     async def _fetch(self, endpoint: str, params: Optional[dict[str, Any]] = None) -> dict[str, Any]:
-        response = await self._client.get(endpoint, params=params)
-        response.raise_for_status()
-        return response.json()
+        with tracer.leaf(f"indodax public {endpoint.split('/')[0]}", **{"http.url": endpoint}):
+            response = await self.http.get(endpoint, params=params)
+            response.raise_for_status()
+            return response.json()
 
     async def get_ticker(self, pair: str, *, cache_ttl: float = 5.0) -> dict[str, Any]:
         key = f"ticker:{pair}"
@@ -67,8 +72,22 @@ class IndodaxPublicClient:
             self._cache[key] = (asyncio.get_event_loop().time(), data)
         return data
 
+    @property
+    def http(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.BASE_URL,
+                timeout=self._timeout,
+                transport=instrumented_transport(
+                    "public", httpx.Limits(max_connections=50, max_keepalive_connections=20)
+                ),
+            )
+        return self._client
+
     async def close(self) -> None:
-        await self._client.aclose()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
 
 public_client = IndodaxPublicClient()
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Awaitable
+
+from fastapi import FastAPI
+from sqlalchemy import text
+
+from core.config import get_settings
+from core.database import engine, replica_engine
+from core.indodax_private_client import private_client
+from core.indodax_public_client import public_client
+from core.services.notification_service import notification_service
+from core.services.retention_service import retention_service
+from core.services.safety_service import safety_service
+from core.utils.redis_client import redis_manager
+from core.utils.token_cache import token_cache
+from core.utils.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class ComponentStartup:
+    name: str
+    duration_ms: float
+    ok: bool
+    error: str | None = None
+
+
+class CoreResources:
+    """Membuka, memanaskan, dan menutup resource bersama milik proses core."""
+
+    def __init__(self) -> None:
+        settings = get_settings()
+        self._timeout = settings.startup_warmup_timeout_seconds
+        self._db_connections = max(settings.startup_warm_db_connections, 1)
+        self.components: dict[str, ComponentStartup] = {}
+        self.started_at: float | None = None
+        self.total_ms: float | None = None
+
+    async def _timed(self, name: str, step: Awaitable[Any]) -> None:
+        started = time.perf_counter()
+        error: str | None = None
+        try:
+            await asyncio.wait_for(step, timeout=self._timeout)
+        except Exception as exc:  # noqa: BLE001
+            error = str(exc) or type(exc).__name__
+            logger.warning("Warm-up komponen gagal", extra={"component": name, "error": error})
+        self.components[name] = ComponentStartup(
+            name=name,
+            duration_ms=(time.perf_counter() - started) * 1000,
+            ok=error is None,
+            error=error,
+        )
+
+    async def _warm_redis(self) -> None:
+        if await redis_manager.ping() is None:
+            raise RuntimeError("Redis tidak terjangkau")
+
+    async def _warm_database(self) -> None:
+        async def _connect() -> None:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+        # Koneksi dibuka bersamaan agar pool berisi beberapa koneksi siap pakai.
+        await asyncio.gather(*(_connect() for _ in range(self._db_connections)))
+
+    async def _warm_replica(self) -> None:
+        async with replica_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    async def _warm_public(self) -> None:
+        await public_client.get_tickers()
+
+    async def _warm_private(self) -> None:
+        # Cukup membuka koneksi TLS ke tapi; status respons tidak penting.
+        await private_client.http.head("")
+
+    async def start(self) -> None:
+        started = time.perf_counter()
+        self.started_at = time.time()
+        steps = [
+            self._timed("redis", self._warm_redis()),
+            self._timed("database", self._warm_database()),
+            self._timed("indodax_public", self._warm_public()),
+            self._timed("indodax_private", self._warm_private()),
+            self._timed("notifications", notification_service.start()),
+        ]
+        if replica_engine is not None:
+            steps.append(self._timed("database_replica", self._warm_replica()))
+        await asyncio.gather(*steps)
+        await self._timed("token_cache", token_cache.start())
+        await self._timed("safety", safety_service.start())
+        await self._timed("retention", retention_service.start())
+        self.total_ms = (time.perf_counter() - started) * 1000
+        logger.info("Core siap menerima trafik", extra={"startup_ms": round(self.total_ms, 1)})
+
+    async def close(self) -> None:
+        await retention_service.stop()
+        await safety_service.stop()
+        await token_cache.stop()
+        await notification_service.stop()
+        await asyncio.gather(
+            public_client.close(),
+            private_client.close(),
+            return_exceptions=True,
+        )
+        await redis_manager.close()
+        await engine.dispose()
+        if replica_engine is not None:
+            await replica_engine.dispose()
+        if tracer.exporter is not None:
+            tracer.exporter.shutdown()
+
+    def report(self) -> dict[str, Any]:
+        return {
+            "started_at": self.started_at,
+            "total_ms": self.total_ms,
+            "components": {name: asdict(item) for name, item in self.components.items()},
+        }
+
+
+resources = CoreResources()
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    await resources.start()
+    try:
+        yield
+    finally:
+        await resources.close()
@@ -64,6 +64,7 @@ class Orders(SQLModel, table=True):
     __table_args__ = (
         Index("ix_orders_user_status", "user_id", "status"),
         Index("ix_orders_pair", "pair"),
+        Index("ix_orders_strategy_status", "strategy_id", "status"),
     )
 
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -115,10 +116,12 @@ class Strategies(SQLModel, table=True):
     orders: list[Orders] = Relationship(back_populates="strategy")
 
 
+# strategy_executions, telemetry_events, dan audit_logs dipartisi per bulan pada
+# created_at (migrasi 0005); primary key di database adalah (id, created_at).
 class StrategyExecutions(SQLModel, table=True):
     __tablename__ = "strategy_executions"
     __table_args__ = (
-        Index("ix_strategy_exec_strategy", "strategy_id"),
+        Index("ix_strategy_exec_strategy", "strategy_id", "created_at"),
     )
 
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -1,10 +1,11 @@
 from datetime import datetime
 from typing import Optional
 
+from sqlalchemy import and_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
-from core.models import Users
+from core.models import UserIndodaxKeys, Users
 
 
 class UserRepository:
@@ -12,6 +13,27 @@ class UserRepository:
         result = await session.execute(select(Users).where(Users.telegram_id == telegram_id))
         return result.scalar_one_or_none()
 
+    async def get_with_active_key(
+        self, session: AsyncSession, telegram_id: int
+    ) -> tuple[Optional[Users], Optional[UserIndodaxKeys]]:
+        result = await session.execute(
+            select(Users, UserIndodaxKeys)
+            .outerjoin(
+                UserIndodaxKeys,
+                and_(
+                    UserIndodaxKeys.user_id == Users.id,
+                    UserIndodaxKeys.is_active.is_(True),
+                ),
+            )
+            .where(Users.telegram_id == telegram_id)
+            .order_by(UserIndodaxKeys.created_at.desc())
+            .limit(1)
+        )
+        row = result.first()
+        if row is None:
+            return None, None
+        return row[0], row[1]
+
     async def create_or_update(
         self,
         session: AsyncSession,
@@ -1,12 +1,12 @@
-from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.database import get_session
-from core.schemas.alert import AlertRequest
+from core.context import UserContext
+from core.database import get_read_session, get_session
+from core.schemas.alert import AlertRequest, AlertTriggerBatchRequest
 from core.schemas.common import APIResponse
 from core.services.alert_service import alert_service
-from core.services.auth_service import auth_service
-from core.routers.dependencies import require_internal_token
+from core.routers.dependencies import get_user_context, require_internal_token
 
 router = APIRouter(prefix="/api/alerts", tags=["alerts"])
 
@@ -15,16 +15,12 @@ router = APIRouter(prefix="/api/alerts", tags=["alerts"])
 async def create_alert(
     payload: AlertRequest,
     session: AsyncSession = Depends(get_session),
-    authorization: str | None = Header(default=None, alias="Authorization"),
+    user: UserContext = Depends(get_user_context),
 ) -> APIResponse[dict]:
-    try:
-        await auth_service.verify_user_token(session, payload.telegram_id, authorization)
-    except ValueError as exc:
-        raise HTTPException(status_code=401, detail=str(exc)) from exc
     try:
         alert = await alert_service.create_alert(
             session,
-            telegram_id=payload.telegram_id,
+            user,
             pair=payload.pair,
             target_price=payload.target_price,
             direction=payload.direction,
@@ -37,13 +33,23 @@ async def create_alert(
 
 @router.get("/active")
 async def list_active_alerts(
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     _: None = Depends(require_internal_token),
 ) -> APIResponse[list[dict]]:
     alerts = await alert_service.list_active_alerts(session)
     return APIResponse(success=True, data=alerts)
 
 
+@router.post("/trigger-batch")
+async def trigger_alerts_batch(
+    payload: AlertTriggerBatchRequest,
+    session: AsyncSession = Depends(get_session),
+    _: None = Depends(require_internal_token),
+) -> APIResponse[dict]:
+    updated = await alert_service.mark_triggered_batch(session, payload.alert_ids)
+    return APIResponse(success=True, data={"updated": updated})
+
+
 @router.post("/{alert_id}/trigger")
 async def trigger_alert(
     alert_id: int,
@@ -57,12 +63,8 @@ async def trigger_alert(
 @router.get("/mine")
 async def list_my_alerts(
     telegram_id: int,
-    session: AsyncSession = Depends(get_session),
-    authorization: str | None = Header(default=None, alias="Authorization"),
+    session: AsyncSession = Depends(get_read_session),
+    user: UserContext = Depends(get_user_context),
 ) -> APIResponse[list[dict]]:
-    try:
-        await auth_service.verify_user_token(session, telegram_id, authorization)
-    except ValueError as exc:
-        raise HTTPException(status_code=401, detail=str(exc)) from exc
-    alerts = await alert_service.list_alerts_for_user(session, telegram_id)
+    alerts = await alert_service.list_alerts_for_user(session, user)
     return APIResponse(success=True, data=alerts)
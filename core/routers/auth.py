@@ -12,9 +12,13 @@ from core.schemas.auth import (
 )
 from core.schemas.common import APIResponse
 from core.services.auth_service import auth_service
-from core.routers.dependencies import require_internal_token
+from core.routers.dependencies import rate_limit, require_internal_token
 
-router = APIRouter(prefix="/api/auth", tags=["auth"])
+router = APIRouter(
+    prefix="/api/auth",
+    tags=["auth"],
+    dependencies=[Depends(rate_limit("auth"))],
+)
 
 
 @router.post("/link-indodax", response_model=APIResponse[AuthStatusResponse])
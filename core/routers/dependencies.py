@@ -1,6 +1,17 @@
-from fastapi import Depends, Header, HTTPException, status
+import logging
+from typing import Awaitable, Callable
+
+from fastapi import Depends, Header, HTTPException, Request, status
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.config import get_settings
+from core.context import UserContext
+from core.database import get_session
+from core.services.auth_service import auth_service
+from core.utils import rate_limiter
+
+logger = logging.getLogger(__name__)
 
 
 async def require_internal_token(
@@ -23,3 +34,70 @@ async def is_internal_request(
     if not settings.internal_auth_token:
         return False
     return x_internal_token == settings.internal_auth_token
+
+
+async def _telegram_id_from_request(request: Request) -> int | None:
+    raw = request.path_params.get("telegram_id") or request.query_params.get("telegram_id")
+    if raw is None and request.method in {"POST", "PUT", "PATCH"}:
+        try:
+            body = await request.json()
+        except ValueError:
+            body = None
+        if isinstance(body, dict):
+            raw = body.get("telegram_id")
+    try:
+        return int(raw) if raw is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+async def get_user_context(
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+    authorization: str | None = Header(default=None, alias="Authorization"),
+    is_internal: bool = Depends(is_internal_request),
+) -> UserContext:
+    telegram_id = await _telegram_id_from_request(request)
+    if telegram_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="telegram_id wajib disertakan",
+        )
+    try:
+        return await auth_service.resolve_user_context(
+            session, telegram_id, authorization, verify_token=not is_internal
+        )
+    except LookupError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(exc)) from exc
+
+
+def rate_limit_error(exc: rate_limiter.RateLimitExceeded) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=str(exc),
+        headers={"Retry-After": exc.retry_after_header},
+    )
+
+
+def rate_limit(action: str) -> Callable[..., Awaitable[None]]:
+    """Dependency GCRA per telegram_id (atau IP klien); request internal dikecualikan."""
+
+    async def _check(
+        request: Request, is_internal: bool = Depends(is_internal_request)
+    ) -> None:
+        if is_internal:
+            return
+        identity = await _telegram_id_from_request(request)
+        if identity is None:
+            identity = request.client.host if request.client else "anonymous"
+        try:
+            await rate_limiter.enforce(action, identity)
+        except rate_limiter.RateLimitExceeded as exc:
+            raise rate_limit_error(exc) from exc
+        except RedisError as exc:
+            # Limiter tidak boleh menjatuhkan API saat Redis bermasalah.
+            logger.warning("Rate limiter tidak tersedia", extra={"error": str(exc)})
+
+    return _check
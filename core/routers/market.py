@@ -1,7 +1,8 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 import httpx
 
 from core.indodax_public_client import public_client
+from core.routers.dependencies import rate_limit
 from core.schemas.common import APIResponse
 from core.schemas.market import (
     OrderBookEntry,
@@ -10,7 +11,11 @@ from core.schemas.market import (
     TickerResponse,
 )
 
-router = APIRouter(prefix="/api/market", tags=["market"])
+router = APIRouter(
+    prefix="/api/market",
+    tags=["market"],
+    dependencies=[Depends(rate_limit("market"))],
+)
 
 
 @router.get("/tickers", response_model=APIResponse[TickerResponse])
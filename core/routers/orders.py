@@ -1,7 +1,12 @@
-from fastapi import APIRouter, Depends, Header, HTTPException
+import time
+from typing import Any, Awaitable, Callable
+
+import httpx
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.database import get_session
+from core.context import UserContext
+from core.database import get_read_session, get_session
 from core.schemas.common import APIResponse
 from core.schemas.order import (
     CreateOrderRequest,
@@ -9,31 +14,71 @@ from core.schemas.order import (
     OrderSyncRequest,
     OrderSyncResponse,
 )
-from core.services.auth_service import auth_service
 from core.services.order_service import order_service
-from core.routers.dependencies import is_internal_request, require_internal_token
+from core.routers.dependencies import (
+    get_user_context,
+    rate_limit,
+    rate_limit_error,
+    require_internal_token,
+)
+from core.utils import rate_limiter
+from core.utils.idempotency import (
+    IdempotencyConflictError,
+    IdempotencyInProgressError,
+    IdempotencyUpstreamError,
+    idempotency_store,
+)
 
 router = APIRouter(prefix="/api/orders", tags=["orders"])
 
 
+async def _run_idempotent(
+    scope: str,
+    key: str | None,
+    payload: dict[str, Any],
+    func: Callable[[], Awaitable[dict[str, Any]]],
+) -> dict[str, Any]:
+    try:
+        return await idempotency_store.run(
+            scope, key, idempotency_store.fingerprint(payload), func
+        )
+    except IdempotencyConflictError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    except IdempotencyInProgressError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    except IdempotencyUpstreamError as exc:
+        raise HTTPException(
+            status_code=502, detail=str(exc), headers={"X-Upstream-Error": "indodax"}
+        ) from exc
+    except rate_limiter.RateLimitExceeded as exc:
+        raise rate_limit_error(exc) from exc
+    except HTTPException:
+        raise
+    except httpx.HTTPError as exc:
+        # Header penanda agar worker tidak mengulang order yang statusnya ambigu.
+        raise HTTPException(
+            status_code=502,
+            detail=f"Indodax tidak merespons: {str(exc) or type(exc).__name__}",
+            headers={"X-Upstream-Error": "indodax"},
+        ) from exc
+    except Exception as exc:  # noqa: BLE001
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
 @router.post("", response_model=APIResponse[OrderResponse])
 async def create_order(
     payload: CreateOrderRequest,
     session: AsyncSession = Depends(get_session),
-    authorization: str | None = Header(default=None, alias="Authorization"),
-    is_internal: bool = Depends(is_internal_request),
+    user: UserContext = Depends(get_user_context),
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
 ) -> APIResponse[OrderResponse]:
-    if not is_internal:
-        try:
-            await auth_service.verify_user_token(
-                session, payload.telegram_id, authorization
-            )
-        except ValueError as exc:
-            raise HTTPException(status_code=401, detail=str(exc)) from exc
-    try:
+    received_at = time.time()
+
+    async def _create() -> dict[str, Any]:
+        timings = {**(payload.timings or {}), "core_received_at": received_at}
         order = await order_service.create_order(
             session,
-            telegram_id=payload.telegram_id,
+            user,
             pair=payload.pair,
             side=payload.side,
             order_type=payload.type,
@@ -41,10 +86,22 @@ async def create_order(
             price=payload.price,
             is_strategy_order=payload.is_strategy_order,
             strategy_id=payload.strategy_id,
+            timings=timings,
         )
-    except Exception as exc:  # noqa: BLE001
-        raise HTTPException(status_code=400, detail=str(exc)) from exc
-    return APIResponse(success=True, data=OrderResponse.model_validate(order.model_dump()))
+        response = APIResponse(
+            success=True,
+            data=OrderResponse.model_validate({**order.model_dump(), "timings": timings}),
+        )
+        return response.model_dump(mode="json")
+
+    # Timing berubah di tiap percobaan ulang, jadi tidak ikut sidik idempotensi.
+    result = await _run_idempotent(
+        f"orders:create:{user.telegram_id}",
+        idempotency_key,
+        payload.model_dump(mode="json", exclude={"timings"}),
+        _create,
+    )
+    return APIResponse[OrderResponse].model_validate(result)
 
 
 @router.get("/open", response_model=APIResponse[list[OrderResponse]])
@@ -52,18 +109,12 @@ async def get_open_orders(
     telegram_id: int,
     pair: str | None = None,
     strategy_id: int | None = None,
-    session: AsyncSession = Depends(get_session),
-    authorization: str | None = Header(default=None, alias="Authorization"),
-    is_internal: bool = Depends(is_internal_request),
+    session: AsyncSession = Depends(get_read_session),
+    user: UserContext = Depends(get_user_context),
 ) -> APIResponse[list[OrderResponse]]:
-    if not is_internal:
-        try:
-            await auth_service.verify_user_token(session, telegram_id, authorization)
-        except ValueError as exc:
-            raise HTTPException(status_code=401, detail=str(exc)) from exc
     orders = await order_service.get_open_orders(
         session,
-        telegram_id,
+        user,
         pair=pair,
         strategy_id=strategy_id,
     )
@@ -71,24 +122,57 @@ async def get_open_orders(
     return APIResponse(success=True, data=data)
 
 
-@router.post("/{order_id}/cancel", response_model=APIResponse[OrderResponse])
+@router.get(
+    "/open/strategies",
+    response_model=APIResponse[dict[int, list[OrderResponse]]],
+)
+async def get_open_strategy_orders(
+    strategy_ids: list[int] | None = Query(default=None),
+    strategy_type: str | None = None,
+    # Dasar rekonsiliasi grid; replica yang tertinggal akan memicu order ganda.
+    session: AsyncSession = Depends(get_session),
+    _: None = Depends(require_internal_token),
+) -> APIResponse[dict[int, list[OrderResponse]]]:
+    grouped = await order_service.get_open_strategy_orders(
+        session,
+        strategy_ids=strategy_ids,
+        strategy_type=strategy_type,
+    )
+    data = {
+        strategy_id: [
+            OrderResponse.model_validate(order.model_dump()) for order in orders
+        ]
+        for strategy_id, orders in grouped.items()
+    }
+    return APIResponse(success=True, data=data)
+
+
+@router.post(
+    "/{order_id}/cancel",
+    response_model=APIResponse[OrderResponse],
+    dependencies=[Depends(rate_limit("cancels"))],
+)
 async def cancel_order(
     order_id: int,
     telegram_id: int,
     session: AsyncSession = Depends(get_session),
-    authorization: str | None = Header(default=None, alias="Authorization"),
-    is_internal: bool = Depends(is_internal_request),
+    user: UserContext = Depends(get_user_context),
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
 ) -> APIResponse[OrderResponse]:
-    if not is_internal:
-        try:
-            await auth_service.verify_user_token(session, telegram_id, authorization)
-        except ValueError as exc:
-            raise HTTPException(status_code=401, detail=str(exc)) from exc
-    try:
-        order = await order_service.cancel_order(session, telegram_id, order_id)
-    except Exception as exc:  # noqa: BLE001
-        raise HTTPException(status_code=400, detail=str(exc)) from exc
-    return APIResponse(success=True, data=OrderResponse.model_validate(order.model_dump()))
+    async def _cancel() -> dict[str, Any]:
+        order = await order_service.cancel_order(session, user, order_id)
+        response = APIResponse(
+            success=True, data=OrderResponse.model_validate(order.model_dump())
+        )
+        return response.model_dump(mode="json")
+
+    result = await _run_idempotent(
+        f"orders:cancel:{user.telegram_id}",
+        idempotency_key,
+        {"order_id": order_id},
+        _cancel,
+    )
+    return APIResponse[OrderResponse].model_validate(result)
 
 
 @router.post("/sync-status", response_model=APIResponse[OrderSyncResponse])
@@ -98,6 +182,9 @@ async def sync_order_status(
     _: None = Depends(require_internal_token),
 ) -> APIResponse[OrderSyncResponse]:
     result = await order_service.sync_open_orders(
-        session, telegram_ids=payload.telegram_ids
+        session,
+        telegram_ids=payload.telegram_ids,
+        shard_count=payload.shard_count,
+        shards=payload.shards,
     )
     return APIResponse(success=True, data=result)
@@ -1,18 +1,19 @@
-from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.database import get_session
+from core.context import UserContext
+from core.database import get_read_session, get_session
 from core.schemas.common import APIResponse
 from core.schemas.strategy import (
     DCARequest,
     GridRequest,
+    StrategyExecutionBatchRequest,
     StrategyExecutionLogRequest,
     StrategyStopRequest,
     TPSLRequest,
 )
-from core.services.auth_service import auth_service
 from core.services.strategy_service import strategy_service
-from core.routers.dependencies import require_internal_token
+from core.routers.dependencies import get_user_context, require_internal_token
 
 router = APIRouter(prefix="/api/strategies", tags=["strategies"])
 
@@ -21,16 +22,12 @@ router = APIRouter(prefix="/api/strategies", tags=["strategies"])
 async def create_dca_strategy(
     payload: DCARequest,
     session: AsyncSession = Depends(get_session),
-    authorization: str | None = Header(default=None, alias="Authorization"),
+    user: UserContext = Depends(get_user_context),
 ) -> APIResponse[dict]:
-    try:
-        await auth_service.verify_user_token(session, payload.telegram_id, authorization)
-    except ValueError as exc:
-        raise HTTPException(status_code=401, detail=str(exc)) from exc
     try:
         strategy = await strategy_service.create_or_update_dca(
             session,
-            telegram_id=payload.telegram_id,
+            user,
             name=payload.name,
             pair=payload.pair,
             amount=payload.amount,
@@ -47,16 +44,12 @@ async def create_dca_strategy(
 async def create_grid_strategy(
     payload: GridRequest,
     session: AsyncSession = Depends(get_session),
-    authorization: str | None = Header(default=None, alias="Authorization"),
+    user: UserContext = Depends(get_user_context),
 ) -> APIResponse[dict]:
-    try:
-        await auth_service.verify_user_token(session, payload.telegram_id, authorization)
-    except ValueError as exc:
-        raise HTTPException(status_code=401, detail=str(exc)) from exc
     try:
         strategy = await strategy_service.create_grid(
             session,
-            telegram_id=payload.telegram_id,
+            user,
             name=payload.name,
             pair=payload.pair,
             lower_price=payload.lower_price,
@@ -73,16 +66,12 @@ async def create_grid_strategy(
 async def create_tp_sl_strategy(
     payload: TPSLRequest,
     session: AsyncSession = Depends(get_session),
-    authorization: str | None = Header(default=None, alias="Authorization"),
+    user: UserContext = Depends(get_user_context),
 ) -> APIResponse[dict]:
-    try:
-        await auth_service.verify_user_token(session, payload.telegram_id, authorization)
-    except ValueError as exc:
-        raise HTTPException(status_code=401, detail=str(exc)) from exc
     try:
         strategy = await strategy_service.create_tp_sl(
             session,
-            telegram_id=payload.telegram_id,
+            user,
             name=payload.name,
             pair=payload.pair,
             entry_price=payload.entry_price,
@@ -130,15 +119,11 @@ async def stop_strategy(
     strategy_id: int,
     payload: StrategyStopRequest,
     session: AsyncSession = Depends(get_session),
-    authorization: str | None = Header(default=None, alias="Authorization"),
+    user: UserContext = Depends(get_user_context),
 ) -> APIResponse[dict]:
-    try:
-        await auth_service.verify_user_token(session, payload.telegram_id, authorization)
-    except ValueError as exc:
-        raise HTTPException(status_code=401, detail=str(exc)) from exc
     try:
         strategy = await strategy_service.stop_strategy(
-            session, telegram_id=payload.telegram_id, strategy_id=strategy_id
+            session, user, strategy_id=strategy_id
         )
     except Exception as exc:  # noqa: BLE001
         raise HTTPException(status_code=400, detail=str(exc)) from exc
@@ -162,15 +147,24 @@ async def create_strategy_execution(
     return APIResponse(success=True, data=execution.model_dump())
 
 
+@router.post("/executions/batch")
+async def create_strategy_executions_batch(
+    payload: StrategyExecutionBatchRequest,
+    session: AsyncSession = Depends(get_session),
+    _: None = Depends(require_internal_token),
+) -> APIResponse[dict]:
+    inserted = await strategy_service.log_executions_batch(
+        session,
+        [item.model_dump() for item in payload.executions],
+    )
+    return APIResponse(success=True, data={"inserted": inserted})
+
+
 @router.get("/mine")
 async def list_my_strategies(
     telegram_id: int,
-    session: AsyncSession = Depends(get_session),
-    authorization: str | None = Header(default=None, alias="Authorization"),
+    session: AsyncSession = Depends(get_read_session),
+    user: UserContext = Depends(get_user_context),
 ) -> APIResponse[list[dict]]:
-    try:
-        await auth_service.verify_user_token(session, telegram_id, authorization)
-    except ValueError as exc:
-        raise HTTPException(status_code=401, detail=str(exc)) from exc
-    strategies = await strategy_service.list_by_user(session, telegram_id)
+    strategies = await strategy_service.list_by_user(session, user)
     return APIResponse(success=True, data=strategies)
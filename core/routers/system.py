@@ -1,7 +1,13 @@
 from fastapi import APIRouter, Depends
+from core.database import pool_stats
+from core.lifespan import resources
 from core.routers.dependencies import require_internal_token
 from core.schemas.common import APIResponse
+from core.schemas.system import PauseRequest, PauseScope
+from core.services.retention_service import retention_service
 from core.services.safety_service import safety_service
+from core.utils.redis_client import redis_manager
+from core.utils.upstream import upstream_telemetry
 
 router = APIRouter(prefix="/api/system", tags=["system"])
 
@@ -14,19 +20,81 @@ async def get_status() -> APIResponse[dict]:
 
 @router.post("/pause", response_model=APIResponse[dict])
 async def pause_system(
-    payload: dict[str, str] | None,
+    payload: PauseRequest | None = None,
     _: None = Depends(require_internal_token),
 ) -> APIResponse[dict]:
-    payload = payload or {}
-    reason = payload.get("reason") or "Pause oleh sistem"
-    source = payload.get("source")
-    status = await safety_service.pause(reason=reason, source=source)
+    payload = payload or PauseRequest()
+    status = await safety_service.pause(
+        reason=payload.reason or "Pause oleh sistem",
+        source=payload.source,
+        scope=payload.scope,
+        target=payload.target,
+    )
     return APIResponse(success=True, data=status)
 
 
 @router.post("/resume", response_model=APIResponse[dict])
 async def resume_system(
+    payload: PauseScope | None = None,
     _: None = Depends(require_internal_token),
 ) -> APIResponse[dict]:
-    status = await safety_service.resume()
+    payload = payload or PauseScope()
+    status = await safety_service.resume(scope=payload.scope, target=payload.target)
     return APIResponse(success=True, data=status)
+
+
+@router.get("/redis", response_model=APIResponse[dict])
+async def redis_stats(
+    _: None = Depends(require_internal_token),
+) -> APIResponse[dict]:
+    latency = await redis_manager.ping()
+    data = {
+        "healthy": latency is not None,
+        "ping_ms": latency,
+        "pool": redis_manager.pool_stats(),
+    }
+    return APIResponse(success=True, data=data)
+
+
+@router.get("/database", response_model=APIResponse[dict])
+async def database_stats(
+    _: None = Depends(require_internal_token),
+) -> APIResponse[dict]:
+    return APIResponse(success=True, data={"pool": pool_stats()})
+
+
+@router.get("/startup", response_model=APIResponse[dict])
+async def startup_report(
+    _: None = Depends(require_internal_token),
+) -> APIResponse[dict]:
+    return APIResponse(success=True, data=resources.report())
+
+
+@router.get("/upstream", response_model=APIResponse[dict])
+async def upstream_report(
+    _: None = Depends(require_internal_token),
+) -> APIResponse[dict]:
+    data = {
+        "window_seconds": upstream_telemetry.window_seconds,
+        "error_budget": upstream_telemetry.error_budget,
+        "latency_p99_ms": upstream_telemetry.latency_p99_ms,
+        "breach_seconds": upstream_telemetry.breach_seconds,
+        "methods": upstream_telemetry.report(),
+    }
+    return APIResponse(success=True, data=data)
+
+
+@router.get("/retention", response_model=APIResponse[dict])
+async def retention_report(
+    _: None = Depends(require_internal_token),
+) -> APIResponse[dict]:
+    data = {"retention_months": retention_service.retention, "last_run": retention_service.last_report}
+    return APIResponse(success=True, data=data)
+
+
+@router.post("/retention", response_model=APIResponse[dict])
+async def run_retention(
+    _: None = Depends(require_internal_token),
+) -> APIResponse[dict]:
+    report = await retention_service.run()
+    return APIResponse(success=True, data=report)
@@ -7,3 +7,7 @@ class AlertRequest(BaseModel):
     target_price: float
     direction: str = Field(description="up untuk >=, down untuk <=")
     repeat: bool = False
+
+
+class AlertTriggerBatchRequest(BaseModel):
+    alert_ids: list[int] = Field(default_factory=list)
@@ -1,6 +1,5 @@
-from typing import Optional
-
-from typing import Optional
+from datetime import datetime
+from typing import Any, Optional
 
 from pydantic import BaseModel, Field, validator
 
@@ -14,6 +13,8 @@ class CreateOrderRequest(BaseModel):
     price: Optional[float] = None
     is_strategy_order: bool = False
     strategy_id: Optional[int] = None
+    # Stempel waktu tick-to-trade dari worker (epoch detik), mis. tick_at & decided_at.
+    timings: Optional[dict[str, float]] = None
 
     @validator("side")
     def validate_side(cls, value: str) -> str:
@@ -31,15 +32,18 @@ class OrderResponse(BaseModel):
     price: Optional[float]
     amount: float
     status: str
-    created_at: Optional[str] = None
+    created_at: Optional[datetime] = None
     is_strategy_order: bool
     strategy_id: Optional[int]
+    timings: Optional[dict[str, float]] = None
 
 
 class OrderSyncRequest(BaseModel):
     telegram_ids: list[int] | None = None
+    shard_count: int | None = Field(default=None, ge=1)
+    shards: list[int] | None = None
 
 
 class OrderSyncResponse(BaseModel):
     updated: int
-    details: list[dict[str, str]]
+    details: list[dict[str, Any]]
@@ -24,6 +24,14 @@ class StrategyExecutionLogRequest(BaseModel):
     detail: dict | None = None
 
 
+class StrategyExecutionBatchItem(StrategyExecutionLogRequest):
+    strategy_id: int
+
+
+class StrategyExecutionBatchRequest(BaseModel):
+    executions: list[StrategyExecutionBatchItem] = Field(default_factory=list)
+
+
 class GridRequest(BaseModel):
     telegram_id: int
     name: str = Field(default="Grid Strategy")
@@ -0,0 +1,25 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+
+class PauseScope(BaseModel):
+    scope: str = Field(default="global", pattern="^(global|pair|user|strategy_type)$")
+    target: Optional[str] = Field(
+        default=None, description="Pair, user_id, atau tipe strategi; kosong untuk global"
+    )
+
+    @model_validator(mode="after")
+    def validate_target(self) -> "PauseScope":
+        if self.scope == "global":
+            self.target = None
+        elif not self.target:
+            raise ValueError("target wajib untuk scope selain global")
+        elif self.scope == "user" and not self.target.isdigit():
+            raise ValueError("target scope user harus berupa user_id")
+        return self
+
+
+class PauseRequest(PauseScope):
+    reason: Optional[str] = None
+    source: Optional[str] = None
@@ -2,29 +2,26 @@ from __future__ import annotations
 
 from datetime import datetime
 
+from sqlalchemy import case, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
+from core.context import UserContext
 from core.models import PriceAlerts
-from core.repositories.user_repository import user_repository
 
 
 class AlertService:
     async def create_alert(
         self,
         session: AsyncSession,
-        telegram_id: int,
+        user: UserContext,
         pair: str,
         target_price: float,
         direction: str,
         repeat: bool = False,
     ) -> PriceAlerts:
-        user = await user_repository.get_by_telegram_id(session, telegram_id)
-        if not user:
-            raise ValueError("User tidak ditemukan")
-
         alert = PriceAlerts(
-            user_id=user.id,
+            user_id=user.user_id,
             pair=pair,
             target_price=target_price,
             direction=direction,
@@ -51,13 +48,10 @@ class AlertService:
         return enriched
 
     async def list_alerts_for_user(
-        self, session: AsyncSession, telegram_id: int
+        self, session: AsyncSession, user: UserContext
     ) -> list[dict]:
-        user = await user_repository.get_by_telegram_id(session, telegram_id)
-        if not user:
-            return []
         result = await session.execute(
-            select(PriceAlerts).where(PriceAlerts.user_id == user.id)
+            select(PriceAlerts).where(PriceAlerts.user_id == user.user_id)
         )
         return [alert.model_dump() for alert in result.scalars().all()]
 
@@ -80,5 +74,26 @@ class AlertService:
         await session.refresh(alert)
         return alert
 
+    async def mark_triggered_batch(
+        self, session: AsyncSession, alert_ids: list[int]
+    ) -> list[int]:
+        if not alert_ids:
+            return []
+        result = await session.execute(
+            update(PriceAlerts)
+            .where(PriceAlerts.id.in_(set(alert_ids)))
+            .values(
+                triggered_at=datetime.utcnow(),
+                is_triggered=case(
+                    (PriceAlerts.repeat.is_(True), PriceAlerts.is_triggered),
+                    else_=True,
+                ),
+            )
+            .returning(PriceAlerts.id)
+        )
+        updated = [row[0] for row in result.all()]
+        await session.commit()
+        return updated
+
 
 alert_service = AlertService()
@@ -11,11 +11,13 @@ import secrets
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.config import get_settings
+from core.context import UserContext
 from core.encryption import encrypt_value
 from core.indodax_private_client import private_client
 from core.models import Users
 from core.repositories.key_repository import user_key_repository
 from core.repositories.user_repository import user_repository
+from core.utils.token_cache import token_cache
 
 
 class AuthService:
@@ -109,8 +111,10 @@ class AuthService:
             api_secret_ciphertext=api_secret_cipher,
         )
 
+        previous_hash = user.api_token_hash
         raw_token, expires_at = await self._issue_new_token(session, user)
         await session.commit()
+        await token_cache.broadcast_invalidation(previous_hash)
         return user, raw_token, expires_at
 
     async def verify_user_token(
@@ -121,14 +125,50 @@ class AuthService:
     ) -> Users:
         token = self._extract_token(authorization_header)
         user = await user_repository.get_by_telegram_id(session, telegram_id)
+        self._check_token(user, token)
+        return user
+
+    def _check_token(self, user: Users | None, token: str) -> None:
+        self._check_token_hash(user, self._hash_token(token))
+
+    def _check_token_hash(self, user: Users | None, provided_hash: str) -> None:
         if not user or not user.api_token_hash:
             raise ValueError("Token pengguna tidak valid")
         if not user.api_token_expires_at or user.api_token_expires_at <= datetime.utcnow():
             raise ValueError("Token pengguna sudah kedaluwarsa")
-        provided_hash = self._hash_token(token)
         if not hmac.compare_digest(user.api_token_hash, provided_hash):
             raise ValueError("Token pengguna tidak valid")
-        return user
+
+    async def resolve_user_context(
+        self,
+        session: AsyncSession,
+        telegram_id: int,
+        authorization_header: Optional[str],
+        *,
+        verify_token: bool = True,
+    ) -> UserContext:
+        token_hash: str | None = None
+        generation = token_cache.generation
+        if verify_token:
+            token_hash = self._hash_token(self._extract_token(authorization_header))
+            cached = token_cache.get(token_hash, telegram_id)
+            if cached is not None:
+                return UserContext(user_id=cached.user_id, telegram_id=cached.telegram_id)
+        user, key = await user_repository.get_with_active_key(session, telegram_id)
+        if token_hash is not None:
+            self._check_token_hash(user, token_hash)
+            token_cache.put(
+                token_hash,
+                user_id=user.id,
+                telegram_id=user.telegram_id,
+                expires_at=user.api_token_expires_at,
+                generation=generation,
+            )
+        elif not user:
+            raise LookupError("User tidak ditemukan")
+        return UserContext(
+            user_id=user.id, telegram_id=user.telegram_id, key=key, key_loaded=True
+        )
 
     async def refresh_user_token(
         self,
@@ -137,8 +177,10 @@ class AuthService:
         authorization_header: Optional[str],
     ) -> tuple[str, datetime]:
         user = await self.verify_user_token(session, telegram_id, authorization_header)
+        previous_hash = user.api_token_hash
         raw_token, expires_at = await self._issue_new_token(session, user)
         await session.commit()
+        await token_cache.broadcast_invalidation(previous_hash)
         self._logger.info(
             "auth.token_rotated",
             extra={
@@ -156,6 +198,7 @@ class AuthService:
         authorization_header: Optional[str],
     ) -> None:
         user = await self.verify_user_token(session, telegram_id, authorization_header)
+        revoked_hash = user.api_token_hash
         await user_repository.update_api_token(
             session,
             user,
@@ -163,6 +206,7 @@ class AuthService:
             expires_at=None,
         )
         await session.commit()
+        await token_cache.broadcast_invalidation(revoked_hash)
         self._logger.info(
             "auth.token_revoked",
             extra={"user_id": user.id, "telegram_id": user.telegram_id},
@@ -176,6 +220,7 @@ class AuthService:
         user = await user_repository.get_by_telegram_id(session, telegram_id)
         if not user:
             raise ValueError("User tidak ditemukan")
+        revoked_hash = user.api_token_hash
         await user_repository.update_api_token(
             session,
             user,
@@ -183,6 +228,7 @@ class AuthService:
             expires_at=None,
         )
         await session.commit()
+        await token_cache.broadcast_invalidation(revoked_hash)
         self._logger.info(
             "auth.token_revoked_admin",
             extra={
@@ -6,22 +6,23 @@ from typing import Any
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
+from core.context import UserContext
 from core.encryption import decrypt_value
 from core.indodax_private_client import private_client
-from core.models import Orders, Users
+from core.models import Orders, Strategies, Users
 from core.repositories.key_repository import user_key_repository
-from core.repositories.user_repository import user_repository
 from core.services.notification_service import notification_service
 from core.services.safety_service import safety_service
-from core.utils.rate_limiter import allow_action
+from core.utils import rate_limiter
+from core.utils.nonce import nonce_manager
 
 
 class OrderService:
     async def create_order(
         self,
         session: AsyncSession,
+        user: UserContext,
         *,
-        telegram_id: int,
         pair: str,
         side: str,
         order_type: str,
@@ -29,31 +30,41 @@ class OrderService:
         price: float | None = None,
         is_strategy_order: bool = False,
         strategy_id: int | None = None,
+        timings: dict[str, float] | None = None,
     ) -> Orders:
-        user = await user_repository.get_by_telegram_id(session, telegram_id)
-        if not user:
-            raise ValueError("User belum terdaftar")
+        api_key, api_secret = await user.credentials(session)
 
-        safety_status = await safety_service.get_status()
-        if safety_status["paused"]:
-            reason = safety_status.get("reason") or "Trading sedang dijeda"
-            raise ValueError(reason)
+        # Status safety, rate limit, dan nonce dikirim dalam satu round trip.
+        snapshot = safety_service.cached_snapshot()
+        async with rate_limiter.pipeline() as pipe:
+            if snapshot is None:
+                safety_service.queue_status(pipe)
+            await rate_limiter.queue_check(pipe, "orders", user.user_id)
+            await nonce_manager.queue_reserve(pipe, user.user_id)
+            results = await pipe.execute()
 
-        key = await user_key_repository.get_active_key(session, user.id)
-        if not key:
-            raise ValueError("User belum menghubungkan API key")
-
-        allowed = await allow_action(user.id, "order", limit=30, window_seconds=60)
-        if not allowed:
-            raise ValueError("Terlalu banyak order dalam waktu singkat")
+        if snapshot is None:
+            snapshot = safety_service.parse_snapshot(results.pop(0))
+        rate = rate_limiter.parse_result(results[0])
+        nonce = int(results[1])
 
         if is_strategy_order and not strategy_id:
             raise ValueError("strategy_id wajib untuk order strategi")
         if not is_strategy_order:
             strategy_id = None
 
-        api_key = decrypt_value(key.api_key_nonce, key.api_key_ciphertext)
-        api_secret = decrypt_value(key.api_secret_nonce, key.api_secret_ciphertext)
+        strategy_type: str | None = None
+        if strategy_id and any(key.startswith("strategy_type:") for key in snapshot):
+            # Tipe strategi hanya dibaca bila memang ada pause per tipe strategi.
+            strategy = await session.get(Strategies, strategy_id)
+            strategy_type = strategy.type if strategy else None
+        paused = safety_service.blocking(
+            snapshot, pair=pair, user_id=user.user_id, strategy_type=strategy_type
+        )
+        if paused is not None:
+            raise ValueError(paused.get("reason") or "Trading sedang dijeda")
+        if not rate.allowed:
+            raise rate_limiter.RateLimitExceeded("orders", rate.retry_after)
 
         params: dict[str, Any] = {
             "pair": pair.lower(),
@@ -66,15 +77,17 @@ class OrderService:
             params["type"] = f"{side}_market"
 
         response = await private_client.call(
-            user_id=user.id,
+            user_id=user.user_id,
             method="trade",
             params=params,
             api_key=api_key,
             api_secret=api_secret,
+            nonce=nonce,
+            timings=timings,
         )
 
         order = Orders(
-            user_id=user.id,
+            user_id=user.user_id,
             indodax_order_id=str(response.get("return", {}).get("order_id")),
             pair=pair.upper(),
             side=side,
@@ -114,15 +127,14 @@ class OrderService:
     async def get_open_orders(
         self,
         session: AsyncSession,
-        telegram_id: int,
+        user: UserContext,
         *,
         pair: str | None = None,
         strategy_id: int | None = None,
     ) -> list[Orders]:
-        user = await user_repository.get_by_telegram_id(session, telegram_id)
-        if not user:
-            return []
-        query = select(Orders).where(Orders.user_id == user.id, Orders.status == "open")
+        query = select(Orders).where(
+            Orders.user_id == user.user_id, Orders.status == "open"
+        )
         if pair:
             query = query.where(Orders.pair == pair.upper())
         if strategy_id is not None:
@@ -130,31 +142,48 @@ class OrderService:
         result = await session.execute(query)
         return list(result.scalars().all())
 
+    async def get_open_strategy_orders(
+        self,
+        session: AsyncSession,
+        *,
+        strategy_ids: list[int] | None = None,
+        strategy_type: str | None = None,
+    ) -> dict[int, list[Orders]]:
+        if not strategy_ids and not strategy_type:
+            return {}
+        query = select(Orders).where(
+            Orders.status == "open",
+            Orders.is_strategy_order.is_(True),
+        )
+        if strategy_ids:
+            query = query.where(Orders.strategy_id.in_(strategy_ids))
+        if strategy_type:
+            query = query.join(Strategies, Orders.strategy_id == Strategies.id).where(
+                Strategies.type == strategy_type,
+                Strategies.is_active.is_(True),
+            )
+        result = await session.execute(query)
+        grouped: dict[int, list[Orders]] = {}
+        for order in result.scalars().all():
+            grouped.setdefault(order.strategy_id, []).append(order)
+        return grouped
+
     async def cancel_order(
-        self, session: AsyncSession, telegram_id: int, order_id: int
+        self, session: AsyncSession, user: UserContext, order_id: int
     ) -> Orders:
-        from sqlmodel import select
-
-        user = await user_repository.get_by_telegram_id(session, telegram_id)
-        if not user:
-            raise ValueError("User tidak ditemukan")
-
         result = await session.execute(
-            select(Orders).where(Orders.id == order_id, Orders.user_id == user.id)
+            select(Orders).where(Orders.id == order_id, Orders.user_id == user.user_id)
         )
         order = result.scalar_one_or_none()
         if not order:
             raise ValueError("Order tidak ditemukan")
 
-        key = await user_key_repository.get_active_key(session, user.id)
-        if not key:
+        if not await user.active_key(session):
             raise ValueError("API key tidak tersedia")
-
-        api_key = decrypt_value(key.api_key_nonce, key.api_key_ciphertext)
-        api_secret = decrypt_value(key.api_secret_nonce, key.api_secret_ciphertext)
+        api_key, api_secret = await user.credentials(session)
 
         await private_client.call(
-            user_id=user.id,
+            user_id=user.user_id,
             method="cancelOrder",
             params={"order_id": order.indodax_order_id, "pair": order.pair.lower()},
             api_key=api_key,
@@ -171,6 +200,8 @@ class OrderService:
         session: AsyncSession,
         *,
         telegram_ids: list[int] | None = None,
+        shard_count: int | None = None,
+        shards: list[int] | None = None,
     ) -> dict[str, Any]:
         query = (
             select(Orders, Users)
@@ -179,10 +210,12 @@ class OrderService:
         )
         if telegram_ids:
             query = query.where(Users.telegram_id.in_(telegram_ids))
+        if shard_count and shards is not None:
+            query = query.where((Orders.user_id % shard_count).in_(shards))
         result = await session.execute(query)
         rows = result.all()
         notifications: list[tuple[int, str]] = []
-        details: list[dict[str, str]] = []
+        details: list[dict[str, Any]] = []
         updated = 0
 
         for order, user in rows:
@@ -220,6 +253,11 @@ class OrderService:
             details.append({
                 "order_id": str(order.id),
                 "status": "filled",
+                "pair": order.pair,
+                "side": order.side,
+                "price": order.price,
+                "is_strategy_order": order.is_strategy_order,
+                "strategy_id": order.strategy_id,
             })
             price_display = (
                 f"@ {order.price:,.0f} IDR" if order.price else "pasar"
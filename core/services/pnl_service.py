@@ -4,24 +4,19 @@ from typing import Any
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.encryption import decrypt_value
+from core.context import UserContext
 from core.indodax_private_client import private_client
-from core.repositories.key_repository import user_key_repository
-from core.repositories.user_repository import user_repository
 
 
 class PnLService:
-    async def get_realized_pnl(self, session: AsyncSession, telegram_id: int) -> dict[str, Any]:
-        user = await user_repository.get_by_telegram_id(session, telegram_id)
-        if not user:
+    async def get_realized_pnl(
+        self, session: AsyncSession, user: UserContext
+    ) -> dict[str, Any]:
+        if not await user.active_key(session):
             return {"pairs": []}
-        key = await user_key_repository.get_active_key(session, user.id)
-        if not key:
-            return {"pairs": []}
-        api_key = decrypt_value(key.api_key_nonce, key.api_key_ciphertext)
-        api_secret = decrypt_value(key.api_secret_nonce, key.api_secret_ciphertext)
+        api_key, api_secret = await user.credentials(session)
         history = await private_client.call(
-            user_id=user.id,
+            user_id=user.user_id,
             method="tradeHistory",
             params={"count": 50},
             api_key=api_key,
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import logging
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from core.config import get_settings
+from core.database import engine
+from core.utils.metrics import RETENTION_ARCHIVED_ROWS, RETENTION_DEFAULT_ROWS, RETENTION_PARTITIONS
+
+logger = logging.getLogger(__name__)
+
+# Tabel riwayat yang dipartisi per bulan pada created_at (migrasi 0005).
+PARTITIONED_TABLES = ("strategy_executions", "telemetry_events", "audit_logs")
+
+# Kunci advisory lock Postgres agar hanya satu proses core yang menjalankan retensi.
+_LOCK_KEY = 0x52455445
+
+
+def month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def parse_partition(table: str, name: str) -> datetime | None:
+    match = re.fullmatch(rf"{table}_p(\d{{4}})(\d{{2}})", name)
+    if not match:
+        return None
+    return datetime(int(match.group(1)), int(match.group(2)), 1)
+
+
+def plan(
+    table: str,
+    existing: list[str],
+    now: datetime,
+    *,
+    retention_months: int,
+    premake_months: int,
+) -> dict[str, list]:
+    """Partisi yang perlu dibuat (bulan) dan yang sudah lewat masa retensi (nama)."""
+    current = month_start(now)
+    months = {parse_partition(table, name): name for name in existing}
+    months.pop(None, None)
+    create = [
+        month
+        for month in (add_months(current, offset) for offset in range(premake_months + 1))
+        if month not in months
+    ]
+    cutoff = add_months(current, -retention_months)
+    expire = [name for month, name in sorted(months.items()) if month < cutoff]
+    return {"create": create, "expire": expire}
+
+
+class RetentionService:
+    """Menjaga partisi bulanan tabel riwayat: buat di muka, arsipkan, lalu drop yang lama."""
+
+    def __init__(self) -> None:
+        settings = get_settings()
+        self._enabled = settings.retention_enabled
+        self._interval = settings.retention_interval_seconds
+        self._premake = settings.retention_premake_months
+        self._archive_dir = (
+            Path(settings.retention_archive_dir) if settings.retention_archive_dir else None
+        )
+        self.retention = {
+            table: getattr(settings, f"retention_{table}_months") for table in PARTITIONED_TABLES
+        }
+        self.last_report: dict[str, Any] | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    async def start(self) -> None:
+        if self._enabled and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.run()
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Retensi partisi gagal", extra={"error": str(exc)})
+            await asyncio.sleep(self._interval)
+
+    async def run(self, now: datetime | None = None) -> dict[str, Any]:
+        now = now or datetime.utcnow()
+        report: dict[str, Any] = {"ran_at": now.isoformat(), "locked": False, "tables": {}}
+        async with engine.connect() as conn:
+            locked = await conn.scalar(text("SELECT pg_try_advisory_lock(:key)"), {"key": _LOCK_KEY})
+            await conn.commit()
+            if not locked:
+                logger.info("Retensi partisi sedang dijalankan proses lain")
+                report["locked"] = True
+                return report
+            try:
+                for table in PARTITIONED_TABLES:
+                    report["tables"][table] = await self._maintain(conn, table, now)
+            finally:
+                # Lock level sesi ikut kembali ke pool bila tidak dilepas eksplisit.
+                await conn.rollback()
+                await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _LOCK_KEY})
+                await conn.commit()
+        self.last_report = report
+        return report
+
+    async def _maintain(self, conn: AsyncConnection, table: str, now: datetime) -> dict[str, Any]:
+        result = await conn.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "WHERE parent.relname = :table"
+            ),
+            {"table": table},
+        )
+        existing = [row[0] for row in result]
+        await conn.commit()
+        steps = plan(
+            table,
+            existing,
+            now,
+            retention_months=self.retention[table],
+            premake_months=self._premake,
+        )
+        summary: dict[str, Any] = {"created": [], "archived": [], "dropped": []}
+        for month in steps["create"]:
+            await self.create_partition(conn, table, month)
+            summary["created"].append(partition_name(table, month))
+        if steps["expire"] and self._archive_dir is None:
+            logger.warning(
+                "RETENTION_ARCHIVE_DIR kosong; partisi lama tidak dihapus",
+                extra={"table": table, "partitions": steps["expire"]},
+            )
+        elif steps["expire"]:
+            for partition in steps["expire"]:
+                archive = await self.expire_partition(conn, table, partition)
+                summary["archived"].append(archive)
+                summary["dropped"].append(partition)
+        stray = await conn.scalar(text(f"SELECT count(*) FROM {table}_default"))
+        await conn.commit()
+        RETENTION_DEFAULT_ROWS.labels(table).set(stray)
+        if stray:
+            logger.warning(
+                "Baris di partisi default; periksa created_at di luar rentang",
+                extra={"table": table, "rows": stray},
+            )
+        summary["default_rows"] = stray
+        return summary
+
+    async def create_partition(self, conn: AsyncConnection, table: str, month: datetime) -> None:
+        """Buat partisi bulan lalu pindahkan baris bulan itu yang terlanjur masuk partisi default."""
+        name = partition_name(table, month)
+        start, end = f"{month:%Y-%m-%d}", f"{add_months(month, 1):%Y-%m-%d}"
+        bounds = "created_at >= :start AND created_at < :end"
+        params = {"start": month, "end": add_months(month, 1)}
+        async with conn.begin():
+            await conn.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)"))
+            await conn.execute(
+                text(f"INSERT INTO {name} SELECT * FROM {table}_default WHERE {bounds}"), params
+            )
+            await conn.execute(text(f"DELETE FROM {table}_default WHERE {bounds}"), params)
+            await conn.execute(
+                text(
+                    f"ALTER TABLE {table} ATTACH PARTITION {name} "
+                    f"FOR VALUES FROM ('{start}') TO ('{end}')"
+                )
+            )
+        RETENTION_PARTITIONS.labels(table, "created").inc()
+        logger.info("Partisi dibuat", extra={"table": table, "partition": name})
+
+    async def expire_partition(
+        self, conn: AsyncConnection, table: str, partition: str
+    ) -> dict[str, Any]:
+        """Ekspor partisi ke CSV gzip; partisi hanya di-drop setelah arsip tersimpan utuh."""
+        path = self._archive_dir / table / f"{partition}.csv.gz"
+        rows = await self._export(conn, partition, path)
+        async with conn.begin():
+            await conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {partition}"))
+            await conn.execute(text(f"DROP TABLE {partition}"))
+        RETENTION_PARTITIONS.labels(table, "dropped").inc()
+        RETENTION_ARCHIVED_ROWS.labels(table).inc(rows)
+        logger.info(
+            "Partisi diarsipkan dan dihapus",
+            extra={"table": table, "partition": partition, "rows": rows, "path": str(path)},
+        )
+        return {"partition": partition, "rows": rows, "path": str(path), "bytes": path.stat().st_size}
+
+    async def _export(self, conn: AsyncConnection, partition: str, path: Path) -> int:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        staging = path.with_name(path.name + ".part")
+        archive = gzip.open(staging, "wb")
+
+        async def write(chunk: bytes) -> None:
+            # Kompresi dijalankan di thread agar event loop tidak tertahan.
+            await asyncio.to_thread(archive.write, chunk)
+
+        try:
+            raw = await conn.get_raw_connection()
+            status = await raw.driver_connection.copy_from_table(
+                partition, output=write, format="csv", header=True
+            )
+            await conn.commit()
+            await asyncio.to_thread(_seal, archive, staging, path)
+        except BaseException:
+            archive.close()
+            staging.unlink(missing_ok=True)
+            raise
+        return int(status.split()[-1])
+
+
+def _seal(archive: gzip.GzipFile, staging: Path, path: Path) -> None:
+    archive.close()
+    with open(staging, "rb") as handle:
+        os.fsync(handle.fileno())
+    os.replace(staging, path)
+
+
+retention_service = RetentionService()
@@ -1,48 +1,185 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import logging
+import time
 from datetime import datetime
 from typing import Any
 
-import redis.asyncio as redis
+from redis.asyncio.client import Pipeline
 
 from core.config import get_settings
+from core.utils.redis_client import redis_manager
+from core.utils.upstream import upstream_telemetry
+
+logger = logging.getLogger(__name__)
+
+
+SCOPES = ("global", "pair", "user", "strategy_type")
+
+
+def scope_key(scope: str = "global", target: Any = None) -> str:
+    """Field hash untuk satu scope pause, mis. ``pair:BTCIDR`` atau ``user:42``."""
+    if scope == "global":
+        return "global"
+    if scope not in SCOPES or target in (None, ""):
+        raise ValueError("Scope pause tidak valid")
+    if scope == "pair":
+        target = str(target).upper()
+    elif scope == "strategy_type":
+        target = str(target).lower()
+    else:
+        target = int(target)
+    return f"{scope}:{target}"
+
+
+def is_newer(candidate: str | None, current: str | None) -> bool:
+    """Bandingkan ``updated_at`` dua status pause; tanpa pembanding dianggap lebih baru."""
+    if current is None:
+        return True
+    if candidate is None:
+        return False
+    return datetime.fromisoformat(candidate) > datetime.fromisoformat(current)
 
 
 class SafetyService:
+    channel = "safety:deadman:events"
+
     def __init__(self) -> None:
         settings = get_settings()
-        self._redis = redis.from_url(str(settings.redis_url), decode_responses=True)
-        self._key = "safety:deadman"
-
-    async def pause(self, *, reason: str, source: str | None = None) -> dict[str, Any]:
-        data = {
-            "paused": True,
-            "reason": reason,
-            "source": source or "unknown",
-            "updated_at": datetime.utcnow().isoformat(),
-        }
-        await self._redis.set(self._key, json.dumps(data))
-        return data
-
-    async def resume(self) -> dict[str, Any]:
-        data = {
-            "paused": False,
-            "reason": None,
-            "source": None,
-            "updated_at": datetime.utcnow().isoformat(),
-        }
-        await self._redis.set(self._key, json.dumps(data))
-        return data
+        self._redis = redis_manager.client
+        self._key = "safety:pauses"
+        self._legacy_key = "safety:deadman"
+        self._refresh_seconds = settings.safety_refresh_seconds
+        self._slo_check_seconds = settings.indodax_slo_check_seconds
+        self._slo_auto_pause = settings.indodax_slo_auto_pause
+        self._status: dict[str, Any] | None = None
+        self._scopes: dict[str, dict[str, Any]] = {}
+        # scope_key -> (waktu monotonic, updated_at) event pub/sub terakhir yang diterapkan.
+        self._events: dict[str, tuple[float, str | None]] = {}
+        self._listening = False
+        self._tasks: list[asyncio.Task[None]] = []
+
+    def _apply(self, raw: str) -> dict[str, Any]:
+        entry = self.parse_status(raw)
+        key = entry["scope_key"]
+        self._events[key] = (time.monotonic(), entry["updated_at"])
+        if key == "global":
+            self._status = entry
+        elif entry["paused"]:
+            self._scopes[key] = entry
+        else:
+            self._scopes.pop(key, None)
+        return entry
+
+    async def _store(self, key: str, data: dict[str, Any]) -> dict[str, Any]:
+        raw = json.dumps({**data, "scope_key": key})
+        async with self._redis.pipeline(transaction=True) as pipe:
+            if key == "global" or data["paused"]:
+                pipe.hset(self._key, key, raw)
+            else:
+                pipe.hdel(self._key, key)
+            pipe.publish(self.channel, raw)
+            await pipe.execute()
+        return self._apply(raw)
+
+    async def pause(
+        self,
+        *,
+        reason: str,
+        source: str | None = None,
+        scope: str = "global",
+        target: Any = None,
+    ) -> dict[str, Any]:
+        return await self._store(
+            scope_key(scope, target),
+            {
+                "paused": True,
+                "reason": reason,
+                "source": source or "unknown",
+                "updated_at": datetime.utcnow().isoformat(),
+            },
+        )
+
+    async def resume(self, *, scope: str = "global", target: Any = None) -> dict[str, Any]:
+        return await self._store(
+            scope_key(scope, target),
+            {
+                "paused": False,
+                "reason": None,
+                "source": None,
+                "updated_at": datetime.utcnow().isoformat(),
+            },
+        )
+
+    def cached_status(self) -> dict[str, Any] | None:
+        """Status global di memori; ``None`` bila listener belum tersambung."""
+        if not self._listening or self._status is None:
+            return None
+        return dict(self._status)
+
+    def cached_snapshot(self) -> dict[str, dict[str, Any]] | None:
+        """Semua scope yang dijeda (plus ``global``) dari memori; ``None`` tanpa listener."""
+        status = self.cached_status()
+        if status is None:
+            return None
+        return {"global": status, **self._scopes}
+
+    def queue_status(self, pipe: Pipeline) -> None:
+        pipe.hgetall(self._key)
+
+    async def get_snapshot(self) -> dict[str, dict[str, Any]]:
+        cached = self.cached_snapshot()
+        if cached is not None:
+            return cached
+        return self.parse_snapshot(await self._redis.hgetall(self._key))
 
     async def get_status(self) -> dict[str, Any]:
-        raw = await self._redis.get(self._key)
+        snapshot = await self.get_snapshot()
+        status = dict(snapshot.pop("global"))
+        status["scopes"] = list(snapshot.values())
+        return status
+
+    @staticmethod
+    def blocking(
+        snapshot: dict[str, dict[str, Any]],
+        *,
+        pair: str | None = None,
+        user_id: int | None = None,
+        strategy_type: str | None = None,
+    ) -> dict[str, Any] | None:
+        """Pause pertama yang berlaku untuk order ini, dari scope terluas."""
+        keys = ["global"]
+        if pair:
+            keys.append(scope_key("pair", pair))
+        if user_id is not None:
+            keys.append(scope_key("user", user_id))
+        if strategy_type:
+            keys.append(scope_key("strategy_type", strategy_type))
+        for key in keys:
+            entry = snapshot.get(key)
+            if entry and entry["paused"]:
+                return entry
+        return None
+
+    @classmethod
+    def parse_snapshot(cls, raw: dict[str, str] | None) -> dict[str, dict[str, Any]]:
+        snapshot = {key: cls.parse_status(value) for key, value in (raw or {}).items()}
+        snapshot.setdefault("global", cls.parse_status(None))
+        return {
+            key: entry for key, entry in snapshot.items() if key == "global" or entry["paused"]
+        }
+
+    @staticmethod
+    def parse_status(raw: str | None) -> dict[str, Any]:
         if not raw:
             return {
                 "paused": False,
                 "reason": None,
                 "source": None,
                 "updated_at": None,
+                "scope_key": "global",
             }
         data = json.loads(raw)
         return {
@@ -50,7 +187,111 @@ class SafetyService:
             "reason": data.get("reason"),
             "source": data.get("source"),
             "updated_at": data.get("updated_at"),
+            "scope_key": data.get("scope_key", "global"),
         }
 
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._listen()),
+            asyncio.create_task(self._refresh_loop()),
+        ]
+        if self._slo_auto_pause:
+            self._tasks.append(asyncio.create_task(self._watch_upstream()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._listening = False
+
+    async def _refresh(self) -> None:
+        started = time.monotonic()
+        raw = await self._redis.hgetall(self._key)
+        if "global" not in raw:
+            # Pindahkan status global dari key lama (sebelum ada scope) bila masih ada.
+            legacy = await self._redis.get(self._legacy_key)
+            if legacy:
+                await self._redis.hsetnx(self._key, "global", legacy)
+                await self._redis.delete(self._legacy_key)
+                raw = await self._redis.hgetall(self._key)
+        snapshot = self._merge(self.parse_snapshot(raw), started)
+        self._status = snapshot.pop("global")
+        self._scopes = snapshot
+
+    def _merge(
+        self, snapshot: dict[str, dict[str, Any]], started: float
+    ) -> dict[str, dict[str, Any]]:
+        """Snapshot bisa lebih tua dari event pub/sub yang tiba selama dibaca; event itu menang."""
+        current = dict(self._scopes)
+        if self._status is not None:
+            current["global"] = self._status
+        for key, (applied_at, updated_at) in list(self._events.items()):
+            if applied_at < started:
+                del self._events[key]
+                continue
+            fresh = snapshot.get(key)
+            if fresh is not None and is_newer(fresh["updated_at"], updated_at):
+                continue
+            if key in current:
+                snapshot[key] = current[key]
+            else:
+                snapshot.pop(key, None)
+        return snapshot
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._refresh_seconds)
+            try:
+                await self._refresh()
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Gagal membaca ulang status safety", extra={"error": str(exc)})
+
+    async def check_upstream(self) -> dict[str, Any] | None:
+        """Jeda trading bila error budget Indodax terlampaui terus-menerus."""
+        breaches = upstream_telemetry.breaches()
+        if not breaches:
+            return None
+        status = await self.get_status()
+        if status["paused"]:
+            return None
+        worst = max(breaches, key=lambda item: item["error_rate"])
+        reason = (
+            f"Error budget Indodax terlampaui: {worst['api']} {worst['method']} "
+            f"error {worst['error_rate']:.0%}, p99 {worst['p99_ms'] or 0:.0f} ms"
+        )
+        logger.error("Error budget Indodax terlampaui", extra={"breaches": breaches})
+        return await self.pause(reason=reason, source="indodax_slo")
+
+    async def _watch_upstream(self) -> None:
+        while True:
+            await asyncio.sleep(self._slo_check_seconds)
+            try:
+                await self.check_upstream()
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Gagal mengevaluasi SLO Indodax", extra={"error": str(exc)})
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                # Baca ulang setelah subscribe agar event di antara keduanya tidak hilang.
+                await self._refresh()
+                self._listening = True
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._apply(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Listener status safety terputus", extra={"error": str(exc)})
+            finally:
+                self._listening = False
+                await pubsub.aclose()
+            await asyncio.sleep(1)
+
 
 safety_service = SafetyService()
@@ -3,19 +3,19 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Any
 
-from sqlalchemy import func
+from sqlalchemy import func, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
+from core.context import UserContext
 from core.models import Strategies, StrategyExecutions
-from core.repositories.user_repository import user_repository
 
 
 class StrategyService:
     async def create_or_update_dca(
         self,
         session: AsyncSession,
-        telegram_id: int,
+        user: UserContext,
         *,
         name: str,
         pair: str,
@@ -24,10 +24,6 @@ class StrategyService:
         execution_time: str,
         max_runs: int | None,
     ) -> Strategies:
-        user = await user_repository.get_by_telegram_id(session, telegram_id)
-        if not user:
-            raise ValueError("User tidak ditemukan")
-
         config = {
             "type": "dca",
             "amount": amount,
@@ -39,7 +35,7 @@ class StrategyService:
 
         result = await session.execute(
             select(Strategies).where(
-                Strategies.user_id == user.id,
+                Strategies.user_id == user.user_id,
                 Strategies.type == "dca",
                 Strategies.pair == pair,
                 Strategies.name == name,
@@ -51,7 +47,7 @@ class StrategyService:
             strategy.is_active = True
         else:
             strategy = Strategies(
-                user_id=user.id,
+                user_id=user.user_id,
                 type="dca",
                 name=name,
                 pair=pair,
@@ -67,7 +63,7 @@ class StrategyService:
     async def create_grid(
         self,
         session: AsyncSession,
-        telegram_id: int,
+        user: UserContext,
         *,
         name: str,
         pair: str,
@@ -76,10 +72,6 @@ class StrategyService:
         grid_count: int,
         order_size: float,
     ) -> Strategies:
-        user = await user_repository.get_by_telegram_id(session, telegram_id)
-        if not user:
-            raise ValueError("User tidak ditemukan")
-
         config = {
             "type": "grid",
             "lower_price": lower_price,
@@ -88,7 +80,7 @@ class StrategyService:
             "order_size": order_size,
         }
         strategy = Strategies(
-            user_id=user.id,
+            user_id=user.user_id,
             type="grid",
             name=name,
             pair=pair,
@@ -103,7 +95,7 @@ class StrategyService:
     async def create_tp_sl(
         self,
         session: AsyncSession,
-        telegram_id: int,
+        user: UserContext,
         *,
         name: str,
         pair: str,
@@ -112,10 +104,6 @@ class StrategyService:
         stop_loss_pct: float,
         amount: float,
     ) -> Strategies:
-        user = await user_repository.get_by_telegram_id(session, telegram_id)
-        if not user:
-            raise ValueError("User tidak ditemukan")
-
         config = {
             "type": "tp_sl",
             "take_profit_pct": take_profit_pct,
@@ -124,7 +112,7 @@ class StrategyService:
             "entry_price": entry_price,
         }
         strategy = Strategies(
-            user_id=user.id,
+            user_id=user.user_id,
             type="tp_sl",
             name=name,
             pair=pair,
@@ -136,15 +124,14 @@ class StrategyService:
         await session.refresh(strategy)
         return strategy
 
-    async def stop_strategy(self, session: AsyncSession, telegram_id: int, strategy_id: int) -> Strategies:
+    async def stop_strategy(self, session: AsyncSession, user: UserContext, strategy_id: int) -> Strategies:
         result = await session.execute(
             select(Strategies).where(Strategies.id == strategy_id)
         )
         strategy = result.scalar_one_or_none()
         if not strategy:
             raise ValueError("Strategi tidak ditemukan")
-        user = await user_repository.get_by_telegram_id(session, telegram_id)
-        if not user or strategy.user_id != user.id:
+        if strategy.user_id != user.user_id:
             raise ValueError("Tidak berhak menghentikan strategi")
         strategy.is_active = False
         await session.commit()
@@ -171,6 +158,29 @@ class StrategyService:
         await session.refresh(execution)
         return execution
 
+    async def log_executions_batch(
+        self,
+        session: AsyncSession,
+        entries: list[dict[str, Any]],
+    ) -> int:
+        if not entries:
+            return 0
+        now = datetime.utcnow()
+        rows = [
+            {
+                "strategy_id": entry["strategy_id"],
+                "user_id": entry["user_id"],
+                "status": entry["status"],
+                "detail": entry.get("detail") or {},
+                "run_at": now,
+                "created_at": now,
+            }
+            for entry in entries
+        ]
+        await session.execute(insert(StrategyExecutions), rows)
+        await session.commit()
+        return len(rows)
+
     async def list_active_by_type(
         self, session: AsyncSession, strategy_type: str
     ) -> list[dict[str, Any]]:
@@ -189,13 +199,10 @@ class StrategyService:
         return data
 
     async def list_by_user(
-        self, session: AsyncSession, telegram_id: int
+        self, session: AsyncSession, user: UserContext
     ) -> list[dict[str, Any]]:
-        user = await user_repository.get_by_telegram_id(session, telegram_id)
-        if not user:
-            return []
         result = await session.execute(
-            select(Strategies).where(Strategies.user_id == user.id)
+            select(Strategies).where(Strategies.user_id == user.user_id)
         )
         return [strategy.model_dump() for strategy in result.scalars().all()]
 
@@ -206,6 +213,7 @@ class StrategyService:
             select(StrategyExecutions)
             .where(StrategyExecutions.strategy_id == strategy_id)
             .order_by(StrategyExecutions.created_at.desc())
+            .limit(1)
         )
         return result.scalars().first()
 
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import uuid
+from typing import Any, Awaitable, Callable
+
+import httpx
+
+from core.config import get_settings
+from core.utils.redis_client import redis_manager
+
+_settings = get_settings()
+
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class IdempotencyConflictError(ValueError):
+    pass
+
+
+class IdempotencyInProgressError(RuntimeError):
+    pass
+
+
+class IdempotencyUpstreamError(RuntimeError):
+    """Indodax tidak merespons; status order tidak diketahui sehingga tidak boleh diulang."""
+
+
+class IdempotencyStore:
+    def __init__(self) -> None:
+        self._client = redis_manager.client
+        self._ttl = _settings.idempotency_ttl_seconds
+        self._lock_ttl = _settings.idempotency_lock_ttl_seconds
+        self._release = self._client.register_script(_RELEASE_SCRIPT)
+        self._inflight: dict[str, asyncio.Future[None]] = {}
+
+    @staticmethod
+    def fingerprint(payload: dict[str, Any]) -> str:
+        raw = json.dumps(payload, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def run(
+        self,
+        scope: str,
+        key: str | None,
+        fingerprint: str,
+        func: Callable[[], Awaitable[dict[str, Any]]],
+    ) -> dict[str, Any]:
+        """Jalankan ``func`` sekali per key; duplikat menunggu dan menerima hasil yang sama."""
+        if not key:
+            return await func()
+        result_key = f"idempotency:{scope}:{key}"
+        lock_key = f"{result_key}:lock"
+        token = uuid.uuid4().hex
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._lock_ttl
+        delay = 0.05
+        while True:
+            cached = await self._client.get(result_key)
+            if cached:
+                entry = json.loads(cached)
+                if entry["fingerprint"] != fingerprint:
+                    raise IdempotencyConflictError(
+                        "Idempotency-Key sudah dipakai untuk permintaan berbeda"
+                    )
+                if "upstream_error" in entry:
+                    raise IdempotencyUpstreamError(entry["upstream_error"])
+                return entry["response"]
+            local = self._inflight.get(result_key)
+            if local is None and await self._client.set(
+                lock_key, token, nx=True, px=self._lock_ttl * 1000
+            ):
+                break
+            if loop.time() >= deadline:
+                raise IdempotencyInProgressError(
+                    "Permintaan dengan Idempotency-Key yang sama masih diproses"
+                )
+            if local is not None:
+                await asyncio.wait({local}, timeout=deadline - loop.time())
+                continue
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 1.0)
+
+        done: asyncio.Future[None] = loop.create_future()
+        self._inflight[result_key] = done
+        try:
+            try:
+                response = await func()
+            except httpx.HTTPError as exc:
+                # Order mungkin sudah masuk di Indodax; simpan hasil ambigu agar tidak dieksekusi ulang.
+                detail = f"Indodax tidak merespons: {str(exc) or type(exc).__name__}"
+                entry = json.dumps({"fingerprint": fingerprint, "upstream_error": detail})
+                await self._client.set(result_key, entry, ex=self._ttl)
+                raise IdempotencyUpstreamError(detail) from exc
+            entry = json.dumps(
+                {"fingerprint": fingerprint, "response": response}, default=str
+            )
+            await self._client.set(result_key, entry, ex=self._ttl)
+            return response
+        finally:
+            self._inflight.pop(result_key, None)
+            done.set_result(None)
+            await self._release(keys=[lock_key], args=[token])
+
+
+idempotency_store = IdempotencyStore()
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Bucket dipilih untuk rentang milidetik (Redis) sampai detik (Indodax).
+_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "core_http_request_duration_seconds",
+    "Latensi request HTTP per route",
+    ("method", "route"),
+    buckets=_BUCKETS,
+)
+HTTP_RESPONSES = Counter(
+    "core_http_responses_total",
+    "Jumlah respons HTTP per route dan status",
+    ("method", "route", "status"),
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "core_db_pool_checkout_seconds",
+    "Waktu tunggu mengambil koneksi dari pool SQLAlchemy",
+    buckets=_BUCKETS,
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "core_db_pool_connections",
+    "Koneksi pool SQLAlchemy per pool dan status (in_use, idle, overflow)",
+    ("pool", "state"),
+)
+DB_READ_ROUTING = Counter(
+    "core_db_read_sessions_total",
+    "Sesi baca per tujuan (replica/primary) dan alasan",
+    ("target", "reason"),
+)
+DB_POOL_TIMEOUTS = Counter(
+    "core_db_pool_timeouts_total", "Checkout pool yang gagal karena melewati pool timeout"
+)
+RETENTION_PARTITIONS = Counter(
+    "core_retention_partitions_total",
+    "Partisi tabel riwayat yang dibuat atau diarsipkan lalu dihapus",
+    ["table", "action"],
+)
+RETENTION_ARCHIVED_ROWS = Counter(
+    "core_retention_archived_rows_total", "Baris yang diarsipkan sebelum partisi dihapus", ["table"]
+)
+RETENTION_DEFAULT_ROWS = Gauge(
+    "core_retention_default_partition_rows",
+    "Baris di partisi default (created_at di luar rentang partisi bulanan)",
+    ["table"],
+)
+REDIS_COMMAND_SECONDS = Histogram(
+    "core_redis_command_duration_seconds",
+    "Latensi perintah Redis",
+    ("command",),
+    buckets=_BUCKETS,
+)
+INDODAX_REQUEST_SECONDS = Histogram(
+    "core_indodax_request_duration_seconds",
+    "Latensi panggilan API Indodax per method",
+    ("api", "method", "outcome"),
+    buckets=_BUCKETS,
+)
+INDODAX_RESPONSES = Counter(
+    "core_indodax_responses_total",
+    "Jumlah respons Indodax per method dan status HTTP",
+    ("api", "method", "status"),
+)
+INDODAX_ERRORS = Counter(
+    "core_indodax_errors_total",
+    "Jumlah error Indodax per method dan pesan (angka dinormalisasi)",
+    ("api", "method", "error"),
+)
+
+
+def render() -> tuple[bytes, str]:
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """Middleware ASGI murni; label route memakai template path agar kardinalitas tetap kecil."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route: Any = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            HTTP_REQUEST_SECONDS.labels(method, path).observe(time.perf_counter() - started)
+            HTTP_RESPONSES.labels(method, path, str(status)).inc()
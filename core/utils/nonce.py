@@ -1,29 +1,36 @@
-import asyncio
-from typing import Optional
+from __future__ import annotations
 
-import redis.asyncio as redis
+from redis.asyncio.client import Pipeline
 
-from core.config import get_settings
+from core.utils.redis_client import redis_manager
 
-_settings = get_settings()
+# INCR dan perpanjangan TTL dalam satu skrip agar key tidak pernah tertinggal tanpa TTL.
+_RESERVE_SCRIPT = """
+local value = redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return value
+"""
 
 
 class NonceManager:
     def __init__(self) -> None:
-        self._client = redis.from_url(str(_settings.redis_url), decode_responses=True)
-        self._lock = asyncio.Lock()
+        self._client = redis_manager.client
+        self._ttl = 3600 * 24
+        self._reserve = self._client.register_script(_RESERVE_SCRIPT)
+
+    async def queue_reserve(self, pipe: Pipeline, user_id: int) -> None:
+        await self._reserve(keys=[f"nonce:{user_id}"], args=[self._ttl], client=pipe)
 
     async def get_next_nonce(self, user_id: int) -> int:
-        key = f"nonce:{user_id}"
-        async with self._lock:
-            value = await self._client.incr(key)
-            if value == 1:
-                await self._client.expire(key, 3600 * 24)
-        return value
+        return int(
+            await self._reserve(
+                keys=[f"nonce:{user_id}"], args=[self._ttl], client=self._client
+            )
+        )
 
     async def set_nonce(self, user_id: int, value: int) -> None:
         key = f"nonce:{user_id}"
-        await self._client.set(key, value, ex=3600 * 24)
+        await self._client.set(key, value, ex=self._ttl)
 
 
 nonce_manager = NonceManager()
@@ -1,16 +1,103 @@
-import redis.asyncio as redis
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+
+from redis.asyncio.client import Pipeline
 
 from core.config import get_settings
+from core.utils.redis_client import redis_manager
 
 _settings = get_settings()
-_client = redis.from_url(str(_settings.redis_url), decode_responses=True)
+_client = redis_manager.client
+
+# GCRA: simpan "theoretical arrival time" per key. Satu EVALSHA, TTL selalu ikut ditulis.
+_GCRA_SCRIPT = """
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+    tat = now
+end
+local new_tat = tat + interval
+local allow_at = new_tat - tolerance
+if allow_at > now then
+    return {0, allow_at - now}
+end
+redis.call('SET', KEYS[1], new_tat, 'PX', new_tat - now)
+return {1, 0}
+"""
+_gcra = _client.register_script(_GCRA_SCRIPT)
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitPolicy:
+    limit: int
+    period_seconds: int
+
+    @classmethod
+    def parse(cls, spec: str) -> "RateLimitPolicy":
+        limit, _, period = spec.partition("/")
+        return cls(limit=int(limit), period_seconds=int(period or 60))
+
+    @property
+    def interval_ms(self) -> int:
+        return max(1, self.period_seconds * 1000 // max(self.limit, 1))
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitResult:
+    allowed: bool
+    retry_after: float = 0.0
+
+
+class RateLimitExceeded(ValueError):
+    def __init__(self, action: str, retry_after: float) -> None:
+        super().__init__("Terlalu banyak permintaan, coba lagi nanti")
+        self.action = action
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+policies: dict[str, RateLimitPolicy] = {
+    "orders": RateLimitPolicy.parse(_settings.rate_limit_orders),
+    "cancels": RateLimitPolicy.parse(_settings.rate_limit_cancels),
+    "auth": RateLimitPolicy.parse(_settings.rate_limit_auth),
+    "market": RateLimitPolicy.parse(_settings.rate_limit_market),
+}
+
+
+def pipeline() -> Pipeline:
+    return _client.pipeline(transaction=False)
+
+
+async def queue_check(pipe: Pipeline, action: str, identity: str | int) -> None:
+    policy = policies[action]
+    await _gcra(
+        keys=[f"rate:{action}:{identity}"],
+        args=[policy.interval_ms, policy.interval_ms * policy.limit],
+        client=pipe,
+    )
+
+
+def parse_result(raw: list[int]) -> RateLimitResult:
+    allowed, retry_after_ms = raw
+    return RateLimitResult(allowed=bool(allowed), retry_after=int(retry_after_ms) / 1000)
+
+
+async def check(action: str, identity: str | int) -> RateLimitResult:
+    async with pipeline() as pipe:
+        await queue_check(pipe, action, identity)
+        (raw,) = await pipe.execute()
+    return parse_result(raw)
 
 
-async def allow_action(user_id: int, action: str, limit: int, window_seconds: int) -> bool:
-    key = f"rate:{user_id}:{action}"
-    current = await _client.incr(key)
-    if current == 1:
-        await _client.expire(key, window_seconds)
-    if current > limit:
-        return False
-    return True
+async def enforce(action: str, identity: str | int) -> None:
+    result = await check(action, identity)
+    if not result.allowed:
+        raise RateLimitExceeded(action, result.retry_after)
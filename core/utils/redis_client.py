@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any
+
+from redis.asyncio import BlockingConnectionPool, Redis
+from redis.asyncio.client import Pipeline
+from redis.exceptions import RedisError
+
+from core.config import get_settings
+from core.utils.metrics import REDIS_COMMAND_SECONDS
+from core.utils.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True) -> list[Any]:
+        started = time.perf_counter()
+        try:
+            with tracer.leaf("redis PIPELINE", **{"db.system": "redis"}) as span:
+                if span is not None:
+                    span.set("db.redis.commands", len(self.command_stack))
+                return await super().execute(raise_on_error)
+        finally:
+            REDIS_COMMAND_SECONDS.labels("PIPELINE").observe(time.perf_counter() - started)
+
+
+class InstrumentedRedis(Redis):
+    """Client Redis yang mencatat latensi tiap perintah ke histogram."""
+
+    async def execute_command(self, *args: Any, **options: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            with tracer.leaf(f"redis {str(args[0]).upper()}", **{"db.system": "redis"}):
+                return await super().execute_command(*args, **options)
+        finally:
+            REDIS_COMMAND_SECONDS.labels(str(args[0]).upper()).observe(
+                time.perf_counter() - started
+            )
+
+    def pipeline(self, transaction: bool = True, shard_hint: str | None = None) -> Pipeline:
+        return InstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+class RedisManager:
+    """Satu client Redis (dan satu pool) untuk seluruh proses core."""
+
+    def __init__(self) -> None:
+        self._settings = get_settings()
+        self._pool: BlockingConnectionPool | None = None
+        self._client: Redis | None = None
+
+    @property
+    def client(self) -> Redis:
+        if self._client is None:
+            settings = self._settings
+            self._pool = BlockingConnectionPool.from_url(
+                str(settings.redis_url),
+                max_connections=settings.redis_max_connections,
+                timeout=settings.redis_pool_timeout_seconds,
+                socket_timeout=settings.redis_socket_timeout_seconds,
+                socket_connect_timeout=settings.redis_socket_timeout_seconds,
+                socket_keepalive=True,
+                health_check_interval=settings.redis_health_check_interval_seconds,
+                decode_responses=True,
+            )
+            self._client = InstrumentedRedis(connection_pool=self._pool)
+        return self._client
+
+    async def ping(self) -> float | None:
+        """Latensi PING dalam milidetik, ``None`` bila Redis tidak terjangkau."""
+        started = time.perf_counter()
+        try:
+            await self.client.ping()
+        except RedisError as exc:
+            logger.warning("Redis tidak merespons", extra={"error": str(exc)})
+            return None
+        return (time.perf_counter() - started) * 1000
+
+    def pool_stats(self) -> dict[str, Any]:
+        pool = self._pool
+        if pool is None:
+            return {"max_connections": self._settings.redis_max_connections, "in_use": 0, "idle": 0}
+        idle = sum(1 for conn in pool._available_connections if conn is not None)
+        return {
+            "max_connections": pool.max_connections,
+            "in_use": len(pool._in_use_connections),
+            "idle": idle,
+        }
+
+    async def close(self) -> None:
+        # Client tetap dipegang singleton lain; cukup tutup koneksi di pool.
+        if self._pool is not None:
+            await self._pool.disconnect()
+
+
+redis_manager = RedisManager()
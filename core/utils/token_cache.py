@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+
+from core.config import get_settings
+from core.utils.redis_client import redis_manager
+
+logger = logging.getLogger(__name__)
+
+_settings = get_settings()
+
+
+@dataclass(slots=True)
+class CachedToken:
+    user_id: int
+    telegram_id: int
+    expires_at: datetime
+    deadline: float
+
+
+class TokenCache:
+    """Cache hash token → identitas user per proses, diinvalidasi lewat Redis pub/sub."""
+
+    channel = "auth:token-invalidate"
+
+    def __init__(self) -> None:
+        self._client = redis_manager.client
+        self._max_size = _settings.token_cache_max_size
+        self._ttl = _settings.token_cache_ttl_seconds
+        self._entries: OrderedDict[str, CachedToken] = OrderedDict()
+        self._generation = 0
+        self._task: asyncio.Task[None] | None = None
+        self._listening = False
+
+    @property
+    def active(self) -> bool:
+        # Tanpa listener invalidasi, cache bisa basi di proses lain; jangan dipakai.
+        return self._listening and self._max_size > 0
+
+    @property
+    def generation(self) -> int:
+        """Naik setiap ada invalidasi; dibaca sebelum lookup DB dan diteruskan ke ``put``."""
+        return self._generation
+
+    def get(self, token_hash: str, telegram_id: int) -> CachedToken | None:
+        if not self.active:
+            return None
+        entry = self._entries.get(token_hash)
+        if entry is None:
+            return None
+        if (
+            time.monotonic() >= entry.deadline
+            or entry.expires_at <= datetime.utcnow()
+            or entry.telegram_id != telegram_id
+        ):
+            self._entries.pop(token_hash, None)
+            return None
+        self._entries.move_to_end(token_hash)
+        return entry
+
+    def put(
+        self,
+        token_hash: str,
+        *,
+        user_id: int,
+        telegram_id: int,
+        expires_at: datetime,
+        generation: int,
+    ) -> None:
+        # Invalidasi yang tiba selama lookup berjalan bisa menyangkut token ini.
+        if not self.active or generation != self._generation:
+            return
+        remaining = (expires_at - datetime.utcnow()).total_seconds()
+        if remaining <= 0:
+            return
+        self._entries[token_hash] = CachedToken(
+            user_id=user_id,
+            telegram_id=telegram_id,
+            expires_at=expires_at,
+            deadline=time.monotonic() + min(self._ttl, remaining),
+        )
+        self._entries.move_to_end(token_hash)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, token_hash: str) -> None:
+        self._generation += 1
+        self._entries.pop(token_hash, None)
+
+    def _clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+
+    async def broadcast_invalidation(self, token_hash: str | None) -> None:
+        if not token_hash:
+            return
+        self.invalidate(token_hash)
+        try:
+            await self._client.publish(self.channel, token_hash)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Gagal menyiarkan invalidasi token", extra={"error": str(exc)})
+
+    async def start(self) -> None:
+        if self._task is None and self._max_size > 0:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:  # pragma: no cover
+                pass
+            self._task = None
+        self._listening = False
+        self._clear()
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self._client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                self._listening = True
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self.invalidate(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Listener invalidasi token terputus", extra={"error": str(exc)})
+            finally:
+                # Invalidasi bisa terlewat selama terputus, jadi kosongkan cache.
+                self._listening = False
+                self._clear()
+                await pubsub.aclose()
+            await asyncio.sleep(1)
+
+
+token_cache = TokenCache()
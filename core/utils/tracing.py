@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import random
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_KINDS = {
+    "internal": "SPAN_KIND_INTERNAL",
+    "server": "SPAN_KIND_SERVER",
+    "client": "SPAN_KIND_CLIENT",
+    "consumer": "SPAN_KIND_CONSUMER",
+}
+
+
+@dataclass(slots=True)
+class SpanContext:
+    trace_id: str
+    span_id: str
+    sampled: bool
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    @classmethod
+    def parse(cls, header: str | None) -> "SpanContext | None":
+        parts = (header or "").strip().split("-")
+        if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+            return None
+        try:
+            flags = int(parts[3], 16)
+            int(parts[1], 16), int(parts[2], 16)
+        except ValueError:
+            return None
+        return cls(trace_id=parts[1], span_id=parts[2], sampled=bool(flags & 1))
+
+
+@dataclass(slots=True)
+class Span:
+    name: str
+    context: SpanContext
+    parent_id: str | None
+    kind: str
+    start_ns: int = field(default_factory=time.time_ns)
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_otlp(self, end_ns: int) -> dict[str, Any]:
+        span: dict[str, Any] = {
+            "traceId": self.context.trace_id,
+            "spanId": self.context.span_id,
+            "name": self.name,
+            "kind": _KINDS.get(self.kind, "SPAN_KIND_INTERNAL"),
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(end_ns),
+            "attributes": [_attribute(key, value) for key, value in self.attributes.items()],
+            "status": {"code": "STATUS_CODE_ERROR", "message": self.error}
+            if self.error
+            else {"code": "STATUS_CODE_UNSET"},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def _attribute(key: str, value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class JsonlExporter:
+    """Tulis span sebagai baris OTLP/JSON (format receiver ``otlpjsonfile``) dari thread terpisah."""
+
+    def __init__(self, path: str, service: str, *, batch_size: int = 256) -> None:
+        self._path = path
+        self._service = service
+        self._batch_size = batch_size
+        self._queue: queue.SimpleQueue[dict[str, Any] | None] = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def export(self, span: dict[str, Any]) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="trace-exporter", daemon=True
+                    )
+                    self._thread.start()
+        self._queue.put(span)
+
+    def shutdown(self) -> None:
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        running = True
+        while running:
+            batch: list[dict[str, Any]] = []
+            try:
+                item = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            while item is not None:
+                batch.append(item)
+                if len(batch) >= self._batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            running = item is not None
+            if batch:
+                self._write(batch)
+
+    def _write(self, spans: list[dict[str, Any]]) -> None:
+        payload = {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [_attribute("service.name", self._service)]},
+                    "scopeSpans": [{"scope": {"name": "indodax-bot"}, "spans": spans}],
+                }
+            ]
+        }
+        try:
+            with open(self._path, "a", encoding="utf-8") as handle:
+                handle.write(json.dumps(payload, default=str) + "\n")
+        except OSError as exc:
+            logger.warning("Gagal menulis trace", extra={"error": str(exc)})
+
+
+_current: ContextVar[SpanContext | None] = ContextVar("trace_context", default=None)
+
+
+class Tracer:
+    def __init__(self, service: str, export_path: str | None, sample_rate: float) -> None:
+        self._sample_rate = sample_rate
+        self.exporter = JsonlExporter(export_path, service) if export_path else None
+
+    def current(self) -> SpanContext | None:
+        return _current.get()
+
+    def traceparent(self) -> str | None:
+        context = _current.get()
+        return context.traceparent() if context else None
+
+    def start(
+        self,
+        name: str,
+        *,
+        kind: str = "internal",
+        parent: SpanContext | None = None,
+        attributes: dict[str, Any] | None = None,
+    ) -> Span:
+        parent = parent or _current.get()
+        if parent is None:
+            context = SpanContext(
+                trace_id=secrets.token_hex(16),
+                span_id=secrets.token_hex(8),
+                sampled=random.random() < self._sample_rate,
+            )
+        else:
+            context = SpanContext(parent.trace_id, secrets.token_hex(8), parent.sampled)
+        return Span(
+            name=name,
+            context=context,
+            parent_id=parent.span_id if parent else None,
+            kind=kind,
+            attributes=dict(attributes or {}),
+        )
+
+    def end(self, span: Span, error: BaseException | None = None) -> None:
+        if error is not None:
+            span.error = str(error) or type(error).__name__
+        if span.context.sampled and self.exporter is not None:
+            self.exporter.export(span.to_otlp(time.time_ns()))
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        *,
+        kind: str = "internal",
+        traceparent: str | None = None,
+        attributes: dict[str, Any] | None = None,
+    ) -> Iterator[Span]:
+        """Span yang menjadi induk untuk pekerjaan di dalam blok ``with``."""
+        span = self.start(
+            name, kind=kind, parent=SpanContext.parse(traceparent), attributes=attributes
+        )
+        token = _current.set(span.context)
+        error: BaseException | None = None
+        try:
+            yield span
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            _current.reset(token)
+            self.end(span, error)
+
+    @contextmanager
+    def leaf(self, name: str, *, kind: str = "client", **attributes: Any) -> Iterator[Span | None]:
+        """Span daun murah: tanpa trace aktif yang tersampel, tidak ada yang dicatat."""
+        parent = _current.get()
+        if parent is None or not parent.sampled or self.exporter is None:
+            yield None
+            return
+        span = self.start(name, kind=kind, parent=parent, attributes=attributes)
+        error: BaseException | None = None
+        try:
+            yield span
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            self.end(span, error)
+
+
+_settings = get_settings()
+tracer = Tracer("trading-core", _settings.trace_export_path, _settings.trace_sample_rate)
+
+
+class TracingMiddleware:
+    """Span server per request; melanjutkan ``traceparent`` dari bot/worker bila ada."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        incoming = headers.get(b"traceparent", b"").decode("latin-1") or None
+        method = scope["method"]
+        with tracer.span(f"{method} {scope['path']}", kind="server", traceparent=incoming) as span:
+            trace_id = span.context.trace_id.encode()
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.set("http.status_code", message["status"])
+                    message.setdefault("headers", [])
+                    message["headers"] = [*message["headers"], (b"x-trace-id", trace_id)]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    span.name = f"{method} {route}"
+                    span.set("http.route", route)
+                span.set("http.method", method)
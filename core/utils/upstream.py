@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import json
+import re
+import time
+from collections import Counter as Tally
+from collections import deque
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import parse_qs
+
+import httpx
+
+from core.config import get_settings
+from core.utils.metrics import (
+    INDODAX_ERRORS,
+    INDODAX_REQUEST_SECONDS,
+    INDODAX_RESPONSES,
+)
+
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+
+@dataclass(slots=True)
+class UpstreamSample:
+    at: float
+    seconds: float
+    status: str
+    failed: bool
+    error: str | None
+
+
+def _percentile(ordered: list[float], q: float) -> float | None:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else None
+
+
+class UpstreamTelemetry:
+    """Jendela bergulir per API/method Indodax untuk error rate dan latensi (SLO).
+
+    Penolakan bisnis Indodax (mis. saldo tidak cukup) dicatat tetapi tidak
+    menghabiskan error budget karena disebabkan input pengguna, bukan gangguan upstream.
+    """
+
+    def __init__(self) -> None:
+        settings = get_settings()
+        self.window_seconds = settings.indodax_slo_window_seconds
+        self.min_requests = settings.indodax_slo_min_requests
+        self.error_budget = settings.indodax_slo_error_rate
+        self.latency_p99_ms = settings.indodax_slo_latency_p99_ms
+        self.breach_seconds = settings.indodax_slo_breach_seconds
+        self._samples: dict[tuple[str, str], deque[UpstreamSample]] = {}
+        self._breach_since: dict[tuple[str, str], float] = {}
+
+    def record(
+        self,
+        api: str,
+        method: str,
+        *,
+        seconds: float,
+        status: int | str,
+        outcome: str,
+        error: str | None = None,
+    ) -> None:
+        INDODAX_REQUEST_SECONDS.labels(api, method, outcome).observe(seconds)
+        INDODAX_RESPONSES.labels(api, method, str(status)).inc()
+        if error:
+            INDODAX_ERRORS.labels(api, method, _NUMBER.sub("N", error)[:80]).inc()
+        samples = self._samples.setdefault((api, method), deque())
+        now = time.time()
+        samples.append(
+            UpstreamSample(
+                at=now, seconds=seconds, status=str(status), failed=outcome == "error", error=error
+            )
+        )
+        self._trim(samples, now)
+
+    def _trim(self, samples: deque[UpstreamSample], now: float) -> None:
+        cutoff = now - self.window_seconds
+        while samples and samples[0].at < cutoff:
+            samples.popleft()
+
+    def _evaluate(self, samples: deque[UpstreamSample]) -> dict[str, Any]:
+        total = len(samples)
+        failed = sum(1 for sample in samples if sample.failed)
+        ordered = sorted(sample.seconds * 1000 for sample in samples)
+        error_rate = failed / total if total else 0.0
+        p99 = _percentile(ordered, 0.99)
+        breached = total >= self.min_requests and (
+            error_rate > self.error_budget or (p99 is not None and p99 > self.latency_p99_ms)
+        )
+        return {
+            "requests": total,
+            "failed": failed,
+            "error_rate": round(error_rate, 4),
+            "p50_ms": _percentile(ordered, 0.5),
+            "p99_ms": p99,
+            "statuses": dict(Tally(sample.status for sample in samples)),
+            "errors": dict(Tally(sample.error for sample in samples if sample.error).most_common(5)),
+            "breached": breached,
+        }
+
+    def report(self) -> dict[str, Any]:
+        now = time.time()
+        report: dict[str, Any] = {}
+        for key, samples in list(self._samples.items()):
+            self._trim(samples, now)
+            stats = self._evaluate(samples)
+            since = self._breach_since.get(key)
+            stats["breach_seconds"] = round(now - since, 1) if since else 0.0
+            report[":".join(key)] = stats
+        return report
+
+    def breaches(self) -> list[dict[str, Any]]:
+        """Method yang melanggar SLO terus-menerus selama ``breach_seconds``."""
+        now = time.time()
+        sustained: list[dict[str, Any]] = []
+        for key, samples in list(self._samples.items()):
+            self._trim(samples, now)
+            stats = self._evaluate(samples)
+            if not stats["breached"]:
+                self._breach_since.pop(key, None)
+                continue
+            since = self._breach_since.setdefault(key, now)
+            if now - since >= self.breach_seconds:
+                sustained.append({"api": key[0], "method": key[1], **stats})
+        return sustained
+
+
+upstream_telemetry = UpstreamTelemetry()
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Transport pembungkus yang mencatat latensi, status, dan error Indodax per method."""
+
+    def __init__(self, api: str, inner: httpx.AsyncBaseTransport) -> None:
+        self._api = api
+        self._inner = inner
+
+    def _method(self, request: httpx.Request) -> str:
+        if self._api == "private":
+            form = parse_qs(request.content.decode("utf-8", "replace"))
+            return form.get("method", ["unknown"])[0]
+        # /api/ticker/btcidr -> ticker
+        segments = [part for part in request.url.path.split("/") if part]
+        return segments[1] if len(segments) > 1 else "root"
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        method = self._method(request)
+        started = time.perf_counter()
+        try:
+            response = await self._inner.handle_async_request(request)
+        except httpx.HTTPError as exc:
+            upstream_telemetry.record(
+                self._api,
+                method,
+                seconds=time.perf_counter() - started,
+                status="exception",
+                outcome="error",
+                error=type(exc).__name__,
+            )
+            raise
+        outcome, error = "success", None
+        if response.status_code >= 400:
+            outcome, error = "error", f"HTTP {response.status_code}"
+        elif self._api == "private":
+            # Tapi selalu menjawab 200; penolakan hanya terlihat di body.
+            await response.aread()
+            try:
+                data = json.loads(response.content)
+            except ValueError:
+                data = {}
+            if isinstance(data, dict) and not data.get("success"):
+                outcome, error = "rejected", str(data.get("error") or "Unknown error")
+        upstream_telemetry.record(
+            self._api,
+            method,
+            seconds=time.perf_counter() - started,
+            status=response.status_code,
+            outcome=outcome,
+            error=error,
+        )
+        return response
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+def instrumented_transport(api: str, limits: httpx.Limits) -> InstrumentedTransport:
+    return InstrumentedTransport(api, httpx.AsyncHTTPTransport(limits=limits))
@@ -0,0 +1,111 @@
+"""Benchmark ukuran pool database core.
+
+Mensimulasikan burst request bot: ``--concurrency`` task bersamaan, masing-masing
+mengambil koneksi dari pool lalu menjalankan query selama ``--query-ms``. Untuk
+setiap kombinasi ``--pool-sizes`` x ``--overflows`` dicetak throughput, waktu tunggu
+checkout (p50/p99), latensi total p99, dan jumlah timeout pool.
+
+Contoh (dari root repo, dengan DATABASE_URL menunjuk ke Postgres uji):
+
+    poetry run python scripts/bench_db_pool.py --concurrency 200 --requests 5000 \\
+        --pool-sizes 5,10,20,40 --overflows 0,10
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+
+from core.config import get_settings  # noqa: E402
+from core.database import engine_options  # noqa: E402
+
+
+def _pct(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+
+async def _run(args: argparse.Namespace, pool_size: int, overflow: int) -> dict[str, float]:
+    settings = get_settings()
+    overrides = SimpleNamespace(
+        **{
+            **settings.model_dump(),
+            "database_url": args.url or settings.database_url,
+            "db_pool_size": pool_size,
+            "db_max_overflow": overflow,
+        }
+    )
+    engine = create_async_engine(str(overrides.database_url), **engine_options(overrides))
+    query = text("SELECT pg_sleep(:seconds)")
+    waits: list[float] = []
+    totals: list[float] = []
+    timeouts = 0
+    remaining = args.requests
+
+    async def worker() -> None:
+        nonlocal remaining, timeouts
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                async with engine.connect() as conn:
+                    waits.append(time.perf_counter() - started)
+                    await conn.execute(query, {"seconds": args.query_ms / 1000})
+            except PoolTimeoutError:
+                timeouts += 1
+                continue
+            totals.append(time.perf_counter() - started)
+
+    # Pool dipanaskan dulu agar biaya membuka koneksi tidak mendominasi hasil.
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+    return {
+        "pool_size": pool_size,
+        "overflow": overflow,
+        "rps": len(totals) / elapsed if elapsed else 0.0,
+        "wait_p50_ms": _pct(waits, 0.5),
+        "wait_p99_ms": _pct(waits, 0.99),
+        "total_p99_ms": _pct(totals, 0.99),
+        "timeouts": timeouts,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="DATABASE_URL alternatif (default dari .env)")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--query-ms", type=float, default=5.0)
+    parser.add_argument("--pool-sizes", default="5,10,20")
+    parser.add_argument("--overflows", default="0,10")
+    args = parser.parse_args()
+
+    header = f"{'pool':>5} {'ovf':>4} {'req/s':>9} {'wait p50':>9} {'wait p99':>9} {'p99':>9} {'timeout':>8}"
+    print(header)
+    for pool_size in (int(value) for value in args.pool_sizes.split(",")):
+        for overflow in (int(value) for value in args.overflows.split(",")):
+            row = await _run(args, pool_size, overflow)
+            print(
+                f"{row['pool_size']:>5} {row['overflow']:>4} {row['rps']:>9.1f} "
+                f"{row['wait_p50_ms']:>9.2f} {row['wait_p99_ms']:>9.2f} "
+                f"{row['total_p99_ms']:>9.2f} {row['timeouts']:>8}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,4 +1,8 @@
 #!/bin/bash
 set -euo pipefail
 
+if [ "${WORKER_ROLE:-scheduler}" = "executor" ]; then
+  exec poetry run python -m worker.executor
+fi
+
 exec poetry run python -m worker.scheduler
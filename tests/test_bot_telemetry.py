@@ -0,0 +1,80 @@
+import logging
+from datetime import datetime
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+respx = pytest.importorskip("respx")
+pytest.importorskip("prometheus_client")
+from aiogram import Bot, Dispatcher, Router
+from aiogram.filters import Command
+from aiogram.fsm.context import FSMContext
+from aiogram.types import Chat, Message, Update, User
+from httpx import Response
+from prometheus_client import REGISTRY
+
+from bot.services.api_client import CoreAPIClient
+from bot.utils.telemetry import (
+    HandlerNameMiddleware,
+    TimedRedisStorage,
+    UpdateLatencyMiddleware,
+)
+
+
+def _update(text: str) -> Update:
+    return Update(
+        update_id=1,
+        message=Message(
+            message_id=1,
+            date=datetime.now(),
+            chat=Chat(id=10, type="private"),
+            from_user=User(id=10, is_bot=False, first_name="uji"),
+            text=text,
+        ),
+    )
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_update_is_timed_per_handler_with_core_and_fsm_breakdown(caplog):
+    client = CoreAPIClient()
+    base = str(client._client.base_url).rstrip("/")
+    respx.get(f"{base}/api/orders/open").mock(return_value=Response(200, json={"data": []}))
+    respx.get(f"{base}/api/portfolio/7").mock(return_value=Response(200, json={"data": {}}))
+
+    router = Router()
+
+    @router.message(Command("saldo"))
+    async def saldo_handler(message: Message, state: FSMContext) -> None:
+        await state.set_state("menunggu")
+        await client.get("/api/orders/open", params={"telegram_id": 10})
+        await client.get("/api/portfolio/7")
+
+    storage = TimedRedisStorage(redis=fakeredis.aioredis.FakeRedis())
+    dp = Dispatcher(storage=storage)
+    dp.update.outer_middleware(UpdateLatencyMiddleware(slow_threshold_ms=0))
+    dp.message.middleware(HandlerNameMiddleware())
+    dp.include_router(router)
+
+    handler = "test_bot_telemetry.saldo_handler"
+    before = REGISTRY.get_sample_value(
+        "bot_update_duration_seconds_count", {"handler": handler}
+    ) or 0.0
+    with caplog.at_level(logging.WARNING, logger="bot.utils.telemetry"):
+        await dp.feed_update(Bot("123456:TEST"), _update("/saldo"))
+    await client.close()
+
+    assert REGISTRY.get_sample_value(
+        "bot_update_duration_seconds_count", {"handler": handler}
+    ) == before + 1
+    assert REGISTRY.get_sample_value(
+        "bot_core_call_duration_seconds_count",
+        {"method": "GET", "path": "/api/portfolio/{id}", "status": "200"},
+    ) >= 1
+    record = next(r for r in caplog.records if r.getMessage() == "Update lambat")
+    assert record.handler == handler
+    assert [call["path"] for call in record.core_calls] == [
+        "/api/orders/open",
+        "/api/portfolio/{id}",
+    ]
+    assert record.fsm_ops >= 1
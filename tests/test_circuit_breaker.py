@@ -0,0 +1,94 @@
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from worker.utils import circuit_breaker as breaker_module
+from worker.utils.circuit_breaker import CircuitBreakers, CircuitOpenError
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(breaker_module, "time", SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+@pytest.fixture
+def breakers():
+    registry = CircuitBreakers()
+    registry._options.update(
+        window_seconds=60, min_requests=4, failure_rate=0.5, open_seconds=30, half_open_probes=1
+    )
+    return registry
+
+
+def _upstream_error() -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "http://core/api/orders")
+    return httpx.HTTPStatusError("502", request=request, response=httpx.Response(502, request=request))
+
+
+async def _fail(breakers, pair="BTCIDR", exc=None):
+    with pytest.raises(type(exc or _upstream_error())):
+        async with breakers.guard("trade", pair):
+            raise exc or _upstream_error()
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_on_failure_rate_and_isolates_pairs(clock, breakers):
+    async with breakers.guard("trade", "BTCIDR"):
+        pass
+    for _ in range(2):
+        await _fail(breakers)
+    # Baru 3 request, di bawah minimum.
+    assert breakers.get("trade", "BTCIDR").state == "closed"
+    await _fail(breakers)
+    assert breakers.get("trade", "BTCIDR").state == "open"
+
+    with pytest.raises(CircuitOpenError):
+        async with breakers.guard("trade", "btcidr"):
+            pass
+    assert breakers.available("trade", "ETHIDR") is True
+    assert breakers.available("cancel", "BTCIDR") is True
+
+
+@pytest.mark.asyncio
+async def test_business_rejections_do_not_trip(clock, breakers):
+    request = httpx.Request("POST", "http://core/api/orders")
+    rejected = httpx.HTTPStatusError(
+        "400", request=request, response=httpx.Response(400, request=request)
+    )
+    for _ in range(6):
+        await _fail(breakers, exc=rejected)
+    assert breakers.get("trade", "BTCIDR").state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_half_open_allows_single_probe(clock, breakers):
+    for _ in range(4):
+        await _fail(breakers)
+    breaker = breakers.get("trade", "BTCIDR")
+    assert breaker.state == "open"
+
+    clock.now += 31
+    assert breakers.available("trade", "BTCIDR") is True
+    assert breaker.state == "half_open"
+
+    # Probe gagal membuka circuit lagi.
+    await _fail(breakers)
+    assert breaker.state == "open"
+
+    clock.now += 31
+    async with breakers.guard("trade", "BTCIDR"):
+        # Selama probe berjalan, request lain ditolak.
+        assert breakers.available("trade", "BTCIDR") is False
+    assert breaker.state == "closed"
+    assert breakers.snapshot()["trade:BTCIDR"]["requests"] == 0
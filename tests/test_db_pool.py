@@ -0,0 +1,39 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from core import database
+
+
+def _settings(url: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        database_url=url,
+        db_pool_size=15,
+        db_max_overflow=5,
+        db_pool_timeout_seconds=3.0,
+        db_pool_recycle_seconds=600,
+        db_pool_pre_ping=True,
+        db_prepared_statement_cache_size=512,
+    )
+
+
+def test_engine_options_follow_settings():
+    options = database.engine_options(_settings("postgresql+asyncpg://u:p@db/app"))
+    assert options["poolclass"] is database.InstrumentedPool
+    assert (options["pool_size"], options["max_overflow"]) == (15, 5)
+    assert (options["pool_timeout"], options["pool_recycle"]) == (3.0, 600)
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"] == {"prepared_statement_cache_size": 512}
+
+    # Cache prepared statement hanya berlaku untuk driver asyncpg.
+    assert "connect_args" not in database.engine_options(_settings("postgresql+psycopg://u:p@db/app"))
+
+
+def test_pool_stats_report_configured_limits():
+    stats = database.pool_stats()
+    settings = database.get_settings()
+    assert stats["size"] == settings.db_pool_size
+    assert stats["max_overflow"] == settings.db_max_overflow
+    assert stats["in_use"] == 0
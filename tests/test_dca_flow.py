@@ -33,6 +33,7 @@ class DummyCoreAPIClient:
         payload: dict,
         *,
         internal: bool = False,
+        idempotency_key: str | None = None,
     ):
         self.requests.append((path, payload, internal))
         return {"success": True, "data": {}}
@@ -0,0 +1,168 @@
+import pytest
+
+pytest.importorskip("pendulum")
+
+from worker.grid_engine import GridEngine
+from worker.tasks import grid
+
+
+def _strategy(strategy_id: int = 1) -> dict:
+    return {
+        "id": strategy_id,
+        "user_id": 2,
+        "telegram_id": 3,
+        "pair": "BTCIDR",
+        "config_json": {
+            "lower_price": 100.0,
+            "upper_price": 200.0,
+            "grid_count": 4,
+            "order_size": 0.5,
+        },
+    }
+
+
+def test_reconcile_matches_levels_and_flags_duplicates():
+    engine = GridEngine()
+    state = engine.sync_strategy(_strategy())
+    assert state.levels == [100.0, 125.0, 150.0, 175.0, 200.0]
+
+    plan = engine.reconcile(
+        state,
+        [
+            {"id": 3, "side": "sell", "price": 200.0},
+            {"id": 1, "side": "buy", "price": 100.0},
+            {"id": 2, "side": "buy", "price": 100.5},
+            {"id": 4, "side": "buy", "price": 90.0},
+        ],
+    )
+
+    assert sorted(order["id"] for order in plan.stale) == [2, 4]
+    # Level tengah dibiarkan kosong sebagai tempat order balik pertama.
+    assert plan.missing == [(1, "buy"), (3, "sell")]
+    assert engine.sync_strategy(_strategy()) is state
+
+
+def test_fill_places_counter_order_one_level_away():
+    engine = GridEngine()
+    state = engine.sync_strategy(_strategy())
+    engine.reconcile(
+        state,
+        [
+            {"id": 10, "side": "buy", "price": 125.0},
+            {"id": 11, "side": "sell", "price": 175.0},
+        ],
+    )
+
+    counter = engine.on_fill(
+        {"order_id": "10", "strategy_id": 1, "side": "buy", "price": 125.0}
+    )
+    assert counter == (state, 2, "sell")
+    assert state.sides[1] is None
+
+    blocked = engine.on_fill(
+        {"order_id": "99", "strategy_id": 1, "side": "sell", "price": 200.0}
+    )
+    assert blocked is None
+    # Level yang terisi tetap aktif di sisi sebaliknya, bukan hilang.
+    assert state.sides[4] == "buy"
+
+
+def test_placement_keys_are_stable_until_the_level_fills():
+    engine = GridEngine()
+    state = engine.sync_strategy(_strategy())
+    first = engine.reconcile(state, [])
+    # Run berikutnya (mis. replica tertinggal) menghasilkan key yang sama -> dedupe di core.
+    again = engine.reconcile(state, [])
+    assert [state.placement_key(i, s) for i, s in first.missing] == [
+        state.placement_key(i, s) for i, s in again.missing
+    ]
+
+    before = state.placement_key(1, "buy")
+    engine.record_order(state, 1, {"id": 10, "side": "buy", "price": 125.0})
+    _, target, side = engine.on_fill(
+        {"order_id": "10", "strategy_id": 1, "side": "buy", "price": 125.0}
+    )
+    assert state.placement_key(1, "buy") != before
+    assert state.placement_key(target, side) == f"grid:1:{state.epoch}:2:sell:0"
+
+
+def _seed(engine, state):
+    plan = engine.reconcile(state, [])
+    for order_id, (index, side) in enumerate(plan.missing, start=1):
+        engine.record_order(
+            state, index, {"id": order_id, "side": side, "price": state.levels[index]}
+        )
+
+
+def _fill(engine, state, index):
+    order = state.orders[index]
+    return engine.on_fill(
+        {
+            "order_id": str(order["id"]),
+            "strategy_id": 1,
+            "side": order["side"],
+            "price": order["price"],
+        }
+    )
+
+
+def _armed(engine, state):
+    plan = engine.reconcile(state, list(state.orders.values()))
+    return sorted(state.orders) + [index for index, _ in plan.missing]
+
+
+@pytest.mark.parametrize("order", [(1, 0), (0, 1)])
+def test_fills_in_any_order_keep_every_level(order):
+    engine = GridEngine()
+    state = engine.sync_strategy(_strategy(), price=150.0)
+    _seed(engine, state)
+    assert sorted(state.orders) == [0, 1, 3, 4]
+
+    # Harga turun melewati dua level buy; fill dilaporkan dalam urutan apa pun.
+    for index in order:
+        counter = _fill(engine, state, index)
+        if counter is not None:
+            _, target, side = counter
+            engine.record_order(
+                state, target, {"id": 100 + target, "side": side, "price": state.levels[target]}
+            )
+    assert len(_armed(engine, state)) == len(state.levels) - 1
+    assert state.sides.count(None) == 1
+
+    # Harga naik lagi: semua sell terisi dari bawah ke atas.
+    for _ in range(3):
+        sells = sorted(index for index, item in state.orders.items() if item["side"] == "sell")
+        counter = _fill(engine, state, sells[0])
+        if counter is not None:
+            _, target, side = counter
+            engine.record_order(
+                state, target, {"id": 200 + target, "side": side, "price": state.levels[target]}
+            )
+        assert len(_armed(engine, state)) == len(state.levels) - 1
+
+
+@pytest.mark.asyncio
+async def test_handle_grid_fills_posts_counter_order(monkeypatch):
+    engine = GridEngine()
+    state = engine.sync_strategy(_strategy(7))
+    engine.reconcile(state, [{"id": 5, "side": "sell", "price": 175.0}])
+    posts = []
+
+    class DummyClient:
+        async def post(self, path, payload, *, internal=False, idempotency_key=None):
+            posts.append((path, payload, internal))
+            return {"success": True, "data": {"id": 6, **payload}}
+
+    monkeypatch.setattr(grid, "grid_engine", engine)
+    monkeypatch.setattr(grid, "core_api_client", DummyClient())
+
+    await grid.handle_grid_fills(
+        [{"order_id": "5", "strategy_id": 7, "side": "sell", "price": 175.0}]
+    )
+
+    assert len(posts) == 1
+    path, payload, internal = posts[0]
+    assert path == "/api/orders" and internal is True
+    assert payload["side"] == "buy"
+    assert payload["price"] == 150.0
+    assert state.orders[2]["id"] == 6
@@ -0,0 +1,95 @@
+import asyncio
+
+import httpx
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from core.utils import idempotency
+from core.utils.idempotency import (
+    IdempotencyConflictError,
+    IdempotencyStore,
+    IdempotencyUpstreamError,
+)
+
+
+def _store() -> IdempotencyStore:
+    store = IdempotencyStore()
+    store._client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    store._release = store._client.register_script(idempotency._RELEASE_SCRIPT)
+    return store
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_share_first_result():
+    store = _store()
+    calls = 0
+
+    async def place_order():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"success": True, "data": {"id": calls}}
+
+    fingerprint = store.fingerprint({"pair": "btc_idr", "amount": 1})
+    results = await asyncio.gather(
+        *(store.run("orders:create:1", "key-1", fingerprint, place_order) for _ in range(3))
+    )
+
+    assert calls == 1
+    assert results == [{"success": True, "data": {"id": 1}}] * 3
+
+
+@pytest.mark.asyncio
+async def test_reused_key_with_different_payload_is_rejected():
+    store = _store()
+
+    async def place_order():
+        return {"success": True}
+
+    await store.run("orders:create:1", "key-2", store.fingerprint({"amount": 1}), place_order)
+    with pytest.raises(IdempotencyConflictError):
+        await store.run(
+            "orders:create:1", "key-2", store.fingerprint({"amount": 2}), place_order
+        )
+
+
+@pytest.mark.asyncio
+async def test_failures_are_not_cached():
+    store = _store()
+    attempts = 0
+
+    async def flaky():
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise RuntimeError("timeout")
+        return {"success": True}
+
+    fingerprint = store.fingerprint({"amount": 1})
+    with pytest.raises(RuntimeError):
+        await store.run("orders:create:1", "key-3", fingerprint, flaky)
+    assert await store.run("orders:create:1", "key-3", fingerprint, flaky) == {"success": True}
+    assert attempts == 2
+
+
+@pytest.mark.asyncio
+async def test_upstream_timeout_is_not_retried_by_duplicates():
+    store = _store()
+    trades = 0
+
+    async def place_order():
+        nonlocal trades
+        trades += 1
+        await asyncio.sleep(0.05)
+        raise httpx.ReadTimeout("read timeout")
+
+    fingerprint = store.fingerprint({"amount": 1})
+    results = await asyncio.gather(
+        *(store.run("orders:create:1", "key-4", fingerprint, place_order) for _ in range(2)),
+        return_exceptions=True,
+    )
+    assert [type(result) for result in results] == [IdempotencyUpstreamError] * 2
+    with pytest.raises(IdempotencyUpstreamError, match="read timeout"):
+        await store.run("orders:create:1", "key-4", fingerprint, place_order)
+    assert trades == 1
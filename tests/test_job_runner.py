@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from worker.runner import JobRunner
+
+
+@pytest.mark.asyncio
+async def test_runner_skips_overlapping_ticks():
+    runner = JobRunner()
+    calls = []
+
+    async def slow_job():
+        calls.append(asyncio.get_running_loop().time())
+        await asyncio.sleep(0.12)
+
+    job = runner.add_job(slow_job, 0.05, overlap="skip")
+    runner.start()
+    await asyncio.sleep(0.33)
+    await runner.stop()
+
+    assert job.skipped >= 2
+    assert len(calls) < 6
+    assert job.running is None
+
+
+@pytest.mark.asyncio
+async def test_runner_coalesces_into_single_rerun():
+    runner = JobRunner()
+    calls = 0
+
+    async def slow_job():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.12)
+
+    job = runner.add_job(slow_job, 0.05, overlap="coalesce")
+    runner.start()
+    await asyncio.sleep(0.3)
+    await runner.stop()
+
+    # Beberapa tick yang tertahan digabung menjadi satu eksekusi lanjutan.
+    assert job.coalesced >= 2
+    assert 2 <= calls < 1 + job.coalesced
+
+
+@pytest.mark.asyncio
+async def test_runner_enforces_deadline_and_records_history():
+    runner = JobRunner()
+
+    async def stuck_job():
+        await asyncio.sleep(1)
+
+    job = runner.add_job(stuck_job, 0.05, deadline=0.02, name="stuck")
+    runner.start()
+    await asyncio.sleep(0.13)
+    await runner.stop()
+
+    stats = runner.snapshot()["stuck"]
+    assert job.timeouts >= 1
+    assert stats["history"][0]["outcome"] == "timeout"
+    assert stats["last_lag"] is not None
+
+
+@pytest.mark.asyncio
+async def test_jitter_is_not_reported_as_lag():
+    runner = JobRunner()
+
+    async def quick_job():
+        return None
+
+    job = runner.add_job(quick_job, 0.1, jitter=0.08, name="jittered")
+    runner.start()
+    await asyncio.sleep(0.45)
+    await runner.stop()
+
+    lags = [record.lag for record in job.history if record.started_at is not None]
+    assert lags and max(lags) < 0.03
+
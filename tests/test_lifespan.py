@@ -0,0 +1,82 @@
+import asyncio
+import types
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from core import lifespan as lifespan_module
+
+
+class _Component:
+    def __init__(self):
+        self.events = []
+
+    async def start(self):
+        self.events.append("start")
+
+    async def stop(self):
+        self.events.append("stop")
+
+    async def close(self):
+        self.events.append("close")
+
+
+@pytest.mark.asyncio
+async def test_startup_reports_each_component_and_tolerates_failures(monkeypatch):
+    components = {
+        name: _Component()
+        for name in (
+            "notification_service",
+            "token_cache",
+            "safety_service",
+            "retention_service",
+            "public_client",
+            "private_client",
+            "redis_manager",
+        )
+    }
+    for name, component in components.items():
+        monkeypatch.setattr(lifespan_module, name, component)
+    monkeypatch.setattr(
+        lifespan_module, "engine", types.SimpleNamespace(dispose=components["redis_manager"].close)
+    )
+
+    resources = lifespan_module.CoreResources()
+    resources._timeout = 0.2
+
+    async def ok():
+        await asyncio.sleep(0.01)
+
+    async def down():
+        raise RuntimeError("Redis tidak terjangkau")
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(resources, "_warm_redis", down)
+    monkeypatch.setattr(resources, "_warm_database", ok)
+    monkeypatch.setattr(resources, "_warm_public", hang)
+    monkeypatch.setattr(resources, "_warm_private", ok)
+
+    await resources.start()
+    report = resources.report()
+    await resources.close()
+
+    parts = report["components"]
+    assert set(parts) == {
+        "redis",
+        "database",
+        "indodax_public",
+        "indodax_private",
+        "notifications",
+        "token_cache",
+        "safety",
+        "retention",
+    }
+    assert parts["database"]["ok"] and parts["database"]["duration_ms"] >= 10
+    assert parts["redis"]["error"] == "Redis tidak terjangkau"
+    assert parts["indodax_public"]["ok"] is False
+    assert report["total_ms"] < 1000
+    assert components["safety_service"].events == ["start", "stop"]
+    assert components["public_client"].events == ["close"]
@@ -0,0 +1,75 @@
+import pytest
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("prometheus_client")
+fakeredis = pytest.importorskip("fakeredis")
+
+from redis.asyncio import ConnectionPool
+
+from core.app import app
+from core.config import get_settings
+from core.utils.redis_client import InstrumentedRedis
+
+
+def _sample(text: str, prefix: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(prefix):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reports_routes_by_template(monkeypatch):
+    async def fake_ticker(pair):
+        raise httpx.ConnectError("down")
+
+    monkeypatch.setattr("core.routers.market.public_client.get_ticker", fake_ticker)
+    internal = {"X-Internal-Token": get_settings().internal_auth_token}
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        await client.get("/health")
+        await client.get("/api/market/price/btcidr", headers=internal)
+        await client.get("/api/market/price/ethidr", headers=internal)
+        await client.get("/tidak-ada")
+        response = await client.get("/metrics")
+
+    body = response.text
+    assert response.headers["content-type"].startswith("text/plain")
+    assert _sample(body, 'core_http_responses_total{method="GET",route="/health",status="200"}') >= 1
+    assert (
+        _sample(
+            body,
+            'core_http_responses_total{method="GET",route="/api/market/price/{pair}",status="502"}',
+        )
+        >= 2
+    )
+    assert 'route="/api/market/price/btcidr"' not in body
+    assert _sample(body, 'core_http_responses_total{method="GET",route="unmatched",status="404"}') >= 1
+
+
+@pytest.mark.asyncio
+async def test_instrumented_redis_records_commands_and_pipelines():
+    from prometheus_client import REGISTRY
+
+    pool = ConnectionPool(
+        connection_class=getattr(
+            fakeredis.aioredis, "FakeAsyncRedisConnection", fakeredis.aioredis.FakeConnection
+        ),
+        server=fakeredis.FakeServer(),
+        decode_responses=True,
+    )
+    client = InstrumentedRedis(connection_pool=pool)
+
+    def count(command: str) -> float:
+        return REGISTRY.get_sample_value(
+            "core_redis_command_duration_seconds_count", {"command": command}
+        ) or 0.0
+
+    before_set, before_pipe = count("SET"), count("PIPELINE")
+    await client.set("a", "1")
+    async with client.pipeline(transaction=False) as pipe:
+        pipe.get("a")
+        pipe.incr("b")
+        assert await pipe.execute() == ["1", 1]
+
+    assert count("SET") == before_set + 1
+    assert count("PIPELINE") == before_pipe + 1
@@ -0,0 +1,134 @@
+import httpx
+import pytest
+import pytest_asyncio
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from worker import order_queue as order_queue_module
+from worker.order_queue import OrderJob, OrderQueue
+
+
+class DummyCoreClient:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.upstream_error = False
+        self.posts = []
+
+    async def post(self, path, payload, *, internal=False, idempotency_key=None):
+        self.posts.append((path, payload, idempotency_key))
+        if self.upstream_error and path == "/api/orders":
+            request = httpx.Request("POST", "http://core/api/orders")
+            response = httpx.Response(
+                502, headers={"X-Upstream-Error": "indodax"}, request=request
+            )
+            raise httpx.HTTPStatusError("502", request=request, response=response)
+        if self.fail and path == "/api/orders":
+            raise RuntimeError("indodax down")
+        return {"success": True, "data": {"id": 1}}
+
+
+def _job(key: str = "dca:1:20240101", **kwargs) -> OrderJob:
+    return OrderJob.for_strategy(
+        {"id": 1, "user_id": 2, "telegram_id": 3, "pair": "BTCIDR", "config_json": {}},
+        {"telegram_id": 3, "pair": "BTCIDR", "side": "buy", "type": "market", "amount": 1},
+        key=key,
+        source="dca",
+        event_type="strategy_dca",
+        message="ok",
+        failure_message="gagal",
+        **kwargs,
+    )
+
+
+@pytest_asyncio.fixture
+async def queue(monkeypatch):
+    redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    client = DummyCoreClient()
+    notifications = []
+
+    async def notify(*args, **kwargs):
+        notifications.append((args, kwargs))
+
+    monkeypatch.setattr(order_queue_module, "redis_client", redis)
+    monkeypatch.setattr(order_queue_module, "core_api_client", client)
+    monkeypatch.setattr(order_queue_module, "send_notification", notify)
+    queue = OrderQueue()
+    await queue.start(consumers=0)
+    queue.redis, queue.client, queue.notifications = redis, client, notifications
+    yield queue
+    await queue.stop()
+    await redis.aclose()
+
+
+async def _read(queue):
+    entries = await queue.redis.xreadgroup(
+        queue._group, "test", {queue._stream: ">"}, count=10
+    )
+    return entries[0][1] if entries else []
+
+
+@pytest.mark.asyncio
+async def test_submit_enqueues_once_per_idempotency_key(queue):
+    assert await queue.submit(_job(), client=None, executions=None, notify=None)
+    assert await queue.submit(_job(), client=None, executions=None, notify=None)
+    assert await queue.redis.xlen(queue._stream) == 1
+
+
+@pytest.mark.asyncio
+async def test_exclusive_job_blocks_new_keys_until_done(queue):
+    first = _job("tp_sl:1:stop_loss:202401010000", exclusive="tp_sl:1")
+    second = _job("tp_sl:1:stop_loss:202401010001", exclusive="tp_sl:1")
+    await queue.submit(first, client=None, executions=None, notify=None)
+    await queue.submit(second, client=None, executions=None, notify=None)
+    assert await queue.redis.xlen(queue._stream) == 1
+
+    await queue._process(await _read(queue), {})
+    await queue.submit(second, client=None, executions=None, notify=None)
+    assert await queue.redis.xlen(queue._stream) == 2
+
+
+@pytest.mark.asyncio
+async def test_consumer_executes_acks_and_skips_done_jobs(queue):
+    await queue.submit(_job(), client=None, executions=None, notify=None)
+    await queue._process(await _read(queue), {})
+
+    order_posts = [post for post in queue.client.posts if post[0] == "/api/orders"]
+    assert order_posts == [("/api/orders", _job().order, "dca:1:20240101")]
+    assert (await queue.redis.xpending(queue._stream, queue._group))["pending"] == 0
+    assert queue.notifications[0][1]["event_type"] == "strategy_dca_execution"
+
+    await queue.redis.xadd(queue._stream, {"job": _job().dumps()})
+    await queue._process(await _read(queue), {})
+    assert len([post for post in queue.client.posts if post[0] == "/api/orders"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_job_retries_then_dead_letters(queue):
+    queue.client.fail = True
+    await queue.submit(_job(), client=None, executions=None, notify=None)
+    messages = await _read(queue)
+    message_id = messages[0][0]
+
+    await queue._process(messages, {message_id: 1})
+    assert (await queue.redis.xpending(queue._stream, queue._group))["pending"] == 1
+    assert await queue.redis.xlen(queue._dead_stream) == 0
+
+    await queue._process(messages, {message_id: queue._max_attempts})
+    assert (await queue.redis.xpending(queue._stream, queue._group))["pending"] == 0
+    dead = await queue.redis.xrange(queue._dead_stream)
+    assert dead[0][1]["error"] == "indodax down"
+    assert queue.notifications[-1][1]["event_type"] == "strategy_dca_failed"
+
+
+@pytest.mark.asyncio
+async def test_ambiguous_upstream_failure_goes_to_review_without_retry(queue):
+    queue.client.upstream_error = True
+    await queue.submit(_job(), client=None, executions=None, notify=None)
+    messages = await _read(queue)
+
+    await queue._process(messages, {messages[0][0]: 1})
+
+    assert len([post for post in queue.client.posts if post[0] == "/api/orders"]) == 1
+    assert (await queue.redis.xpending(queue._stream, queue._group))["pending"] == 0
+    dead = await queue.redis.xrange(queue._dead_stream)
+    assert dead[0][1]["review"] == "1"
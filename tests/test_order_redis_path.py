@@ -0,0 +1,106 @@
+import types
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("sqlalchemy")
+
+from core.services import order_service as order_service_module
+from core.services.order_service import order_service
+from core.utils import rate_limiter
+from core.utils.redis_client import RedisManager
+
+
+class DummySession:
+    def add(self, obj):
+        self.obj = obj
+
+    async def commit(self):
+        return None
+
+    async def refresh(self, obj):
+        obj.id = 1
+
+
+@pytest.fixture
+def order_env(monkeypatch):
+    client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(rate_limiter, "_client", client)
+    monkeypatch.setattr(order_service_module.safety_service, "_redis", client)
+    monkeypatch.setattr(order_service_module.safety_service, "_status", None)
+    executed = []
+    original = rate_limiter.pipeline
+
+    def counting_pipeline():
+        pipe = original()
+        execute = pipe.execute
+
+        async def counted(*args, **kwargs):
+            executed.append(len(pipe.command_stack))
+            return await execute(*args, **kwargs)
+
+        pipe.execute = counted
+        return pipe
+
+    monkeypatch.setattr(rate_limiter, "pipeline", counting_pipeline)
+
+    calls = []
+
+    async def fake_call(**kwargs):
+        calls.append(kwargs)
+        return {"success": 1, "return": {"order_id": len(calls)}}
+
+    async def fake_notify(payload):
+        return None
+
+    async def credentials(session):
+        return "key", "secret"
+
+    monkeypatch.setattr(order_service_module.private_client, "call", fake_call)
+    monkeypatch.setattr(order_service_module.notification_service, "notify", fake_notify)
+    user = types.SimpleNamespace(user_id=9, telegram_id=99, credentials=credentials)
+    return types.SimpleNamespace(client=client, calls=calls, executed=executed, user=user)
+
+
+async def _place(user):
+    return await order_service.create_order(
+        DummySession(), user, pair="btcidr", side="buy", order_type="market", amount=1
+    )
+
+
+@pytest.mark.asyncio
+async def test_order_path_uses_one_pipeline_for_safety_rate_and_nonce(order_env):
+    await _place(order_env.user)
+    await _place(order_env.user)
+
+    assert [call["nonce"] for call in order_env.calls] == [1, 2]
+    assert order_env.executed == [3, 3]
+    assert await order_env.client.ttl("nonce:9") > 0
+    assert await order_env.client.exists("rate:orders:9")
+
+    await order_service_module.safety_service.pause(reason="uji", source="test")
+    with pytest.raises(ValueError, match="uji"):
+        await _place(order_env.user)
+    assert len(order_env.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_pair_scoped_pause_blocks_only_that_pair(order_env):
+    safety = order_service_module.safety_service
+    await safety.pause(reason="ETH dijeda", scope="pair", target="ethidr")
+    try:
+        await _place(order_env.user)
+        with pytest.raises(ValueError, match="ETH dijeda"):
+            await order_service.create_order(
+                DummySession(), order_env.user, pair="ethidr", side="buy", order_type="market", amount=1
+            )
+        assert len(order_env.calls) == 1
+    finally:
+        await safety.resume(scope="pair", target="ethidr")
+
+
+def test_pool_stats_before_first_use():
+    manager = RedisManager()
+    stats = manager.pool_stats()
+    assert stats["in_use"] == 0
+    assert stats["max_connections"] >= 1
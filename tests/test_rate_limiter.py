@@ -0,0 +1,48 @@
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+httpx = pytest.importorskip("httpx")
+
+from core.app import app
+from core.config import get_settings
+from core.utils import rate_limiter
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    monkeypatch.setattr(
+        rate_limiter, "_client", fakeredis.aioredis.FakeRedis(decode_responses=True)
+    )
+    monkeypatch.setitem(
+        rate_limiter.policies, "market", rate_limiter.RateLimitPolicy(limit=3, period_seconds=60)
+    )
+    return rate_limiter
+
+
+@pytest.mark.asyncio
+async def test_gcra_allows_limit_then_reports_retry_after(limiter):
+    results = [await limiter.check("market", "1.2.3.4") for _ in range(4)]
+    assert [result.allowed for result in results] == [True, True, True, False]
+    assert 0 < results[-1].retry_after <= 20
+    assert (await limiter.check("market", "5.6.7.8")).allowed is True
+
+    ttl = await limiter._client.pttl("rate:market:1.2.3.4")
+    assert 0 < ttl <= 60_000
+
+
+@pytest.mark.asyncio
+async def test_router_returns_429_and_exempts_internal_calls(monkeypatch, limiter):
+    async def fake_tickers():
+        return {"tickers": {}}
+
+    monkeypatch.setattr("core.routers.market.public_client.get_tickers", fake_tickers)
+    internal = {"X-Internal-Token": get_settings().internal_auth_token}
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        statuses = [(await client.get("/api/market/tickers")).status_code for _ in range(3)]
+        limited = await client.get("/api/market/tickers")
+        exempt = await client.get("/api/market/tickers", headers=internal)
+
+    assert statuses == [200, 200, 200]
+    assert limited.status_code == 429
+    assert int(limited.headers["Retry-After"]) >= 1
+    assert exempt.status_code == 200
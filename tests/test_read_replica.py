@@ -0,0 +1,82 @@
+import types
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from core import database
+
+
+class FakeSession:
+    def __init__(self, name: str, fail: bool = False) -> None:
+        self.name = name
+        self.fail = fail
+        self.closed = False
+
+    async def connection(self):
+        if self.fail:
+            raise OSError("replica down")
+
+    async def close(self):
+        self.closed = True
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+def _request(headers: dict[str, str] | None = None):
+    return types.SimpleNamespace(headers=headers or {})
+
+
+@pytest.fixture
+def router(monkeypatch):
+    state = types.SimpleNamespace(replica_fail=False, opened=[])
+
+    def replica_factory():
+        session = FakeSession("replica", fail=state.replica_fail)
+        state.opened.append(session)
+        return session
+
+    monkeypatch.setattr(database, "async_session_factory", lambda: FakeSession("primary"))
+    monkeypatch.setattr(database, "replica_session_factory", replica_factory)
+    state.router = database.ReadRouter()
+    return state
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_replica_unless_consistency_requested(router):
+    session, target = await router.router.open(_request())
+    assert (session.name, target) == ("replica", "replica")
+
+    session, target = await router.router.open(_request({"x-consistent-read": "1"}))
+    assert target == "primary"
+
+
+@pytest.mark.asyncio
+async def test_unreachable_replica_falls_back_and_backs_off(router):
+    router.replica_fail = True
+    session, target = await router.router.open(_request())
+    assert target == "primary"
+    assert router.opened[0].closed is True
+    assert router.router.replica_available() is False
+
+    # Selama jeda, replica tidak dicoba lagi.
+    router.replica_fail = False
+    _, target = await router.router.open(_request())
+    assert target == "primary"
+    assert len(router.opened) == 1
+
+    router.router._down_until = 0.0
+    _, target = await router.router.open(_request())
+    assert target == "replica"
+
+
+@pytest.mark.asyncio
+async def test_without_replica_everything_reads_primary(monkeypatch):
+    monkeypatch.setattr(database, "async_session_factory", lambda: FakeSession("primary"))
+    monkeypatch.setattr(database, "replica_session_factory", None)
+    session, target = await database.ReadRouter().open(_request())
+    assert (session.name, target) == ("primary", "primary")
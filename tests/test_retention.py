@@ -0,0 +1,95 @@
+import gzip
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from core.services.retention_service import RetentionService, plan
+
+
+class FakeConnection:
+    def __init__(self, chunks, fail=False):
+        self.chunks = chunks
+        self.fail = fail
+        self.statements: list[str] = []
+
+    async def copy_from_table(self, table, *, output, format, header):
+        for chunk in self.chunks:
+            await output(chunk)
+        if self.fail:
+            raise ConnectionResetError("koneksi terputus")
+        return f"COPY {len(self.chunks) - 1}"
+
+    async def get_raw_connection(self):
+        return SimpleNamespace(driver_connection=self)
+
+    async def execute(self, statement, params=None):
+        self.statements.append(str(statement))
+
+    async def commit(self):
+        pass
+
+    def begin(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def test_plan_premakes_ahead_and_expires_past_retention():
+    existing = [
+        "strategy_executions_p202606",
+        "strategy_executions_p202607",
+        "strategy_executions_p202609",
+        "strategy_executions_p202610",
+        "strategy_executions_default",
+    ]
+    steps = plan(
+        "strategy_executions",
+        existing,
+        datetime(2026, 10, 19),
+        retention_months=3,
+        premake_months=2,
+    )
+    assert steps["create"] == [datetime(2026, 11, 1), datetime(2026, 12, 1)]
+    # Juli masih dalam 3 bulan terakhir; Juni sudah lewat.
+    assert steps["expire"] == ["strategy_executions_p202606"]
+
+
+@pytest.mark.asyncio
+async def test_partition_dropped_only_after_archive_written(tmp_path):
+    service = RetentionService()
+    service._archive_dir = tmp_path
+    conn = FakeConnection([b"id,created_at\n", b"1,2026-06-01\n", b"2,2026-06-02\n"])
+
+    archive = await service.expire_partition(conn, "audit_logs", "audit_logs_p202606")
+
+    path = tmp_path / "audit_logs" / "audit_logs_p202606.csv.gz"
+    assert archive["rows"] == 2 and archive["path"] == str(path)
+    assert gzip.decompress(path.read_bytes()).splitlines() == [
+        b"id,created_at",
+        b"1,2026-06-01",
+        b"2,2026-06-02",
+    ]
+    assert conn.statements == [
+        "ALTER TABLE audit_logs DETACH PARTITION audit_logs_p202606",
+        "DROP TABLE audit_logs_p202606",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_failed_export_keeps_partition(tmp_path):
+    service = RetentionService()
+    service._archive_dir = tmp_path
+    conn = FakeConnection([b"id,created_at\n"], fail=True)
+
+    with pytest.raises(ConnectionResetError):
+        await service.expire_partition(conn, "audit_logs", "audit_logs_p202606")
+
+    assert conn.statements == []
+    assert list((tmp_path / "audit_logs").iterdir()) == []
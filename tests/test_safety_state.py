@@ -0,0 +1,170 @@
+import asyncio
+import json
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from core.services.safety_service import SafetyService
+from worker.utils import safety as worker_safety
+
+
+async def _wait_for(predicate) -> None:
+    for _ in range(200):
+        if predicate():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("kondisi tidak terpenuhi")
+
+
+@pytest.mark.asyncio
+async def test_pause_reaches_core_and_worker_without_polling(monkeypatch):
+    server = fakeredis.FakeServer()
+    admin, replica = SafetyService(), SafetyService()
+    for service in (admin, replica):
+        service._redis = fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+
+    http_reads = []
+
+    async def fake_http_status():
+        http_reads.append(1)
+        return {"paused": False}
+
+    monkeypatch.setattr(
+        worker_safety,
+        "redis_client",
+        fakeredis.aioredis.FakeRedis(server=server, decode_responses=True),
+    )
+    monkeypatch.setattr(worker_safety, "get_safety_status", fake_http_status)
+    monitor = worker_safety.SafetyMonitor()
+    monkeypatch.setattr(worker_safety, "safety_monitor", monitor)
+
+    assert replica.cached_status() is None
+    await replica.start()
+    await monitor.start()
+    await _wait_for(lambda: replica.cached_status() is not None and monitor.status is not None)
+    assert await worker_safety.ensure_trading_active() is True
+
+    await admin.pause(reason="Indodax error", source="test")
+    await _wait_for(lambda: replica.cached_status()["paused"])
+    await _wait_for(lambda: monitor.status.get("paused"))
+    assert (await replica.get_status())["reason"] == "Indodax error"
+    assert await worker_safety.ensure_trading_active() is False
+
+    await admin.resume()
+    await _wait_for(lambda: not monitor.status.get("paused"))
+    assert await worker_safety.ensure_trading_active() is True
+    assert http_reads == [1]
+
+    await monitor.stop()
+    await replica.stop()
+    assert replica.cached_status() is None
+
+
+@pytest.mark.asyncio
+async def test_scoped_pause_only_blocks_its_share(monkeypatch):
+    server = fakeredis.FakeServer()
+    admin, replica = SafetyService(), SafetyService()
+    for service in (admin, replica):
+        service._redis = fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+    monkeypatch.setattr(
+        worker_safety,
+        "redis_client",
+        fakeredis.aioredis.FakeRedis(server=server, decode_responses=True),
+    )
+
+    async def http_status():
+        return await admin.get_status()
+
+    monkeypatch.setattr(worker_safety, "get_safety_status", http_status)
+    monitor = worker_safety.SafetyMonitor()
+    await replica.start()
+    await monitor.start()
+    await _wait_for(lambda: replica.cached_snapshot() is not None and monitor.status is not None)
+
+    await admin.pause(reason="BTC bermasalah", source="test", scope="pair", target="btcidr")
+    await admin.pause(reason="Grid dijeda", scope="strategy_type", target="GRID")
+    await _wait_for(lambda: len(replica.cached_snapshot()) == 3)
+    await _wait_for(lambda: len(monitor.scopes) == 2)
+
+    snapshot = replica.cached_snapshot()
+    assert SafetyService.blocking(snapshot, pair="BTCIDR", user_id=1)["reason"] == "BTC bermasalah"
+    assert SafetyService.blocking(snapshot, pair="ETHIDR", user_id=1) is None
+    assert SafetyService.blocking(snapshot, pair="ETHIDR", strategy_type="grid")["reason"] == "Grid dijeda"
+    assert monitor.paused_for(pair="btcidr", user_id=1, strategy_type="dca") is not None
+    assert monitor.paused_for(pair="ETHIDR", user_id=1, strategy_type="dca") is None
+    assert await worker_safety.ensure_trading_active() is True
+    status = await admin.get_status()
+    assert status["paused"] is False
+    assert {entry["scope_key"] for entry in status["scopes"]} == {"pair:BTCIDR", "strategy_type:grid"}
+
+    await admin.resume(scope="pair", target="BTCIDR")
+    await _wait_for(lambda: "pair:BTCIDR" not in replica.cached_snapshot())
+    await _wait_for(lambda: "pair:BTCIDR" not in monitor.scopes)
+
+    await monitor.stop()
+    await replica.stop()
+
+
+@pytest.mark.asyncio
+async def test_legacy_global_pause_is_migrated():
+    service = SafetyService()
+    service._redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    await service._redis.set(
+        "safety:deadman", '{"paused": true, "reason": "lama", "source": "ops"}'
+    )
+    await service._refresh()
+    assert service._status["paused"] is True
+    assert await service._redis.exists("safety:deadman") == 0
+    assert (await service.get_status())["reason"] == "lama"
+
+
+@pytest.mark.asyncio
+async def test_refresh_does_not_overwrite_newer_pubsub_state(monkeypatch):
+    server = fakeredis.FakeServer()
+    admin, service = SafetyService(), SafetyService()
+    for item in (admin, service):
+        item._redis = fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+    await admin.pause(reason="pair", scope="pair", target="BTCIDR")
+    stale = await service._redis.hgetall("safety:pauses")
+    paused = await admin.pause(reason="global", source="ops")
+    resumed = await admin.resume(scope="pair", target="BTCIDR")
+
+    async def slow_hgetall(key):
+        # Event pub/sub tiba selama HGETALL berjalan; hasil HGETALL sudah basi.
+        service._apply(json.dumps(paused))
+        service._apply(json.dumps(resumed))
+        return stale
+
+    monkeypatch.setattr(service._redis, "hgetall", slow_hgetall)
+    await service._refresh()
+    assert service._status["paused"] is True
+    assert service._scopes == {}
+
+    # Tanpa event baru, refresh berikutnya kembali mengikuti isi Redis.
+    async def plain_hgetall(key):
+        return stale
+
+    monkeypatch.setattr(service._redis, "hgetall", plain_hgetall)
+    await service._refresh()
+    assert service._status["paused"] is False
+    assert "pair:BTCIDR" in service._scopes
+
+
+@pytest.mark.asyncio
+async def test_worker_refresh_keeps_newer_pubsub_state(monkeypatch):
+    monitor = worker_safety.SafetyMonitor()
+    newer = {
+        "paused": True,
+        "reason": "baru",
+        "updated_at": "2026-10-19T10:00:01",
+        "scope_key": "global",
+    }
+
+    async def stale_status():
+        monitor._apply(newer)
+        return {"paused": False, "updated_at": "2026-10-19T10:00:00", "scopes": []}
+
+    monkeypatch.setattr(worker_safety, "get_safety_status", stale_status)
+    await monitor._refresh()
+    assert monitor._status["reason"] == "baru"
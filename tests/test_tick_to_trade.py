@@ -0,0 +1,99 @@
+import httpx
+import pytest
+
+from core.indodax_private_client import IndodaxPrivateClient
+from worker.latency import TickToTradeTracker, segments, stamp
+from worker.order_queue import OrderJob, execute_order_job
+from worker.price_feed import PriceFeed
+
+TIMINGS = {
+    "tick_at": 100.0,
+    "decided_at": 100.01,
+    "core_received_at": 100.05,
+    "exchange_sent_at": 100.06,
+    "exchange_ack_at": 100.26,
+}
+
+
+def test_segments_follow_stage_order():
+    measured = segments(TIMINGS)
+    assert measured["tick->decided"] == pytest.approx(10.0)
+    assert measured["core_received->exchange_sent"] == pytest.approx(10.0)
+    assert measured["exchange_sent->exchange_ack"] == pytest.approx(200.0)
+    assert measured["total"] == pytest.approx(260.0)
+    # Tanpa tick (mis. DCA) total diukur dari keputusan.
+    without_tick = {name: value for name, value in TIMINGS.items() if name != "tick_at"}
+    assert segments(without_tick)["total"] == pytest.approx(250.0)
+
+
+def test_tracker_reports_rolling_percentiles_per_strategy_type():
+    tracker = TickToTradeTracker(window=3)
+    for offset in (0.1, 0.2, 0.3, 0.4):
+        tracker.record("tp_sl", {**TIMINGS, "exchange_ack_at": 100.0 + offset})
+    tracker.record("dca", {"decided_at": 1.0})
+
+    report = tracker.report()
+    assert set(report) == {"tp_sl"}
+    assert report["tp_sl"]["samples"] == 3
+    total = report["tp_sl"]["segments_ms"]["total"]
+    assert total["p50"] == pytest.approx(300.0)
+    assert total["p99"] == pytest.approx(400.0)
+
+
+def test_price_feed_stamps_tick_receipt():
+    feed = PriceFeed()
+    feed._handle_message('42["market:update", [{"pair": "btcidr", "last": "100"}]]')
+    assert feed.received_at("BTCIDR") is not None
+    assert feed.received_at("ETHIDR") is None
+
+
+@pytest.mark.asyncio
+async def test_private_client_stamps_exchange_send_and_ack():
+    client = IndodaxPrivateClient()
+    client._client = httpx.AsyncClient(
+        base_url=client.BASE_URL,
+        transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, json={"success": 1, "return": {"order_id": 7}})
+        ),
+    )
+    timings = {"core_received_at": 1.0}
+    await client.call(1, "trade", {"pair": "btc_idr"}, "key", "secret", nonce=5, timings=timings)
+    await client.close()
+    assert timings["exchange_sent_at"] <= timings["exchange_ack_at"]
+
+
+@pytest.mark.asyncio
+async def test_execution_detail_carries_timings(monkeypatch):
+    from worker import order_queue as order_queue_module
+
+    tracker = TickToTradeTracker(window=10)
+    monkeypatch.setattr(order_queue_module, "tick_to_trade", tracker)
+
+    class Client:
+        async def post(self, path, payload, *, internal=False, idempotency_key=None):
+            return {"success": True, "data": {"id": 1, "timings": {**payload["timings"], **TIMINGS}}}
+
+    class Executions:
+        def __init__(self):
+            self.entries = []
+
+        def add(self, strategy, status, detail=None):
+            self.entries.append((status, detail))
+
+    async def notify(*_args, **_kwargs):
+        return None
+
+    job = OrderJob.for_strategy(
+        {"id": 1, "user_id": 2, "telegram_id": 3, "pair": "BTCIDR"},
+        {"pair": "BTCIDR", "timings": stamp(tick_at=100.0, decided_at=100.01)},
+        key="tp_sl:1",
+        source="tp_sl",
+    )
+    executions = Executions()
+    await execute_order_job(job, client=Client(), executions=executions, notify=notify)
+
+    status, detail = executions.entries[0]
+    assert status == "success"
+    assert detail["timings"]["exchange_ack_at"] == TIMINGS["exchange_ack_at"]
+    assert detail["latency_ms"]["total"] == pytest.approx(260.0)
+    assert tracker.report()["tp_sl"]["samples"] == 1
@@ -0,0 +1,46 @@
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("cryptography")
+
+from bot.services.token_store import TokenStore
+
+
+@pytest.fixture
+def store():
+    store = TokenStore()
+    store._redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    store._secret_key = "s" * 32
+    return store
+
+
+@pytest.mark.asyncio
+async def test_get_token_uses_single_pipeline_then_cache(store, monkeypatch):
+    await store._redis.set("user_token:1", "plain-token", ex=120)
+    pipelines = 0
+    original = store._redis.pipeline
+
+    def counting_pipeline(*args, **kwargs):
+        nonlocal pipelines
+        pipelines += 1
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(store._redis, "pipeline", counting_pipeline)
+
+    token, ttl = await store.get_token_with_ttl(1)
+    assert token == "plain-token" and 0 < ttl <= 120
+    assert (await store._redis.get("user_token:1")).startswith("enc:")
+
+    again, cached_ttl = await store.get_token_with_ttl(1)
+    assert again == "plain-token" and cached_ttl <= ttl
+    assert pipelines == 1
+
+
+@pytest.mark.asyncio
+async def test_set_and_delete_keep_cache_consistent(store):
+    await store.set_token(2, "first")
+    await store.set_token(2, "second")
+    assert (await store.get_token_with_ttl(2))[0] == "second"
+
+    await store.delete_token(2)
+    assert await store.get_token_with_ttl(2) == (None, None)
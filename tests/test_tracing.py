@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+respx = pytest.importorskip("respx")
+fakeredis = pytest.importorskip("fakeredis")
+
+from bot.services.api_client import CoreAPIClient
+from bot.utils import tracing as bot_tracing
+from core.app import app
+from core.utils import rate_limiter
+from core.utils import tracing as core_tracing
+
+
+def _spans(path):
+    spans = []
+    for line in path.read_text().splitlines():
+        for resource in json.loads(line)["resourceSpans"]:
+            service = resource["resource"]["attributes"][0]["value"]["stringValue"]
+            for scope in resource["scopeSpans"]:
+                spans.extend({**span, "service": service} for span in scope["spans"])
+    return spans
+
+
+def test_traceparent_roundtrip_and_rejects_garbage():
+    context = core_tracing.SpanContext("a" * 32, "b" * 16, True)
+    assert core_tracing.SpanContext.parse(context.traceparent()) == context
+    assert core_tracing.SpanContext.parse("00-xyz-1-01") is None
+    assert core_tracing.SpanContext.parse(None) is None
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_trace_flows_from_bot_through_core_to_indodax(monkeypatch, tmp_path):
+    bot_file, core_file = tmp_path / "bot.jsonl", tmp_path / "core.jsonl"
+    bot_tracer, core_tracer = bot_tracing.tracer, core_tracing.tracer
+    monkeypatch.setattr(bot_tracer, "exporter", bot_tracing.JsonlExporter(str(bot_file), "telegram-bot"))
+    monkeypatch.setattr(bot_tracer, "_sample_rate", 1.0)
+    monkeypatch.setattr(core_tracer, "exporter", core_tracing.JsonlExporter(str(core_file), "trading-core"))
+    monkeypatch.setattr(rate_limiter, "_client", fakeredis.aioredis.FakeRedis(decode_responses=True))
+    respx.get("https://indodax.com/api/ticker/trcidr").mock(
+        return_value=httpx.Response(200, json={"ticker": {"last": "10"}})
+    )
+    respx.get("https://indodax.com/api/depth/trcidr").mock(
+        return_value=httpx.Response(200, json={"buy": [], "sell": []})
+    )
+
+    client = CoreAPIClient()
+    client._client = httpx.AsyncClient(app=app, base_url="http://core")
+    with bot_tracer.span("telegram uji", kind="server") as root:
+        await client.get("/api/market/price/trcidr")
+    await client.close()
+    bot_tracer.exporter.shutdown()
+    core_tracer.exporter.shutdown()
+
+    bot_spans, core_spans = _spans(bot_file), _spans(core_file)
+    trace_ids = {span["traceId"] for span in bot_spans + core_spans}
+    assert trace_ids == {root.context.trace_id}
+
+    client_span = next(span for span in bot_spans if span["kind"] == "SPAN_KIND_CLIENT")
+    server_span = next(span for span in core_spans if span["kind"] == "SPAN_KIND_SERVER")
+    assert server_span["name"] == "GET /api/market/price/{pair}"
+    assert server_span["parentSpanId"] == client_span["spanId"]
+    indodax = [span for span in core_spans if span["name"].startswith("indodax public")]
+    assert {span["name"] for span in indodax} == {"indodax public ticker", "indodax public depth"}
+    assert all(span["parentSpanId"] == server_span["spanId"] for span in indodax)
+
+
+@pytest.mark.asyncio
+async def test_unsampled_edge_propagates_ids_without_exporting(monkeypatch, tmp_path):
+    path = tmp_path / "core.jsonl"
+    tracer = core_tracing.Tracer("trading-core", str(path), sample_rate=0.0)
+    with tracer.span("root") as root:
+        with tracer.leaf("redis GET") as leaf:
+            assert leaf is None
+        assert tracer.traceparent().endswith("-00")
+        assert tracer.current().trace_id == root.context.trace_id
+    tracer.exporter.shutdown()
+    assert not path.exists()
@@ -0,0 +1,80 @@
+import httpx
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from core.indodax_private_client import IndodaxPrivateClient, IndodaxPrivateClientError
+from core.services import safety_service as safety_module
+from core.services.safety_service import SafetyService
+from core.utils import upstream
+from core.utils.upstream import InstrumentedTransport, UpstreamTelemetry
+
+
+@pytest.fixture
+def telemetry(monkeypatch):
+    tracker = UpstreamTelemetry()
+    tracker.min_requests = 4
+    tracker.error_budget = 0.5
+    tracker.breach_seconds = 0
+    monkeypatch.setattr(upstream, "upstream_telemetry", tracker)
+    monkeypatch.setattr(safety_module, "upstream_telemetry", tracker)
+    return tracker
+
+
+def _client(handler) -> IndodaxPrivateClient:
+    client = IndodaxPrivateClient()
+    client._client = httpx.AsyncClient(
+        base_url=client.BASE_URL,
+        transport=InstrumentedTransport("private", httpx.MockTransport(handler)),
+    )
+    return client
+
+
+@pytest.mark.asyncio
+async def test_transport_records_status_and_indodax_errors(telemetry):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if b"method=trade" in request.content:
+            return httpx.Response(200, json={"success": 0, "error": "Insufficient balance."})
+        return httpx.Response(502)
+
+    client = _client(handler)
+    with pytest.raises(IndodaxPrivateClientError):
+        await client.call(1, "trade", {"pair": "btc_idr"}, "key", "secret", nonce=1)
+    with pytest.raises(httpx.HTTPStatusError):
+        await client.call(1, "getInfo", {}, "key", "secret", nonce=2)
+    await client.close()
+
+    report = telemetry.report()
+    trade = report["private:trade"]
+    assert trade["errors"] == {"Insufficient balance.": 1}
+    # Penolakan bisnis tidak menghabiskan error budget.
+    assert trade["failed"] == 0
+    assert report["private:getInfo"]["statuses"] == {"502": 1}
+    assert report["private:getInfo"]["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_single_timeout_does_not_pause_but_sustained_breach_does(telemetry):
+    service = SafetyService()
+    service._redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+
+    def timeout(request: httpx.Request) -> httpx.Response:
+        raise httpx.ReadTimeout("timeout", request=request)
+
+    client = _client(timeout)
+    with pytest.raises(httpx.ReadTimeout):
+        await client.call(1, "trade", {}, "key", "secret", nonce=1)
+    assert await service.check_upstream() is None
+    assert (await service.get_status())["paused"] is False
+
+    for nonce in range(2, 5):
+        with pytest.raises(httpx.ReadTimeout):
+            await client.call(1, "trade", {}, "key", "secret", nonce=nonce)
+    await client.close()
+
+    status = await service.check_upstream()
+    assert status["paused"] is True
+    assert status["source"] == "indodax_slo"
+    assert "trade" in status["reason"]
+    # Sudah dijeda: evaluasi berikutnya tidak menimpa status.
+    assert await service.check_upstream() is None
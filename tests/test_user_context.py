@@ -0,0 +1,150 @@
+import asyncio
+import types
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+httpx = pytest.importorskip("httpx")
+
+from core.app import app
+from core.database import get_session
+from core.services.auth_service import auth_service
+
+
+@pytest.fixture
+def resolved(monkeypatch):
+    raw_token = "sample-token"
+    user = types.SimpleNamespace(
+        id=5,
+        telegram_id=777,
+        api_token_hash=auth_service._hash_token(raw_token),
+        api_token_expires_at=datetime.utcnow() + timedelta(hours=1),
+    )
+    key = types.SimpleNamespace(id=9)
+    calls = []
+
+    async def fake_get_with_active_key(session, telegram_id):
+        calls.append(telegram_id)
+        return (user, key) if telegram_id == user.telegram_id else (None, None)
+
+    async def override_session():
+        yield object()
+
+    monkeypatch.setattr(
+        "core.services.auth_service.user_repository.get_with_active_key",
+        fake_get_with_active_key,
+    )
+    app.dependency_overrides[get_session] = override_session
+    yield types.SimpleNamespace(token=raw_token, user=user, key=key, calls=calls)
+    app.dependency_overrides.pop(get_session, None)
+
+
+@pytest.mark.asyncio
+async def test_context_is_resolved_once_from_query(monkeypatch, resolved):
+    async def fake_pnl(session, user):
+        return {"user_id": user.user_id, "key_id": user.key.id}
+
+    monkeypatch.setattr("core.routers.pnl.pnl_service.get_realized_pnl", fake_pnl)
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get(
+            "/api/pnl",
+            params={"telegram_id": 777},
+            headers={"Authorization": f"Bearer {resolved.token}"},
+        )
+        rejected = await client.get(
+            "/api/pnl",
+            params={"telegram_id": 777},
+            headers={"Authorization": "Bearer salah"},
+        )
+
+    assert response.status_code == 200
+    assert response.json()["data"] == {"user_id": 5, "key_id": 9}
+    assert rejected.status_code == 401
+    assert resolved.calls == [777, 777]
+
+
+@pytest.mark.asyncio
+async def test_context_reads_telegram_id_from_body(monkeypatch, resolved):
+    async def fake_create_alert(session, user, **kwargs):
+        return types.SimpleNamespace(
+            model_dump=lambda: {"user_id": user.user_id, "pair": kwargs["pair"]}
+        )
+
+    monkeypatch.setattr(
+        "core.routers.alerts.alert_service.create_alert", fake_create_alert
+    )
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post(
+            "/api/alerts",
+            json={
+                "telegram_id": 777,
+                "pair": "BTCIDR",
+                "target_price": 100.0,
+                "direction": "above",
+            },
+            headers={"Authorization": f"Bearer {resolved.token}"},
+        )
+
+    assert response.status_code == 200, response.text
+    assert response.json()["data"] == {"user_id": 5, "pair": "BTCIDR"}
+    assert resolved.calls == [777]
+
+
+@pytest.mark.asyncio
+async def test_token_cache_skips_db_and_honours_broadcast_invalidation(
+    monkeypatch, resolved
+):
+    fakeredis = pytest.importorskip("fakeredis")
+    from core.utils.token_cache import TokenCache
+
+    server = fakeredis.FakeServer()
+    local, peer = TokenCache(), TokenCache()
+    for cache in (local, peer):
+        cache._client = fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+    monkeypatch.setattr("core.services.auth_service.token_cache", local)
+    await local.start()
+    while not local.active:
+        await asyncio.sleep(0.01)
+
+    async def fake_pnl(session, user):
+        return {"user_id": user.user_id}
+
+    monkeypatch.setattr("core.routers.pnl.pnl_service.get_realized_pnl", fake_pnl)
+    headers = {"Authorization": f"Bearer {resolved.token}"}
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        for _ in range(3):
+            response = await client.get("/api/pnl", params={"telegram_id": 777}, headers=headers)
+            assert response.json()["data"] == {"user_id": 5}
+        assert resolved.calls == [777]
+
+        await peer.broadcast_invalidation(auth_service._hash_token(resolved.token))
+        for _ in range(100):
+            if not local._entries:
+                break
+            await asyncio.sleep(0.01)
+        resolved.user.api_token_hash = None
+        response = await client.get("/api/pnl", params={"telegram_id": 777}, headers=headers)
+
+    await local.stop()
+    assert response.status_code == 401
+    assert resolved.calls == [777, 777]
+
+
+def test_token_cache_skips_put_when_invalidated_during_lookup():
+    from core.utils.token_cache import TokenCache
+
+    cache = TokenCache()
+    cache._listening = True
+    expires_at = datetime.utcnow() + timedelta(hours=1)
+
+    generation = cache.generation
+    # Revokasi diproses saat lookup DB untuk token yang sama masih berjalan.
+    cache.invalidate("hash")
+    cache.put("hash", user_id=5, telegram_id=777, expires_at=expires_at, generation=generation)
+    assert cache.get("hash", 777) is None
+
+    cache.put(
+        "hash", user_id=5, telegram_id=777, expires_at=expires_at, generation=cache.generation
+    )
+    assert cache.get("hash", 777).user_id == 5
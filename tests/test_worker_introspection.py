@@ -0,0 +1,45 @@
+import time
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("prometheus_client")
+from aiohttp.test_utils import TestClient, TestServer
+
+from worker import introspection
+from worker import order_queue as order_queue_module
+from worker.price_feed import PriceFeed
+
+
+@pytest.mark.asyncio
+async def test_metrics_and_debug_state_expose_worker_internals(monkeypatch):
+    redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(order_queue_module, "redis_client", redis)
+    await redis.xadd("worker:orders", {"job": "{}"})
+    await redis.xadd("worker:orders:dead", {"job": "{}"})
+
+    feed = PriceFeed()
+    feed._handle_message('42["market:update",[{"pair":"btcidr","last":"100"}]]')
+    feed._cache["ETHIDR"] = (10.0, time.time() - 30)
+    monkeypatch.setattr(introspection, "price_feed", feed)
+    monkeypatch.setattr(introspection.safety_monitor, "_listening", True)
+    monkeypatch.setattr(
+        introspection.safety_monitor, "_status", {"paused": True, "reason": "uji"}
+    )
+
+    async with TestClient(TestServer(introspection.create_app())) as client:
+        state = await (await client.get("/debug/state")).json()
+        metrics = await (await client.get("/metrics")).text()
+
+    assert state["safety"]["reason"] == "uji"
+    assert state["price_feed"]["pairs"] == 2
+    assert state["price_feed"]["ticks"] == 1
+    assert state["price_feed"]["age_max"] >= 30
+    assert state["order_queue"]["length"] == 1
+    assert state["order_queue"]["dead"] == 1
+    assert "jobs" in state
+    assert state["owned_shards"] == introspection.shard_coordinator.owned_shards()
+    assert all(isinstance(shard, int) for shard in state["owned_shards"])
+    assert "worker_order_queue_length 1.0" in metrics
+    assert "worker_safety_paused 1.0" in metrics
+    assert 'worker_price_age_seconds{pair="ETHIDR"}' in metrics
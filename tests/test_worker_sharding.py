@@ -0,0 +1,26 @@
+import pytest
+
+pytest.importorskip("redis")
+
+from worker.sharding import assign_shards, shard_for
+
+
+def test_assign_shards_is_deterministic_and_complete():
+    replicas = ["worker-a", "worker-b", "worker-c"]
+    first = assign_shards(replicas, 64)
+    second = assign_shards(list(reversed(replicas)), 64)
+    assert first == second
+    assert set(first) == set(range(64))
+    assert set(first.values()) == set(replicas)
+
+
+def test_removing_replica_only_moves_its_shards():
+    before = assign_shards(["worker-a", "worker-b", "worker-c"], 64)
+    after = assign_shards(["worker-a", "worker-b"], 64)
+    for shard, replica in before.items():
+        if replica != "worker-c":
+            assert after[shard] == replica
+
+
+def test_shard_for_is_stable():
+    assert shard_for(130, 64) == shard_for(130, 64) == 2
@@ -1,7 +1,10 @@
+import asyncio
+
 import pytest
 
 pendulum = pytest.importorskip("pendulum")
 
+from worker.runner import JobRunner
 from worker.tasks import alerts, grid, tp_sl
 
 
@@ -18,7 +21,7 @@ class DummyCoreClient:
             return handler(params)
         return handler
 
-    async def post(self, path, payload, *, internal=False):
+    async def post(self, path, payload, *, internal=False, idempotency_key=None):
         self.posts.append((path, payload, internal))
         handler = self._responses.get(("POST", path))
         if callable(handler):
@@ -26,6 +29,14 @@ class DummyCoreClient:
         return handler or {"success": True}
 
 
+class FixedPriceFeed:
+    def __init__(self, price):
+        self.price = price
+
+    async def get_price(self, pair):
+        return self.price
+
+
 @pytest.mark.asyncio
 async def test_grid_skips_existing_orders(monkeypatch):
     strategy = {
@@ -52,7 +63,9 @@ async def test_grid_skips_existing_orders(monkeypatch):
     client = DummyCoreClient(
         {
             ("GET", "/api/strategies/active"): lambda params: {"data": [strategy]},
-            ("GET", "/api/orders/open"): lambda params: {"data": existing_orders},
+            ("GET", "/api/orders/open/strategies"): lambda params: {
+                "data": {"1": existing_orders}
+            },
         }
     )
     monkeypatch.setattr(grid, "core_api_client", client)
@@ -60,24 +73,23 @@ async def test_grid_skips_existing_orders(monkeypatch):
     async def always_true() -> bool:
         return True
 
-    async def noop_trigger(*_args, **_kwargs) -> None:
-        return None
-
     async def fake_send_notification(*args, **kwargs):
         return None
 
     monkeypatch.setattr(grid, "ensure_trading_active", always_true)
     monkeypatch.setattr(grid, "send_notification", fake_send_notification)
-    monkeypatch.setattr(grid, "trigger_deadman", noop_trigger)
     monkeypatch.setattr(grid.pendulum, "now", lambda tz: pendulum.datetime(2024, 1, 1, tz=tz))
+    monkeypatch.setattr(grid, "price_feed", FixedPriceFeed(150_000_000))
 
     await grid.run_grid_strategies()
 
+    # Level 150jt (harga saat ini) dibiarkan kosong; hanya level sell 200jt yang ditempatkan.
     order_posts = [item for item in client.posts if item[0] == "/api/orders"]
-    assert len(order_posts) == 2
+    assert len(order_posts) == 1
     for _, payload, _ in order_posts:
         assert payload["is_strategy_order"] is True
         assert payload["strategy_id"] == strategy["id"]
+        assert (payload["side"], payload["price"]) == ("sell", 200_000_000)
     # Ensure internal token used for worker-only endpoints
     assert all(call[2] is True for call in client.get_calls if call[0] != "/api/orders")
 
@@ -109,7 +121,9 @@ async def test_grid_cancels_stale_orders(monkeypatch):
     client = DummyCoreClient(
         {
             ("GET", "/api/strategies/active"): lambda params: {"data": [strategy]},
-            ("GET", "/api/orders/open"): lambda params: {"data": stale_orders},
+            ("GET", "/api/orders/open/strategies"): lambda params: {
+                "data": {"2": stale_orders}
+            },
         }
     )
     monkeypatch.setattr(grid, "core_api_client", client)
@@ -117,16 +131,13 @@ async def test_grid_cancels_stale_orders(monkeypatch):
     async def always_true() -> bool:
         return True
 
-    async def noop_trigger(*_args, **_kwargs) -> None:
-        return None
-
     async def fake_send_notification(*_args, **_kwargs):
         return None
 
     monkeypatch.setattr(grid, "ensure_trading_active", always_true)
     monkeypatch.setattr(grid, "send_notification", fake_send_notification)
-    monkeypatch.setattr(grid, "trigger_deadman", noop_trigger)
     monkeypatch.setattr(grid.pendulum, "now", lambda tz: pendulum.datetime(2024, 1, 1, tz=tz))
+    monkeypatch.setattr(grid, "price_feed", FixedPriceFeed(12_500_000))
 
     await grid.run_grid_strategies()
 
@@ -167,13 +178,9 @@ async def test_tp_sl_marks_orders_and_logs(monkeypatch):
     async def noop_notify(*_args, **_kwargs):
         return None
 
-    async def noop_deadman(*_args, **_kwargs):
-        return None
-
     monkeypatch.setattr(tp_sl, "ensure_trading_active", ensure_true)
     monkeypatch.setattr(tp_sl.price_feed, "get_price", fake_price)
     monkeypatch.setattr(tp_sl, "send_notification", noop_notify)
-    monkeypatch.setattr(tp_sl, "trigger_deadman", noop_deadman)
     monkeypatch.setattr(tp_sl.pendulum, "now", lambda tz: pendulum.datetime(2024, 1, 1, tz=tz))
 
     await tp_sl.monitor_tp_sl()
@@ -185,6 +192,8 @@ async def test_tp_sl_marks_orders_and_logs(monkeypatch):
     assert payload["strategy_id"] == strategy["id"]
     log_posts = [item for item in client.posts if "executions" in item[0]]
     assert log_posts and log_posts[0][2] is True
+    assert log_posts[0][0] == "/api/strategies/executions/batch"
+    assert log_posts[0][1]["executions"][0]["strategy_id"] == strategy["id"]
 
 
 @pytest.mark.asyncio
@@ -202,7 +211,7 @@ async def test_alerts_use_internal_token(monkeypatch):
     client = DummyCoreClient(
         {
             ("GET", "/api/alerts/active"): {"data": alerts_data},
-            ("POST", "/api/alerts/10/trigger"): {"success": True},
+            ("POST", "/api/alerts/trigger-batch"): {"success": True},
         }
     )
     monkeypatch.setattr(alerts, "core_api_client", client)
@@ -220,5 +229,56 @@ async def test_alerts_use_internal_token(monkeypatch):
     await alerts.check_price_alerts()
 
     assert client.get_calls[0][2] is True
-    trigger_calls = [post for post in client.posts if post[0].endswith("/trigger")]
-    assert trigger_calls and trigger_calls[0][2] is True
+    trigger_calls = [post for post in client.posts if post[0] == "/api/alerts/trigger-batch"]
+    assert len(trigger_calls) == 1 and trigger_calls[0][2] is True
+    assert trigger_calls[0][1] == {"alert_ids": [10]}
+
+
+@pytest.mark.asyncio
+async def test_task_flushes_execution_logs_when_cancelled_by_deadline(monkeypatch):
+    posts = []
+
+    class Client:
+        async def get(self, path, params=None, *, internal=False):
+            strategy = {
+                "id": 1,
+                "user_id": 2,
+                "telegram_id": 3,
+                "pair": "BTCIDR",
+                "config_json": {"entry_price": 200, "stop_loss_pct": 10, "amount": 1},
+            }
+            return {"data": [strategy] * 3}
+
+        async def post(self, path, payload, *, internal=False, idempotency_key=None):
+            posts.append(path)
+            return {"success": True}
+
+    class Feed:
+        async def get_price(self, pair):
+            await asyncio.sleep(0.05)
+            return 100.0
+
+        def received_at(self, pair):
+            return None
+
+    class Queue:
+        async def submit(self, job, *, client, executions, notify):
+            executions.add(job.strategy, "success", {})
+
+    async def always_true():
+        return True
+
+    monkeypatch.setattr(tp_sl, "core_api_client", Client())
+    monkeypatch.setattr(tp_sl, "price_feed", Feed())
+    monkeypatch.setattr(tp_sl, "order_queue", Queue())
+    monkeypatch.setattr(tp_sl, "ensure_trading_active", always_true)
+    monkeypatch.setattr(tp_sl.shard_coordinator, "owns", lambda user_id: True)
+
+    runner = JobRunner()
+    runner.add_job(tp_sl.monitor_tp_sl, 0.01, deadline=0.08)
+    runner.start()
+    await asyncio.sleep(0.1)
+    await runner.stop()
+
+    # Strategi pertama sudah dieksekusi sebelum deadline memotong loop.
+    assert "/api/strategies/executions/batch" in posts
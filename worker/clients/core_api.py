@@ -1,10 +1,23 @@
 from __future__ import annotations
 
+import asyncio
+import random
 from typing import Any
 
 import httpx
 
 from worker.config import get_settings
+from worker.utils.tracing import tracer
+
+_RETRYABLE_STATUS = {409, 502, 503, 504}
+
+
+def is_upstream_error(exc: BaseException) -> bool:
+    """502 dari core karena Indodax gagal menjawab; hasil order belum pasti."""
+    return (
+        isinstance(exc, httpx.HTTPStatusError)
+        and "x-upstream-error" in exc.response.headers
+    )
 
 
 class CoreAPIClient:
@@ -12,20 +25,88 @@ class CoreAPIClient:
         settings = get_settings()
         self._client = httpx.AsyncClient(base_url=str(settings.core_api_base_url), timeout=10.0)
         self._internal_token = settings.core_api_internal_token
+        self._retry_attempts = max(settings.core_api_retry_attempts, 1)
+        self._hedge_delay = settings.core_api_hedge_delay_seconds
 
     def _headers(self, internal: bool) -> dict[str, str]:
         if internal and self._internal_token:
             return {"X-Internal-Token": self._internal_token}
         return {}
 
+    async def _send(
+        self, method: str, path: str, *, headers: dict[str, str], **kwargs: Any
+    ) -> httpx.Response:
+        with tracer.span(f"core {method} {path}", kind="client") as span:
+            response = await self._client.request(
+                method,
+                path,
+                headers={**headers, "traceparent": span.context.traceparent()},
+                **kwargs,
+            )
+            span.set("http.status_code", response.status_code)
+            return response
+
     async def post(
-        self, path: str, payload: dict[str, Any], *, internal: bool = False
+        self,
+        path: str,
+        payload: dict[str, Any],
+        *,
+        internal: bool = False,
+        idempotency_key: str | None = None,
     ) -> dict[str, Any]:
-        response = await self._client.post(
-            path, json=payload, headers=self._headers(internal)
-        )
-        response.raise_for_status()
-        return response.json()
+        headers = self._headers(internal)
+        if not idempotency_key:
+            response = await self._send("POST", path, json=payload, headers=headers)
+            response.raise_for_status()
+            return response.json()
+        headers["Idempotency-Key"] = idempotency_key
+        for attempt in range(self._retry_attempts):
+            last_attempt = attempt == self._retry_attempts - 1
+            if attempt:
+                await asyncio.sleep(0.25 * 2 ** (attempt - 1) + random.uniform(0, 0.25))
+            try:
+                response = await self._hedged_post(path, payload, headers)
+            except httpx.TransportError:
+                if last_attempt:
+                    raise
+                continue
+            # 502 dari core sendiri berarti Indodax gagal menjawab; hasil order belum pasti.
+            upstream_error = "x-upstream-error" in response.headers
+            if response.status_code in _RETRYABLE_STATUS and not upstream_error and not last_attempt:
+                continue
+            response.raise_for_status()
+            return response.json()
+        raise RuntimeError("unreachable")  # pragma: no cover
+
+    async def _hedged_post(
+        self, path: str, payload: dict[str, Any], headers: dict[str, str]
+    ) -> httpx.Response:
+        def send() -> asyncio.Task[httpx.Response]:
+            return asyncio.create_task(
+                self._send("POST", path, json=payload, headers=headers)
+            )
+
+        first = send()
+        if self._hedge_delay <= 0:
+            return await first
+        done, _ = await asyncio.wait({first}, timeout=self._hedge_delay)
+        if done:
+            return first.result()
+        pending = {first, send()}
+        error: BaseException | None = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error  # type: ignore[misc]
+        finally:
+            for task in pending:
+                task.cancel()
 
     async def get(
         self,
@@ -34,8 +115,8 @@ class CoreAPIClient:
         *,
         internal: bool = False,
     ) -> dict[str, Any]:
-        response = await self._client.get(
-            path, params=params, headers=self._headers(internal)
+        response = await self._send(
+            "GET", path, params=params, headers=self._headers(internal)
         )
         response.raise_for_status()
         return response.json()
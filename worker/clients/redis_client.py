@@ -0,0 +1,7 @@
+from __future__ import annotations
+
+from redis.asyncio import Redis
+
+from worker.config import get_settings
+
+redis_client = Redis.from_url(str(get_settings().redis_url), decode_responses=True)
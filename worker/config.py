@@ -12,6 +12,29 @@ class WorkerSettings(BaseSettings):
     worker_poll_interval_seconds: int = 30
     core_api_internal_token: str | None = None
     price_feed_ws_url: AnyUrl | None = None
+    worker_sharding_enabled: bool = True
+    worker_shard_count: int = 64
+    worker_lease_ttl_seconds: int = 15
+    worker_replica_id: str | None = None
+    core_api_retry_attempts: int = 4
+    core_api_hedge_delay_seconds: float = 2.0
+    order_queue_enabled: bool = True
+    order_queue_consumers: int = 4
+    order_queue_batch_size: int = 10
+    order_queue_max_attempts: int = 5
+    order_queue_retry_delay_seconds: int = 30
+    order_queue_stream_maxlen: int = 100_000
+    safety_refresh_seconds: int = 30
+    worker_metrics_host: str = "0.0.0.0"
+    worker_metrics_port: int = 9100
+    tick_to_trade_window: int = 1000
+    circuit_window_seconds: int = 60
+    circuit_min_requests: int = 5
+    circuit_failure_rate: float = 0.5
+    circuit_open_seconds: int = 30
+    circuit_half_open_probes: int = 1
+    trace_export_path: str | None = None
+    trace_sample_rate: float = 0.01
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,35 @@
+import asyncio
+import logging
+
+from worker.clients.core_api import core_api_client
+from worker.clients.redis_client import redis_client
+from worker.config import get_settings
+from worker.introspection import introspection_server
+from worker.order_queue import order_queue
+from worker.utils.safety import safety_monitor
+
+
+async def main() -> None:
+    settings = get_settings()
+    logging.basicConfig(level=settings.log_level)
+
+    await safety_monitor.start()
+    await order_queue.start(consumers=max(settings.order_queue_consumers, 1))
+    await introspection_server.start()
+    logging.info("Order executor berjalan")
+
+    try:
+        while True:
+            await asyncio.sleep(3600)
+    except (KeyboardInterrupt, SystemExit):
+        logging.info("Order executor dihentikan")
+    finally:
+        await introspection_server.stop()
+        await order_queue.stop()
+        await safety_monitor.stop()
+        await core_api_client.close()
+        await redis_client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass
+class GridState:
+    strategy: dict[str, Any]
+    signature: tuple[float, float, int, float]
+    levels: list[float]
+    sides: list[str | None]
+    orders: dict[int, dict[str, Any]] = field(default_factory=dict)
+    order_levels: dict[str, int] = field(default_factory=dict)
+    fills: dict[int, int] = field(default_factory=dict)
+    epoch: int = field(default_factory=lambda: time.time_ns() // 1_000_000)
+
+    @property
+    def order_size(self) -> float:
+        return self.signature[3]
+
+    def placement_key(self, index: int, side: str) -> str:
+        """Idempotency key order level; berubah hanya setelah level itu terisi (fill)."""
+        fills = self.fills.get(index, 0)
+        return f"grid:{self.strategy['id']}:{self.epoch}:{index}:{side}:{fills}"
+
+    def level_of(self, price: float, tolerance: float) -> int | None:
+        index = bisect_left(self.levels, price - tolerance)
+        if index < len(self.levels) and abs(self.levels[index] - price) <= tolerance:
+            return index
+        return None
+
+
+@dataclass
+class ReconcilePlan:
+    stale: list[dict[str, Any]] = field(default_factory=list)
+    missing: list[tuple[int, str]] = field(default_factory=list)
+
+
+class GridEngine:
+    def __init__(self, *, tolerance: float = 1.0) -> None:
+        self._tolerance = tolerance
+        self._states: dict[int, GridState] = {}
+
+    def get_state(self, strategy_id: int) -> GridState | None:
+        return self._states.get(strategy_id)
+
+    def sync_strategy(
+        self, strategy: dict[str, Any], price: float | None = None
+    ) -> GridState | None:
+        config: dict[str, Any] = strategy.get("config_json", {})
+        lower = float(config.get("lower_price", 0))
+        upper = float(config.get("upper_price", 0))
+        grid_count = int(config.get("grid_count", 0))
+        size = float(config.get("order_size", 0))
+        if not lower or not upper or grid_count <= 0:
+            self._states.pop(strategy["id"], None)
+            return None
+        signature = (lower, upper, grid_count, size)
+        state = self._states.get(strategy["id"])
+        if state and state.signature == signature:
+            state.strategy = strategy
+            return state
+        step = (upper - lower) / grid_count
+        levels = [lower + step * i for i in range(grid_count + 1)]
+        # Satu level dibiarkan kosong di harga saat ini (atau tengah rentang) sebagai
+        # tempat order balik pertama; tanpa itu setiap fill menabrak level tetangga.
+        anchor = price if price is not None else (lower + upper) / 2
+        empty = min(range(len(levels)), key=lambda i: abs(levels[i] - anchor))
+        state = GridState(
+            strategy=strategy,
+            signature=signature,
+            levels=levels,
+            sides=[
+                None if i == empty else "buy" if i < empty else "sell"
+                for i in range(len(levels))
+            ],
+        )
+        self._states[strategy["id"]] = state
+        return state
+
+    def prune(self, active_ids: set[int]) -> None:
+        for strategy_id in list(self._states):
+            if strategy_id not in active_ids:
+                del self._states[strategy_id]
+
+    def reconcile(
+        self, state: GridState, open_orders: list[dict[str, Any]]
+    ) -> ReconcilePlan:
+        plan = ReconcilePlan()
+        priced: list[tuple[float, dict[str, Any]]] = []
+        for order in open_orders:
+            order_price = order.get("price")
+            if order_price is None or order.get("side") not in {"buy", "sell"}:
+                plan.stale.append(order)
+                continue
+            priced.append((float(order_price), order))
+        priced.sort(key=lambda item: item[0])
+
+        orders: dict[int, dict[str, Any]] = {}
+        level_index = 0
+        level_count = len(state.levels)
+        for price, order in priced:
+            while (
+                level_index < level_count
+                and state.levels[level_index] < price - self._tolerance
+            ):
+                level_index += 1
+            if (
+                level_index < level_count
+                and abs(state.levels[level_index] - price) <= self._tolerance
+                and level_index not in orders
+            ):
+                orders[level_index] = order
+                state.sides[level_index] = order["side"]
+            else:
+                plan.stale.append(order)
+
+        state.orders = orders
+        state.order_levels = {
+            str(order["id"]): index
+            for index, order in orders.items()
+            if order.get("id") is not None
+        }
+        for index, side in enumerate(state.sides):
+            if side is not None and index not in orders:
+                plan.missing.append((index, side))
+        return plan
+
+    def record_order(
+        self, state: GridState, index: int, order: dict[str, Any]
+    ) -> None:
+        state.orders[index] = order
+        state.sides[index] = order.get("side")
+        if order.get("id") is not None:
+            state.order_levels[str(order["id"])] = index
+
+    def on_fill(self, fill: dict[str, Any]) -> tuple[GridState, int, str] | None:
+        strategy_id = fill.get("strategy_id")
+        if strategy_id is None:
+            return None
+        state = self._states.get(int(strategy_id))
+        if state is None:
+            return None
+        index = state.order_levels.pop(str(fill.get("order_id")), None)
+        if index is None and fill.get("price") is not None:
+            index = state.level_of(float(fill["price"]), self._tolerance)
+        if index is None:
+            return None
+        state.orders.pop(index, None)
+        state.fills[index] = state.fills.get(index, 0) + 1
+        side = fill.get("side")
+        counter_side = "sell" if side == "buy" else "buy"
+        target = index + 1 if side == "buy" else index - 1
+        if target < 0 or target >= len(state.levels) or target in state.orders:
+            # Tetangga masih terisi (mis. fill diproses tidak berurutan): level ini tetap
+            # aktif di sisi sebaliknya agar jumlah level grid tidak berkurang; rekonsiliasi
+            # berikutnya akan menempatkan ordernya.
+            state.sides[index] = counter_side
+            return None
+        state.sides[index] = None
+        state.sides[target] = counter_side
+        return state, target, counter_side
+
+
+grid_engine = GridEngine()
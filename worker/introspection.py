@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import json
+import logging
+from typing import Any
+
+from aiohttp import web
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from worker.config import get_settings
+from worker.latency import tick_to_trade
+from worker.metrics import (
+    ORDER_QUEUE_DEAD,
+    ORDER_QUEUE_LENGTH,
+    ORDER_QUEUE_PENDING,
+    PRICE_AGE_SECONDS,
+    PRICE_CACHE_SIZE,
+    SAFETY_PAUSED,
+)
+from worker.order_queue import order_queue
+from worker.price_feed import price_feed
+from worker.runner import job_runner
+from worker.sharding import shard_coordinator
+from worker.utils.circuit_breaker import circuit_breakers
+from worker.utils.safety import safety_monitor
+
+logger = logging.getLogger(__name__)
+
+
+async def collect_state() -> dict[str, Any]:
+    try:
+        queue = await order_queue.stats()
+    except Exception as exc:  # noqa: BLE001
+        queue = {"error": str(exc)}
+    return {
+        "replica_id": shard_coordinator.replica_id,
+        "owned_shards": shard_coordinator.owned_shards(),
+        "safety": safety_monitor.status,
+        "price_feed": price_feed.stats(),
+        "order_queue": queue,
+        "jobs": job_runner.snapshot(),
+        "tick_to_trade": tick_to_trade.report(),
+        "circuits": circuit_breakers.snapshot(),
+    }
+
+
+def _update_gauges(state: dict[str, Any]) -> None:
+    feed = state["price_feed"]
+    PRICE_CACHE_SIZE.set(feed["pairs"])
+    for pair, age in feed["ages"].items():
+        PRICE_AGE_SECONDS.labels(pair).set(age)
+    queue = state["order_queue"]
+    ORDER_QUEUE_LENGTH.set(queue.get("length", 0))
+    ORDER_QUEUE_PENDING.set(queue.get("pending", 0))
+    ORDER_QUEUE_DEAD.set(queue.get("dead", 0))
+    safety = state["safety"] or {}
+    SAFETY_PAUSED.set(1 if safety.get("paused") else 0)
+
+
+async def metrics_handler(_: web.Request) -> web.Response:
+    _update_gauges(await collect_state())
+    # Serialisasi registry dilakukan di thread agar tidak menahan event loop.
+    body = await asyncio.get_running_loop().run_in_executor(None, generate_latest)
+    return web.Response(body=body, headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+
+async def tick_to_trade_handler(_: web.Request) -> web.Response:
+    return web.json_response(tick_to_trade.report())
+
+
+async def debug_state_handler(_: web.Request) -> web.Response:
+    return web.json_response(
+        await collect_state(), dumps=functools.partial(json.dumps, default=str)
+    )
+
+
+def create_app() -> web.Application:
+    app = web.Application()
+    app.router.add_get("/metrics", metrics_handler)
+    app.router.add_get("/debug/state", debug_state_handler)
+    app.router.add_get("/debug/tick-to-trade", tick_to_trade_handler)
+    return app
+
+
+class IntrospectionServer:
+    def __init__(self) -> None:
+        settings = get_settings()
+        self._host = settings.worker_metrics_host
+        self._port = settings.worker_metrics_port
+        self._runner: web.AppRunner | None = None
+
+    async def start(self) -> None:
+        if not self._port or self._runner is not None:
+            return
+        self._runner = web.AppRunner(create_app(), access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self._host, self._port).start()
+        logger.info("Endpoint metrics worker aktif", extra={"port": self._port})
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+introspection_server = IntrospectionServer()
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import time
+from collections import deque
+from typing import Any
+
+from worker.config import get_settings
+from worker.metrics import TICK_TO_TRADE_SECONDS
+
+# Urutan tahap tick-to-trade; setiap segmen diukur dari tahap sebelumnya yang tersedia.
+STAGES = ("tick_at", "decided_at", "core_received_at", "exchange_sent_at", "exchange_ack_at")
+
+
+def stamp(timings: dict[str, float] | None = None, **stages: float | None) -> dict[str, float]:
+    """Gabungkan stempel waktu (epoch detik) yang tersedia ke dict timing."""
+    merged = dict(timings or {})
+    merged.update({name: value for name, value in stages.items() if value is not None})
+    return merged
+
+
+def segments(timings: dict[str, Any]) -> dict[str, float]:
+    """Durasi per segmen dalam milidetik, plus ``total`` dari tahap pertama hingga terakhir."""
+    present = [(name, float(timings[name])) for name in STAGES if timings.get(name) is not None]
+    result: dict[str, float] = {}
+    for (previous, started), (name, ended) in zip(present, present[1:]):
+        result[f"{previous.removesuffix('_at')}->{name.removesuffix('_at')}"] = round(
+            (ended - started) * 1000, 3
+        )
+    if len(present) > 1:
+        result["total"] = round((present[-1][1] - present[0][1]) * 1000, 3)
+    return result
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class TickToTradeTracker:
+    """Jendela bergulir latensi tick-to-trade per tipe strategi untuk laporan p50/p99."""
+
+    def __init__(self, window: int | None = None) -> None:
+        self._window = window or get_settings().tick_to_trade_window
+        self._samples: dict[str, deque[tuple[float, dict[str, float]]]] = {}
+
+    def record(self, strategy_type: str, timings: dict[str, Any]) -> dict[str, float]:
+        measured = segments(timings)
+        if "total" not in measured:
+            return measured
+        samples = self._samples.setdefault(strategy_type, deque(maxlen=self._window))
+        samples.append((time.time(), measured))
+        full = timings.get("tick_at") is not None and timings.get("exchange_ack_at") is not None
+        TICK_TO_TRADE_SECONDS.labels(strategy_type, "full" if full else "partial").observe(
+            measured["total"] / 1000
+        )
+        return measured
+
+    def report(self) -> dict[str, Any]:
+        report: dict[str, Any] = {}
+        for strategy_type, samples in list(self._samples.items()):
+            by_segment: dict[str, list[float]] = {}
+            for _, measured in samples:
+                for name, value in measured.items():
+                    by_segment.setdefault(name, []).append(value)
+            report[strategy_type] = {
+                "samples": len(samples),
+                "since": samples[0][0] if samples else None,
+                "segments_ms": {
+                    name: {
+                        "p50": _percentile(ordered, 0.5),
+                        "p99": _percentile(ordered, 0.99),
+                        "max": ordered[-1],
+                    }
+                    for name, values in by_segment.items()
+                    for ordered in [sorted(values)]
+                },
+            }
+        return report
+
+
+tick_to_trade = TickToTradeTracker()
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from prometheus_client import Counter, Gauge, Histogram
+
+_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+JOB_RUNS = Counter("worker_job_runs_total", "Jumlah eksekusi job per hasil", ("job", "outcome"))
+JOB_DURATION_SECONDS = Histogram(
+    "worker_job_duration_seconds", "Durasi eksekusi job", ("job",), buckets=_BUCKETS
+)
+JOB_LAG_SECONDS = Histogram(
+    "worker_job_lag_seconds", "Keterlambatan mulai job dari jadwal", ("job",), buckets=_BUCKETS
+)
+
+PRICE_TICKS = Counter("worker_price_ticks_total", "Jumlah update harga dari WebSocket")
+PRICE_FEED_RECONNECTS = Counter(
+    "worker_price_feed_reconnects_total", "Jumlah reconnect WebSocket harga"
+)
+PRICE_FEED_CONNECTED = Gauge("worker_price_feed_connected", "1 bila WebSocket harga tersambung")
+PRICE_CACHE_SIZE = Gauge("worker_price_cache_pairs", "Jumlah pair di cache harga")
+PRICE_AGE_SECONDS = Gauge("worker_price_age_seconds", "Umur harga terakhir per pair", ("pair",))
+
+ORDER_QUEUE_LENGTH = Gauge("worker_order_queue_length", "Panjang stream antrian order")
+ORDER_QUEUE_PENDING = Gauge("worker_order_queue_pending", "Job order yang belum di-ack")
+ORDER_QUEUE_DEAD = Gauge("worker_order_queue_dead", "Panjang stream dead-letter order")
+ORDERS_IN_FLIGHT = Gauge("worker_orders_in_flight", "Order yang sedang dikirim ke core")
+
+SAFETY_PAUSED = Gauge("worker_safety_paused", "1 bila dead-man switch aktif")
+CIRCUIT_STATE = Gauge(
+    "worker_circuit_state",
+    "Status circuit breaker (0=closed, 1=half_open, 2=open)",
+    ("method", "pair"),
+)
+CIRCUIT_TRANSITIONS = Counter(
+    "worker_circuit_transitions_total", "Perpindahan status circuit breaker", ("method", "state")
+)
+
+TICK_TO_TRADE_SECONDS = Histogram(
+    "worker_tick_to_trade_seconds",
+    "Latensi dari tick harga (atau keputusan) hingga ack Indodax",
+    ("strategy_type", "coverage"),
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
@@ -0,0 +1,367 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable
+
+from redis.exceptions import ResponseError
+
+from worker.clients.core_api import CoreAPIClient, core_api_client, is_upstream_error
+from worker.clients.redis_client import redis_client
+from worker.config import get_settings
+from worker.latency import tick_to_trade
+from worker.metrics import ORDERS_IN_FLIGHT
+from worker.sharding import shard_coordinator
+from worker.utils.circuit_breaker import CircuitOpenError, circuit_breakers
+from worker.utils.executions import ExecutionLogBatch
+from worker.utils.notifications import send_notification
+from worker.utils.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+Notifier = Callable[..., Awaitable[None]]
+
+_ENQUEUE_SCRIPT = """
+if ARGV[4] == '1' and redis.call('EXISTS', KEYS[3]) == 1 then
+    return false
+end
+if redis.call('SET', KEYS[2], '1', 'NX', 'EX', ARGV[3]) then
+    if ARGV[4] == '1' then
+        redis.call('SET', KEYS[3], '1', 'EX', ARGV[3])
+    end
+    return redis.call('XADD', KEYS[1], 'MAXLEN', '~', ARGV[1], '*', 'job', ARGV[2])
+end
+return false
+"""
+
+
+@dataclass
+class OrderJob:
+    key: str
+    source: str
+    strategy: dict[str, Any]
+    order: dict[str, Any]
+    detail: dict[str, Any] = field(default_factory=dict)
+    event_type: str = ""
+    message: str = ""
+    failure_message: str = ""
+    # Selama job dengan nilai ``exclusive`` yang sama belum selesai, job baru tidak diantrekan.
+    exclusive: str = ""
+    created_at: float = field(default_factory=time.time)
+
+    @classmethod
+    def for_strategy(
+        cls,
+        strategy: dict[str, Any],
+        order: dict[str, Any],
+        *,
+        key: str,
+        source: str,
+        **kwargs: Any,
+    ) -> "OrderJob":
+        summary = {
+            name: strategy.get(name)
+            for name in ("id", "user_id", "telegram_id", "pair")
+        }
+        return cls(key=key, source=source, strategy=summary, order=order, **kwargs)
+
+    def dumps(self) -> str:
+        return json.dumps(asdict(self), default=str)
+
+    @classmethod
+    def loads(cls, raw: str) -> "OrderJob":
+        return cls(**json.loads(raw))
+
+
+async def execute_order_job(
+    job: OrderJob,
+    *,
+    client: CoreAPIClient,
+    executions: ExecutionLogBatch,
+    notify: Notifier,
+) -> dict[str, Any]:
+    async with circuit_breakers.guard("trade", job.order.get("pair")):
+        response = await client.post(
+            "/api/orders", job.order, internal=True, idempotency_key=job.key
+        )
+    detail = {**job.detail, "order_response": response}
+    timings = (response.get("data") or {}).get("timings")
+    if timings:
+        detail["timings"] = timings
+        detail["latency_ms"] = tick_to_trade.record(job.source, timings)
+    executions.add(
+        job.strategy,
+        "success" if response.get("success") else "failed",
+        detail,
+    )
+    if job.message:
+        await notify(
+            job.strategy["telegram_id"],
+            job.message,
+            event_type=f"{job.event_type}_execution",
+        )
+    return response
+
+
+class OrderQueue:
+    _stream = "worker:orders"
+    _dead_stream = "worker:orders:dead"
+    _group = "order-executors"
+
+    def __init__(self) -> None:
+        settings = get_settings()
+        self._enabled = settings.order_queue_enabled
+        self._default_consumers = max(settings.order_queue_consumers, 0)
+        self._batch_size = max(settings.order_queue_batch_size, 1)
+        self._max_attempts = max(settings.order_queue_max_attempts, 1)
+        self._retry_delay = max(settings.order_queue_retry_delay_seconds, 1)
+        self._maxlen = settings.order_queue_stream_maxlen
+        self._dedupe_ttl = 86_400
+        self._started = False
+        self._tasks: list[asyncio.Task[None]] = []
+        self._inflight = 0
+        self._enqueue = redis_client.register_script(_ENQUEUE_SCRIPT)
+
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    def _queued_key(self, key: str) -> str:
+        return f"worker:orders:queued:{key}"
+
+    def _done_key(self, key: str) -> str:
+        return f"worker:orders:done:{key}"
+
+    def _pending_key(self, exclusive: str) -> str:
+        return f"worker:orders:pending:{exclusive}"
+
+    async def start(self, consumers: int | None = None) -> None:
+        if not self._enabled or self._started:
+            return
+        try:
+            await redis_client.xgroup_create(
+                self._stream, self._group, id="0", mkstream=True
+            )
+        except ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+        self._started = True
+        count = self._default_consumers if consumers is None else consumers
+        prefix = shard_coordinator.replica_id
+        self._tasks = [
+            asyncio.create_task(self._consume(f"{prefix}-{index}"))
+            for index in range(count)
+        ]
+        if count:
+            self._tasks.append(asyncio.create_task(self._reclaim(f"{prefix}-reclaim")))
+        logger.info("Antrian order aktif", extra={"consumers": count})
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._started = False
+
+    async def stats(self) -> dict[str, Any]:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.xlen(self._stream)
+            pipe.xpending(self._stream, self._group)
+            pipe.xlen(self._dead_stream)
+            length, pending, dead = await pipe.execute(raise_on_error=False)
+        return {
+            "started": self._started,
+            "consumers": len(self._tasks),
+            "in_flight": self._inflight,
+            "length": length if isinstance(length, int) else 0,
+            "pending": pending["pending"] if isinstance(pending, dict) else 0,
+            "dead": dead if isinstance(dead, int) else 0,
+        }
+
+    async def submit(
+        self,
+        job: OrderJob,
+        *,
+        client: CoreAPIClient,
+        executions: ExecutionLogBatch,
+        notify: Notifier,
+    ) -> bool:
+        """Masukkan job ke stream; tanpa antrian aktif job dieksekusi langsung."""
+        if not self._started:
+            await execute_order_job(
+                job, client=client, executions=executions, notify=notify
+            )
+            return False
+        message_id = await self._enqueue(
+            keys=[self._stream, self._queued_key(job.key), self._pending_key(job.exclusive)],
+            args=[self._maxlen, job.dumps(), self._dedupe_ttl, int(bool(job.exclusive))],
+            client=redis_client,
+        )
+        if message_id is None:
+            logger.info("Job order duplikat diabaikan", extra={"key": job.key})
+        return True
+
+    async def _consume(self, consumer: str) -> None:
+        while True:
+            try:
+                entries = await redis_client.xreadgroup(
+                    self._group,
+                    consumer,
+                    {self._stream: ">"},
+                    count=self._batch_size,
+                    block=5000,
+                )
+                for _, messages in entries or []:
+                    await self._process(messages, {})
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Konsumsi antrian order gagal", extra={"error": str(exc)})
+                await asyncio.sleep(1)
+
+    async def _reclaim(self, consumer: str) -> None:
+        while True:
+            await asyncio.sleep(self._retry_delay / 2)
+            try:
+                start_id = "0-0"
+                while True:
+                    result = await redis_client.xautoclaim(
+                        self._stream,
+                        self._group,
+                        consumer,
+                        min_idle_time=self._retry_delay * 1000,
+                        start_id=start_id,
+                        count=self._batch_size,
+                    )
+                    start_id, messages = result[0], result[1]
+                    if messages:
+                        await self._process(messages, await self._deliveries(messages))
+                    if start_id == "0-0":
+                        break
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Klaim ulang antrian order gagal", extra={"error": str(exc)})
+
+    async def _deliveries(self, messages: list[tuple[str, Any]]) -> dict[str, int]:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for message_id, _ in messages:
+                pipe.xpending_range(
+                    self._stream, self._group, min=message_id, max=message_id, count=1
+                )
+            results = await pipe.execute()
+        return {
+            item["message_id"]: item["times_delivered"]
+            for pending in results
+            for item in pending
+        }
+
+    async def _process(
+        self, messages: list[tuple[str, Any]], deliveries: dict[str, int]
+    ) -> None:
+        executions = ExecutionLogBatch(core_api_client)
+        handled: list[str] = []
+        released: list[str] = []
+        for message_id, fields in messages:
+            raw = (fields or {}).get("job")
+            try:
+                job = OrderJob.loads(raw)
+            except (TypeError, ValueError) as exc:
+                await redis_client.xadd(
+                    self._dead_stream,
+                    {"job": raw or "", "error": f"job tidak valid: {exc}", "attempts": 1},
+                    maxlen=self._maxlen,
+                    approximate=True,
+                )
+                handled.append(message_id)
+                continue
+            if await redis_client.exists(self._done_key(job.key)):
+                handled.append(message_id)
+                released.append(job.exclusive)
+                continue
+            self._inflight += 1
+            ORDERS_IN_FLIGHT.inc()
+            try:
+                with tracer.span(
+                    f"order {job.source}", kind="consumer", attributes={"order.key": job.key}
+                ):
+                    await execute_order_job(
+                        job,
+                        client=core_api_client,
+                        executions=executions,
+                        notify=send_notification,
+                    )
+            except asyncio.CancelledError:
+                raise
+            except CircuitOpenError as exc:
+                # Tetap pending; klaim ulang mencoba lagi setelah jeda retry.
+                logger.info("Job order ditunda, circuit terbuka", extra={"key": job.key, "error": str(exc)})
+                continue
+            except Exception as exc:  # noqa: BLE001
+                attempts = deliveries.get(message_id, 1)
+                if is_upstream_error(exc):
+                    # Status order di Indodax belum pasti dan core menyimpan hasil ambigu ini
+                    # untuk idempotency key, jadi mengulang tidak berguna. Periksa manual;
+                    # kunci exclusive dibiarkan kedaluwarsa agar tidak ada order pengganti.
+                    await self._dead_letter(job, exc, attempts, executions, review=True)
+                    handled.append(message_id)
+                    continue
+                if attempts < self._max_attempts:
+                    logger.warning(
+                        "Eksekusi order gagal, akan dicoba ulang",
+                        extra={"key": job.key, "attempts": attempts, "error": str(exc)},
+                    )
+                    continue
+                await self._dead_letter(job, exc, attempts, executions)
+                handled.append(message_id)
+                released.append(job.exclusive)
+                continue
+            finally:
+                self._inflight -= 1
+                ORDERS_IN_FLIGHT.dec()
+            await redis_client.set(self._done_key(job.key), "1", ex=self._dedupe_ttl)
+            handled.append(message_id)
+            released.append(job.exclusive)
+        if handled:
+            await redis_client.xack(self._stream, self._group, *handled)
+        pending_keys = [self._pending_key(exclusive) for exclusive in released if exclusive]
+        if pending_keys:
+            await redis_client.delete(*pending_keys)
+        await executions.flush()
+
+    async def _dead_letter(
+        self,
+        job: OrderJob,
+        exc: Exception,
+        attempts: int,
+        executions: ExecutionLogBatch,
+        *,
+        review: bool = False,
+    ) -> None:
+        logger.error(
+            "Job order dipindahkan ke dead-letter",
+            extra={"key": job.key, "attempts": attempts, "error": str(exc), "review": review},
+        )
+        await redis_client.xadd(
+            self._dead_stream,
+            {"job": job.dumps(), "error": str(exc), "attempts": attempts, "review": int(review)},
+            maxlen=self._maxlen,
+            approximate=True,
+        )
+        executions.add(
+            job.strategy,
+            "failed",
+            {"error": str(exc), "attempts": attempts, "needs_review": review},
+        )
+        if job.failure_message:
+            await send_notification(
+                job.strategy["telegram_id"],
+                f"{job.failure_message}: {exc}",
+                event_type=f"{job.event_type}_failed",
+            )
+
+
+order_queue = OrderQueue()
@@ -10,6 +10,7 @@ import aiohttp
 
 from worker.clients.core_api import core_api_client
 from worker.config import get_settings
+from worker.metrics import PRICE_FEED_CONNECTED, PRICE_FEED_RECONNECTS, PRICE_TICKS
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +20,9 @@ class PriceFeed:
         self._settings = get_settings()
         self._cache: dict[str, tuple[float, float]] = {}
         self._task: asyncio.Task[None] | None = None
+        self._connected = False
+        self._connections = 0
+        self._ticks = 0
 
     async def start(self) -> None:
         if self._settings.price_feed_ws_url and not self._task:
@@ -42,6 +46,11 @@ class PriceFeed:
                 async with aiohttp.ClientSession() as session:
                     async with session.ws_connect(str(ws_url), heartbeat=25) as ws:
                         logger.info("Terhubung ke WebSocket harga")
+                        self._connections += 1
+                        if self._connections > 1:
+                            PRICE_FEED_RECONNECTS.inc()
+                        self._connected = True
+                        PRICE_FEED_CONNECTED.set(1)
                         async for message in ws:
                             if message.type == aiohttp.WSMsgType.TEXT:
                                 self._handle_message(message.data)
@@ -50,8 +59,12 @@ class PriceFeed:
             except Exception as exc:  # noqa: BLE001
                 logger.exception("Koneksi WebSocket harga terputus", exc_info=exc)
                 await asyncio.sleep(5)
+            finally:
+                self._connected = False
+                PRICE_FEED_CONNECTED.set(0)
 
     def _handle_message(self, raw: str) -> None:
+        received_at = time.time()
         if not raw.startswith("42"):
             return
         try:
@@ -80,7 +93,9 @@ class PriceFeed:
             except (TypeError, ValueError):
                 continue
             key = str(pair).upper()
-            self._cache[key] = (price_value, time.time())
+            self._cache[key] = (price_value, received_at)
+            self._ticks += 1
+            PRICE_TICKS.inc()
 
     async def get_price(self, pair: str) -> float | None:
         key = pair.upper()
@@ -102,5 +117,29 @@ class PriceFeed:
             return price_value
         return None
 
+    def received_at(self, pair: str) -> float | None:
+        """Waktu (epoch) harga pair di cache diterima, untuk stempel ``tick_at``."""
+        cached = self._cache.get(pair.upper())
+        return cached[1] if cached else None
+
+    def stats(self) -> dict[str, Any]:
+        now = time.time()
+        ages = {pair: now - updated for pair, (_, updated) in list(self._cache.items())}
+        ordered = sorted(ages.values())
+
+        def _pct(q: float) -> float | None:
+            return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else None
+
+        return {
+            "connected": self._connected,
+            "reconnects": max(self._connections - 1, 0),
+            "ticks": self._ticks,
+            "pairs": len(ages),
+            "age_p50": _pct(0.5),
+            "age_p90": _pct(0.9),
+            "age_max": ordered[-1] if ordered else None,
+            "ages": ages,
+        }
+
 
 price_feed = PriceFeed()
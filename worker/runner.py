@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Literal
+
+from worker.metrics import JOB_DURATION_SECONDS, JOB_LAG_SECONDS, JOB_RUNS
+from worker.utils.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+OverlapPolicy = Literal["skip", "coalesce"]
+
+
+def _wall_time(loop: asyncio.AbstractEventLoop, loop_time: float) -> float:
+    return time.time() - (loop.time() - loop_time)
+
+
+@dataclass(slots=True)
+class RunRecord:
+    scheduled_at: float
+    started_at: float | None
+    lag: float
+    duration: float
+    outcome: str
+    error: str | None = None
+
+
+@dataclass
+class Job:
+    name: str
+    func: Callable[[], Awaitable[Any]]
+    interval: float
+    overlap: OverlapPolicy = "skip"
+    deadline: float | None = None
+    jitter: float = 0.0
+    history: deque[RunRecord] = field(default_factory=lambda: deque(maxlen=100))
+    runs: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    skipped: int = 0
+    coalesced: int = 0
+    missed: int = 0
+    running: asyncio.Task[None] | None = None
+    pending: bool = False
+
+    def stats(self) -> dict[str, Any]:
+        durations = sorted(
+            record.duration for record in self.history if record.started_at is not None
+        )
+        lags = [record.lag for record in self.history if record.started_at is not None]
+        return {
+            "name": self.name,
+            "interval": self.interval,
+            "overlap": self.overlap,
+            "deadline": self.deadline,
+            "running": self.running is not None,
+            "runs": self.runs,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "skipped": self.skipped,
+            "coalesced": self.coalesced,
+            "missed": self.missed,
+            "last_lag": lags[-1] if lags else None,
+            "max_lag": max(lags) if lags else None,
+            "p50_duration": durations[len(durations) // 2] if durations else None,
+            "max_duration": durations[-1] if durations else None,
+            "history": [asdict(record) for record in self.history],
+        }
+
+
+class JobRunner:
+    def __init__(self) -> None:
+        self._jobs: dict[str, Job] = {}
+        self._loops: list[asyncio.Task[None]] = []
+
+    def add_job(
+        self,
+        func: Callable[[], Awaitable[Any]],
+        interval_seconds: float,
+        *,
+        name: str | None = None,
+        overlap: OverlapPolicy = "skip",
+        deadline: float | None = None,
+        jitter: float = 0.0,
+        history_size: int = 100,
+    ) -> Job:
+        job = Job(
+            name=name or func.__name__,
+            func=func,
+            interval=float(interval_seconds),
+            overlap=overlap,
+            deadline=deadline,
+            jitter=jitter,
+            history=deque(maxlen=history_size),
+        )
+        self._jobs[job.name] = job
+        return job
+
+    def get_job(self, name: str) -> Job | None:
+        return self._jobs.get(name)
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        return {name: job.stats() for name, job in self._jobs.items()}
+
+    def start(self) -> None:
+        if self._loops:
+            return
+        self._loops = [
+            asyncio.create_task(self._schedule(job), name=f"job:{job.name}")
+            for job in self._jobs.values()
+        ]
+
+    async def stop(self) -> None:
+        for task in self._loops:
+            task.cancel()
+        running = [job.running for job in self._jobs.values() if job.running]
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*self._loops, *running, return_exceptions=True)
+        self._loops = []
+
+    async def _schedule(self, job: Job) -> None:
+        loop = asyncio.get_running_loop()
+        next_at = loop.time() + job.interval
+        while True:
+            offset = random.uniform(0, job.jitter) if job.jitter else 0.0
+            await asyncio.sleep(max(0.0, next_at + offset - loop.time()))
+            # Jitter disengaja; lag diukur dari waktu jalan yang sudah digeser jitter.
+            scheduled = next_at + offset
+            next_at += job.interval
+            behind = loop.time() - next_at
+            if behind >= 0:
+                missed = int(behind // job.interval) + 1
+                job.missed += missed
+                next_at += missed * job.interval
+                logger.warning(
+                    "Jadwal job terlewat",
+                    extra={"job": job.name, "missed": missed},
+                )
+
+            if job.running is None:
+                job.running = asyncio.create_task(self._execute(job, scheduled))
+                continue
+            if job.overlap == "coalesce":
+                job.pending = True
+                job.coalesced += 1
+                outcome = "coalesced"
+            else:
+                job.skipped += 1
+                outcome = "skipped"
+            JOB_RUNS.labels(job.name, outcome).inc()
+            job.history.append(
+                RunRecord(
+                    scheduled_at=_wall_time(loop, scheduled),
+                    started_at=None,
+                    lag=loop.time() - scheduled,
+                    duration=0.0,
+                    outcome=outcome,
+                )
+            )
+            logger.warning(
+                "Job masih berjalan, jadwal dilewati",
+                extra={"job": job.name, "policy": job.overlap},
+            )
+
+    async def _execute(self, job: Job, scheduled: float) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                started = loop.time()
+                wall_started = time.time()
+                outcome = "success"
+                error: str | None = None
+                try:
+                    with tracer.span(f"job {job.name}"):
+                        if job.deadline:
+                            await asyncio.wait_for(job.func(), timeout=job.deadline)
+                        else:
+                            await job.func()
+                except asyncio.TimeoutError:
+                    job.timeouts += 1
+                    outcome = "timeout"
+                    error = f"melebihi deadline {job.deadline}s"
+                    logger.error("Job melebihi deadline", extra={"job": job.name})
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:  # noqa: BLE001
+                    job.failures += 1
+                    outcome = "error"
+                    error = str(exc)
+                    logger.exception("Job gagal", extra={"job": job.name})
+                job.runs += 1
+                duration = loop.time() - started
+                JOB_RUNS.labels(job.name, outcome).inc()
+                JOB_DURATION_SECONDS.labels(job.name).observe(duration)
+                JOB_LAG_SECONDS.labels(job.name).observe(started - scheduled)
+                job.history.append(
+                    RunRecord(
+                        scheduled_at=_wall_time(loop, scheduled),
+                        started_at=wall_started,
+                        lag=started - scheduled,
+                        duration=duration,
+                        outcome=outcome,
+                        error=error,
+                    )
+                )
+                if not job.pending:
+                    break
+                job.pending = False
+                scheduled = loop.time()
+        finally:
+            job.running = None
+
+
+job_runner = JobRunner()
@@ -1,32 +1,43 @@
 import asyncio
 import logging
 
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.interval import IntervalTrigger
-
 from worker.config import get_settings
+from worker.introspection import introspection_server
+from worker.order_queue import order_queue
 from worker.price_feed import price_feed
+from worker.runner import job_runner
+from worker.sharding import shard_coordinator
 from worker.tasks.alerts import check_price_alerts
 from worker.tasks.dca import run_dca_strategies
 from worker.tasks.grid import run_grid_strategies
 from worker.tasks.orders import monitor_orders
 from worker.tasks.tp_sl import monitor_tp_sl
+from worker.utils.safety import safety_monitor
 from worker.clients.core_api import core_api_client
+from worker.clients.redis_client import redis_client
 
 
 async def main() -> None:
     settings = get_settings()
     logging.basicConfig(level=settings.log_level)
 
-    scheduler = AsyncIOScheduler(timezone=settings.scheduler_timezone)
-    scheduler.add_job(run_dca_strategies, IntervalTrigger(minutes=1))
-    scheduler.add_job(run_grid_strategies, IntervalTrigger(minutes=5))
-    scheduler.add_job(monitor_tp_sl, IntervalTrigger(minutes=1))
-    scheduler.add_job(check_price_alerts, IntervalTrigger(seconds=settings.worker_poll_interval_seconds))
-    scheduler.add_job(monitor_orders, IntervalTrigger(minutes=1))
-
+    job_runner.add_job(run_dca_strategies, 60, overlap="skip", deadline=55)
+    job_runner.add_job(run_grid_strategies, 300, overlap="coalesce", deadline=240, jitter=5)
+    job_runner.add_job(monitor_tp_sl, 60, overlap="coalesce", deadline=55)
+    job_runner.add_job(
+        check_price_alerts,
+        settings.worker_poll_interval_seconds,
+        overlap="coalesce",
+        deadline=settings.worker_poll_interval_seconds,
+    )
+    job_runner.add_job(monitor_orders, 60, overlap="skip", deadline=55, jitter=2)
+
+    await safety_monitor.start()
+    await shard_coordinator.start()
+    await order_queue.start()
     await price_feed.start()
-    scheduler.start()
+    job_runner.start()
+    await introspection_server.start()
     logging.info("Worker scheduler berjalan")
 
     try:
@@ -35,9 +46,14 @@ async def main() -> None:
     except (KeyboardInterrupt, SystemExit):
         logging.info("Worker dihentikan")
     finally:
-        scheduler.shutdown()
+        await introspection_server.stop()
+        await job_runner.stop()
+        await order_queue.stop()
         await price_feed.stop()
+        await shard_coordinator.stop()
+        await safety_monitor.stop()
         await core_api_client.close()
+        await redis_client.close()
 
 
 if __name__ == "__main__":
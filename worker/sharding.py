@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import socket
+import time
+import uuid
+
+from worker.clients.redis_client import redis_client
+from worker.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def shard_for(user_id: int, shard_count: int) -> int:
+    return int(user_id) % shard_count
+
+
+def _score(shard: int, replica_id: str) -> int:
+    digest = hashlib.blake2b(f"{shard}:{replica_id}".encode("utf-8"), digest_size=8)
+    return int.from_bytes(digest.digest(), "big")
+
+
+def assign_shards(replicas: list[str], shard_count: int) -> dict[int, str]:
+    if not replicas:
+        return {}
+    return {
+        shard: max(replicas, key=lambda replica: _score(shard, replica))
+        for shard in range(shard_count)
+    }
+
+
+class ShardCoordinator:
+    _members_key = "worker:replicas"
+
+    def __init__(self) -> None:
+        settings = get_settings()
+        self._shard_count = max(settings.worker_shard_count, 1)
+        self._lease_ttl = max(settings.worker_lease_ttl_seconds, 3)
+        self._replica_id = settings.worker_replica_id or (
+            f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        )
+        self._enabled = False
+        self._owned: set[int] = set()
+        self._lease_deadline = 0.0
+        self._task: asyncio.Task[None] | None = None
+        self._renew = redis_client.register_script(_RENEW_SCRIPT)
+        self._release = redis_client.register_script(_RELEASE_SCRIPT)
+
+    @property
+    def replica_id(self) -> str:
+        return self._replica_id
+
+    @property
+    def shard_count(self) -> int:
+        return self._shard_count
+
+    def owned_shards(self) -> list[int]:
+        if not self._enabled:
+            return list(range(self._shard_count))
+        if time.monotonic() >= self._lease_deadline:
+            return []
+        return sorted(self._owned)
+
+    def owns(self, user_id: int | None) -> bool:
+        if not self._enabled:
+            return True
+        if user_id is None or time.monotonic() >= self._lease_deadline:
+            return False
+        return shard_for(user_id, self._shard_count) in self._owned
+
+    async def start(self) -> None:
+        if not get_settings().worker_sharding_enabled or self._task:
+            return
+        self._enabled = True
+        await self._heartbeat()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:  # pragma: no cover
+                pass
+            self._task = None
+        if self._enabled:
+            try:
+                async with redis_client.pipeline(transaction=False) as pipe:
+                    for shard in self._owned:
+                        await self._release(
+                            keys=[self._lease_key(shard)],
+                            args=[self._replica_id],
+                            client=pipe,
+                        )
+                    pipe.zrem(self._members_key, self._replica_id)
+                    await pipe.execute()
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Gagal melepas lease shard", extra={"error": str(exc)})
+            self._owned.clear()
+            self._enabled = False
+
+    def _lease_key(self, shard: int) -> str:
+        return f"worker:shard:{shard}"
+
+    async def _run(self) -> None:
+        interval = self._lease_ttl / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self._heartbeat()
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Heartbeat shard gagal", extra={"error": str(exc)})
+
+    async def _heartbeat(self) -> None:
+        started = time.monotonic()
+        now = time.time()
+        ttl_ms = self._lease_ttl * 1000
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.zadd(self._members_key, {self._replica_id: now})
+            pipe.zremrangebyscore(self._members_key, "-inf", now - self._lease_ttl)
+            pipe.zrange(self._members_key, 0, -1)
+            _, _, members = await pipe.execute()
+
+        assignment = assign_shards(list(members), self._shard_count)
+        desired = {
+            shard for shard, replica in assignment.items() if replica == self._replica_id
+        }
+        releasing = sorted(self._owned - desired)
+        renewing = sorted(self._owned & desired)
+        acquiring = sorted(desired - self._owned)
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for shard in releasing:
+                await self._release(
+                    keys=[self._lease_key(shard)], args=[self._replica_id], client=pipe
+                )
+            for shard in renewing:
+                await self._renew(
+                    keys=[self._lease_key(shard)],
+                    args=[self._replica_id, ttl_ms],
+                    client=pipe,
+                )
+            for shard in acquiring:
+                pipe.set(self._lease_key(shard), self._replica_id, nx=True, px=ttl_ms)
+            results = await pipe.execute()
+
+        renew_results = results[len(releasing) : len(releasing) + len(renewing)]
+        acquire_results = results[len(releasing) + len(renewing) :]
+        self._owned = {
+            shard for shard, renewed in zip(renewing, renew_results) if renewed
+        } | {shard for shard, acquired in zip(acquiring, acquire_results) if acquired}
+
+        self._lease_deadline = started + self._lease_ttl
+        logger.debug(
+            "Shard diperbarui",
+            extra={
+                "replica_id": self._replica_id,
+                "replicas": len(members),
+                "owned": len(self._owned),
+            },
+        )
+
+
+shard_coordinator = ShardCoordinator()
@@ -5,6 +5,7 @@ import pendulum
 from worker.clients.core_api import core_api_client
 from worker.config import get_settings
 from worker.price_feed import price_feed
+from worker.sharding import shard_coordinator
 from worker.utils.notifications import send_notification
 
 logger = logging.getLogger(__name__)
@@ -17,7 +18,12 @@ async def check_price_alerts() -> None:
         "/api/alerts/active",
         internal=True,
     )
-    alerts = alerts_response.get("data", [])
+    alerts = [
+        alert
+        for alert in alerts_response.get("data", [])
+        if shard_coordinator.owns(alert.get("user_id"))
+    ]
+    triggered: list[tuple[dict, float]] = []
     for alert in alerts:
         pair = alert.get("pair")
         current_price = await price_feed.get_price(pair)
@@ -25,19 +31,24 @@ async def check_price_alerts() -> None:
             continue
         target = float(alert.get("target_price"))
         direction = alert.get("direction")
-        triggered = False
         if direction == "up" and current_price >= target:
-            triggered = True
+            triggered.append((alert, current_price))
         elif direction == "down" and current_price <= target:
-            triggered = True
-        if not triggered:
-            continue
-        if not alert.get("repeat"):
-            await core_api_client.post(
-                f"/api/alerts/{alert['id']}/trigger",
-                {},
-                internal=True,
-            )
+            triggered.append((alert, current_price))
+    if not triggered:
+        return
+
+    one_shot_ids = [alert["id"] for alert, _ in triggered if not alert.get("repeat")]
+    if one_shot_ids:
+        await core_api_client.post(
+            "/api/alerts/trigger-batch",
+            {"alert_ids": one_shot_ids},
+            internal=True,
+        )
+    for alert, current_price in triggered:
+        pair = alert.get("pair")
+        target = float(alert.get("target_price"))
+        direction = alert.get("direction")
         logger.info(
             "Alert terpenuhi",
             extra={
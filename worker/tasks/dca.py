@@ -1,14 +1,18 @@
-import asyncio
 import logging
+import time
 from typing import Any
 
-import httpx
 import pendulum
 
 from worker.clients.core_api import core_api_client
 from worker.config import get_settings
+from worker.latency import stamp
+from worker.order_queue import OrderJob, order_queue
+from worker.sharding import shard_coordinator
+from worker.utils.circuit_breaker import CircuitOpenError, circuit_breakers
+from worker.utils.executions import ExecutionLogBatch
 from worker.utils.notifications import send_notification
-from worker.utils.safety import ensure_trading_active, trigger_deadman
+from worker.utils.safety import ensure_trading_active, safety_monitor
 
 logger = logging.getLogger(__name__)
 
@@ -59,67 +63,90 @@ async def run_dca_strategies() -> None:
         {"strategy_type": "dca"},
         internal=True,
     )
-    strategies = response.get("data", [])
-    for strategy in strategies:
-        try:
-            if not await _should_run(strategy, now):
-                continue
-            config = strategy.get("config_json", {})
-            amount_value = float(config.get("amount", 0) or 0)
-            if amount_value <= 0:
-                logger.warning("Konfigurasi DCA tidak memiliki nominal valid", extra={"strategy_id": strategy["id"]})
-                continue
-            payload = {
-                "telegram_id": strategy["telegram_id"],
-                "pair": config.get("pair", strategy.get("pair")),
-                "side": "buy",
-                "type": "market",
-                "amount": amount_value,
-                "is_strategy_order": True,
-                "strategy_id": strategy["id"],
-            }
-            order_response = await core_api_client.post(
-                "/api/orders", payload, internal=True
-            )
-            await core_api_client.post(
-                f"/api/strategies/{strategy['id']}/executions",
-                {
-                    "user_id": strategy["user_id"],
-                    "status": "success" if order_response.get("success") else "failed",
-                    "detail": {
-                        "order_response": order_response,
-                        "run_at": now.to_iso8601_string(),
-                    },
-                },
-                internal=True,
-            )
-            await send_notification(
-                strategy["telegram_id"],
-                (
-                    "Strategi DCA dieksekusi\n"
-                    f"Pair: {payload['pair']}\nNominal: {payload['amount']}\n"
-                    f"Waktu: {now.to_iso8601_string()}"
-                ),
-                event_type="strategy_dca_execution",
-            )
-            logger.info("DCA dijalankan", extra={"strategy_id": strategy["id"]})
-        except Exception as exc:  # noqa: BLE001
-            logger.exception("Gagal menjalankan strategi DCA", extra={"strategy_id": strategy.get("id")})
-            await core_api_client.post(
-                f"/api/strategies/{strategy['id']}/executions",
-                {
-                    "user_id": strategy["user_id"],
-                    "status": "failed",
-                    "detail": {"error": str(exc)},
-                },
-                internal=True,
-            )
-            await send_notification(
-                strategy["telegram_id"],
-                (
-                    "Strategi DCA gagal dieksekusi: {error}".format(error=str(exc))
-                ),
-                event_type="strategy_dca_failed",
-            )
-            if isinstance(exc, (httpx.HTTPError, asyncio.TimeoutError)):
-                await trigger_deadman("Kesalahan komunikasi dengan Indodax", "dca")
+    strategies = [
+        strategy
+        for strategy in response.get("data", [])
+        if shard_coordinator.owns(strategy.get("user_id"))
+        and safety_monitor.paused_for(
+            pair=strategy.get("pair"), user_id=strategy.get("user_id"), strategy_type="dca"
+        )
+        is None
+    ]
+    executions = ExecutionLogBatch(core_api_client)
+    try:
+        for strategy in strategies:
+            try:
+                if not await _should_run(strategy, now):
+                    continue
+                config = strategy.get("config_json", {})
+                amount_value = float(config.get("amount", 0) or 0)
+                if amount_value <= 0:
+                    logger.warning(
+                        "Konfigurasi DCA tidak memiliki nominal valid",
+                        extra={"strategy_id": strategy["id"]},
+                    )
+                    continue
+                pair = config.get("pair", strategy.get("pair"))
+                if not circuit_breakers.available("trade", pair):
+                    logger.info(
+                        "DCA ditunda, circuit terbuka",
+                        extra={"strategy_id": strategy["id"], "pair": pair},
+                    )
+                    continue
+                payload = {
+                    "telegram_id": strategy["telegram_id"],
+                    "pair": pair,
+                    "side": "buy",
+                    "type": "market",
+                    "amount": amount_value,
+                    "is_strategy_order": True,
+                    "strategy_id": strategy["id"],
+                    "timings": stamp(decided_at=time.time()),
+                }
+                interval = config.get("interval", "daily")
+                slot = now.format("YYYYMMDDHH") if interval == "hourly" else now.format("YYYYMMDD")
+                job = OrderJob.for_strategy(
+                    strategy,
+                    payload,
+                    key=f"dca:{strategy['id']}:{slot}",
+                    source="dca",
+                    detail={"run_at": now.to_iso8601_string()},
+                    event_type="strategy_dca",
+                    message=(
+                        "Strategi DCA dieksekusi\n"
+                        f"Pair: {payload['pair']}\nNominal: {payload['amount']}\n"
+                        f"Waktu: {now.to_iso8601_string()}"
+                    ),
+                    failure_message="Strategi DCA gagal dieksekusi",
+                )
+                queued = await order_queue.submit(
+                    job,
+                    client=core_api_client,
+                    executions=executions,
+                    notify=send_notification,
+                )
+                logger.info(
+                    "DCA diantrikan" if queued else "DCA dijalankan",
+                    extra={"strategy_id": strategy["id"]},
+                )
+            except CircuitOpenError as exc:
+                logger.info(
+                    "DCA ditunda, circuit terbuka",
+                    extra={"strategy_id": strategy["id"], "error": str(exc)},
+                )
+            except Exception as exc:  # noqa: BLE001
+                logger.exception(
+                    "Gagal menjalankan strategi DCA",
+                    extra={"strategy_id": strategy.get("id")},
+                )
+                executions.add(strategy, "failed", {"error": str(exc)})
+                await send_notification(
+                    strategy["telegram_id"],
+                    (
+                        "Strategi DCA gagal dieksekusi: {error}".format(error=str(exc))
+                    ),
+                    event_type="strategy_dca_failed",
+                )
+    finally:
+        # Tetap dikirim bila job dibatalkan deadline runner di tengah loop.
+        await executions.flush()
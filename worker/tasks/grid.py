@@ -1,18 +1,85 @@
-import asyncio
 import logging
+import time
 from typing import Any
 
-import httpx
 import pendulum
 
 from worker.clients.core_api import core_api_client
 from worker.config import get_settings
+from worker.grid_engine import GridState, grid_engine
+from worker.latency import stamp, tick_to_trade
+from worker.price_feed import price_feed
+from worker.sharding import shard_coordinator
+from worker.utils.circuit_breaker import CircuitOpenError, circuit_breakers
+from worker.utils.executions import ExecutionLogBatch
 from worker.utils.notifications import send_notification
-from worker.utils.safety import ensure_trading_active, trigger_deadman
+from worker.utils.safety import ensure_trading_active, safety_monitor
 
 logger = logging.getLogger(__name__)
 
 
+async def _place_level_order(
+    state: GridState, index: int, side: str, *, idempotency_key: str
+) -> None:
+    strategy = state.strategy
+    price = state.levels[index]
+    payload = {
+        "telegram_id": strategy["telegram_id"],
+        "pair": strategy["pair"],
+        "side": side,
+        "type": "limit",
+        "amount": state.order_size,
+        "price": price,
+        "is_strategy_order": True,
+        "strategy_id": strategy["id"],
+        "timings": stamp(decided_at=time.time()),
+    }
+    async with circuit_breakers.guard("trade", strategy["pair"]):
+        response = await core_api_client.post(
+            "/api/orders", payload, internal=True, idempotency_key=idempotency_key
+        )
+    order = (response or {}).get("data") or {"side": side, "price": price}
+    if order.get("timings"):
+        tick_to_trade.record("grid", order["timings"])
+    grid_engine.record_order(state, index, order)
+
+
+async def handle_grid_fills(fills: list[dict[str, Any]]) -> None:
+    for fill in fills:
+        counter = grid_engine.on_fill(fill)
+        if counter is None:
+            continue
+        state, index, side = counter
+        strategy = state.strategy
+        try:
+            await _place_level_order(
+                state,
+                index,
+                side,
+                idempotency_key=state.placement_key(index, side),
+            )
+            logger.info(
+                "grid.counter_order_placed",
+                extra={
+                    "strategy_id": strategy["id"],
+                    "filled_order_id": fill.get("order_id"),
+                    "side": side,
+                    "price": state.levels[index],
+                },
+            )
+        except CircuitOpenError as exc:
+            # Level yang kosong akan diisi ulang oleh rekonsiliasi grid berikutnya.
+            logger.info(
+                "Order balik grid ditunda, circuit terbuka",
+                extra={"strategy_id": strategy["id"], "error": str(exc)},
+            )
+        except Exception as exc:  # noqa: BLE001
+            logger.exception(
+                "Gagal menempatkan order balik grid",
+                extra={"strategy_id": strategy["id"], "error": str(exc)},
+            )
+
+
 async def run_grid_strategies() -> None:
     settings = get_settings()
     now = pendulum.now(settings.scheduler_timezone)
@@ -23,154 +90,121 @@ async def run_grid_strategies() -> None:
         {"strategy_type": "grid"},
         internal=True,
     )
-    strategies = response.get("data", [])
-    for strategy in strategies:
-        config: dict[str, Any] = strategy.get("config_json", {})
-        lower = float(config.get("lower_price", 0))
-        upper = float(config.get("upper_price", 0))
-        grid_count = int(config.get("grid_count", 0))
-        size = float(config.get("order_size", 0))
-        if not lower or not upper or grid_count <= 0:
-            continue
-        step = (upper - lower) / grid_count
-        price_levels = [lower + step * i for i in range(grid_count + 1)]
-        midpoint = (lower + upper) / 2
-        try:
-            open_orders_resp = await core_api_client.get(
-                "/api/orders/open",
-                {
-                    "telegram_id": strategy["telegram_id"],
-                    "pair": strategy["pair"],
-                    "strategy_id": strategy["id"],
-                },
-                internal=True,
-            )
-            open_orders = open_orders_resp.get("data", [])
-            tolerance = 1.0
-            target_levels = [
-                {
-                    "price": price,
-                    "side": "buy" if price <= midpoint else "sell",
-                }
-                for price in price_levels
-            ]
+    strategies = [
+        strategy
+        for strategy in response.get("data", [])
+        if shard_coordinator.owns(strategy.get("user_id"))
+    ]
+    grid_engine.prune({strategy["id"] for strategy in strategies})
+    # Strategi yang dijeda per scope tetap menyimpan state grid-nya.
+    strategies = [
+        strategy
+        for strategy in strategies
+        if safety_monitor.paused_for(
+            pair=strategy.get("pair"), user_id=strategy.get("user_id"), strategy_type="grid"
+        )
+        is None
+    ]
+    if not strategies:
+        return
+    open_orders_resp = await core_api_client.get(
+        "/api/orders/open/strategies",
+        {"strategy_type": "grid"},
+        internal=True,
+    )
+    open_orders_by_strategy: dict[str, list[dict[str, Any]]] = (
+        open_orders_resp.get("data") or {}
+    )
+    executions = ExecutionLogBatch(core_api_client)
+    try:
+        for strategy in strategies:
+            price = await price_feed.get_price(strategy["pair"])
+            state = grid_engine.sync_strategy(strategy, price)
+            if state is None:
+                continue
+            if not circuit_breakers.available("trade", strategy["pair"]):
+                logger.info("Grid ditunda, circuit terbuka", extra={"strategy_id": strategy["id"]})
+                continue
+            try:
+                open_orders = open_orders_by_strategy.get(str(strategy["id"]), [])
+                plan = grid_engine.reconcile(state, open_orders)
 
-            active_orders: list[dict[str, Any]] = []
-            stale_orders: list[dict[str, Any]] = []
-            for order in open_orders:
-                if not order.get("is_strategy_order") or order.get("strategy_id") != strategy["id"]:
-                    continue
-                order_price = order.get("price")
-                order_side = order.get("side")
-                if order_price is None or order_side not in {"buy", "sell"}:
-                    stale_orders.append(order)
-                    continue
-                price_value = float(order_price)
-                matched = next(
-                    (
-                        level
-                        for level in target_levels
-                        if level["side"] == order_side
-                        and abs(level["price"] - price_value) <= tolerance
-                    ),
-                    None,
-                )
-                if matched:
-                    active_orders.append(order)
-                else:
-                    stale_orders.append(order)
+                for order in plan.stale:
+                    order_id = order.get("id")
+                    if not order_id:
+                        continue
+                    try:
+                        async with circuit_breakers.guard("cancel", strategy["pair"]):
+                            await core_api_client.post(
+                                f"/api/orders/{order_id}/cancel",
+                                {"telegram_id": strategy["telegram_id"]},
+                                internal=True,
+                                idempotency_key=f"grid:cancel:{order_id}",
+                            )
+                        logger.info(
+                            "grid.cancelled_stale_order",
+                            extra={
+                                "strategy_id": strategy["id"],
+                                "order_id": order_id,
+                                "price": order.get("price"),
+                            },
+                        )
+                    except Exception as exc:  # noqa: BLE001
+                        logger.warning(
+                            "Gagal membatalkan order grid kadaluarsa",
+                            extra={
+                                "strategy_id": strategy.get("id"),
+                                "order_id": order_id,
+                                "error": str(exc),
+                            },
+                        )
 
-            for order in stale_orders:
-                order_id = order.get("id")
-                if not order_id:
-                    continue
-                try:
-                    await core_api_client.post(
-                        f"/api/orders/{order_id}/cancel",
-                        {"telegram_id": strategy["telegram_id"]},
-                        internal=True,
-                    )
-                    logger.info(
-                        "grid.cancelled_stale_order",
-                        extra={
-                            "strategy_id": strategy["id"],
-                            "order_id": order_id,
-                            "price": order.get("price"),
-                        },
-                    )
-                except Exception as exc:  # noqa: BLE001
-                    logger.warning(
-                        "Gagal membatalkan order grid kadaluarsa",
-                        extra={
-                            "strategy_id": strategy.get("id"),
-                            "order_id": order_id,
-                            "error": str(exc),
-                        },
+                for index, side in plan.missing:
+                    await _place_level_order(
+                        state,
+                        index,
+                        side,
+                        idempotency_key=state.placement_key(index, side),
                     )
 
-            effective_orders = list(active_orders)
-            for price in price_levels:
-                side = "buy" if price <= midpoint else "sell"
-                already_exists = any(
-                    order.get("side") == side
-                    and order.get("price") is not None
-                    and abs(float(order.get("price")) - price) <= tolerance
-                    for order in effective_orders
-                )
-                if already_exists:
+                if not plan.stale and not plan.missing:
                     continue
-                payload = {
-                    "telegram_id": strategy["telegram_id"],
-                    "pair": strategy["pair"],
-                    "side": side,
-                    "type": "limit",
-                    "amount": size,
-                    "price": price,
-                    "is_strategy_order": True,
-                    "strategy_id": strategy["id"],
-                }
-                await core_api_client.post(
-                    "/api/orders", payload, internal=True
-                )
-                effective_orders.append({"side": side, "price": price})
-
-            await core_api_client.post(
-                f"/api/strategies/{strategy['id']}/executions",
-                {
-                    "user_id": strategy["user_id"],
-                    "status": "success",
-                    "detail": {
-                        "grids": price_levels,
+                executions.add(
+                    strategy,
+                    "success",
+                    {
+                        "grids": state.levels,
                         "timestamp": now.to_iso8601_string(),
-                        "canceled_orders": [order.get("id") for order in stale_orders],
+                        "placed_levels": [state.levels[index] for index, _ in plan.missing],
+                        "canceled_orders": [order.get("id") for order in plan.stale],
                     },
-                },
-                internal=True,
-            )
-            await send_notification(
-                strategy["telegram_id"],
-                (
-                    "Strategi grid diperbarui\n"
-                    f"Pair: {strategy['pair']}\nLevel: {len(price_levels)}\n"
-                    f"Rentang: {lower:,.0f} - {upper:,.0f}"
-                ),
-                event_type="strategy_grid_execution",
-            )
-        except Exception as exc:  # noqa: BLE001
-            logger.exception("Gagal menjalankan grid", extra={"strategy_id": strategy.get("id")})
-            await core_api_client.post(
-                f"/api/strategies/{strategy['id']}/executions",
-                {
-                    "user_id": strategy["user_id"],
-                    "status": "failed",
-                    "detail": {"error": str(exc)},
-                },
-                internal=True,
-            )
-            await send_notification(
-                strategy["telegram_id"],
-                "Penempatan grid gagal: {error}".format(error=str(exc)),
-                event_type="strategy_grid_failed",
-            )
-            if isinstance(exc, (httpx.HTTPError, asyncio.TimeoutError)):
-                await trigger_deadman("Kesalahan komunikasi dengan Indodax", "grid")
+                )
+                lower, upper = state.levels[0], state.levels[-1]
+                await send_notification(
+                    strategy["telegram_id"],
+                    (
+                        "Strategi grid diperbarui\n"
+                        f"Pair: {strategy['pair']}\nLevel: {len(state.levels)}\n"
+                        f"Rentang: {lower:,.0f} - {upper:,.0f}"
+                    ),
+                    event_type="strategy_grid_execution",
+                )
+            except CircuitOpenError as exc:
+                logger.info(
+                    "Grid ditunda, circuit terbuka",
+                    extra={"strategy_id": strategy["id"], "error": str(exc)},
+                )
+            except Exception as exc:  # noqa: BLE001
+                logger.exception(
+                    "Gagal menjalankan grid",
+                    extra={"strategy_id": strategy.get("id")},
+                )
+                executions.add(strategy, "failed", {"error": str(exc)})
+                await send_notification(
+                    strategy["telegram_id"],
+                    "Penempatan grid gagal: {error}".format(error=str(exc)),
+                    event_type="strategy_grid_failed",
+                )
+    finally:
+        # Tetap dikirim bila job dibatalkan deadline runner di tengah loop.
+        await executions.flush()
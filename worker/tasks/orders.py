@@ -1,11 +1,10 @@
-import asyncio
-import asyncio
 import logging
 
-import httpx
-
 from worker.clients.core_api import core_api_client
-from worker.utils.safety import ensure_trading_active, trigger_deadman
+from worker.sharding import shard_coordinator
+from worker.tasks.grid import handle_grid_fills
+from worker.utils.circuit_breaker import CircuitOpenError, circuit_breakers
+from worker.utils.safety import ensure_trading_active
 
 logger = logging.getLogger(__name__)
 
@@ -13,18 +12,34 @@ logger = logging.getLogger(__name__)
 async def monitor_orders() -> None:
     if not await ensure_trading_active():
         return
+    shards = shard_coordinator.owned_shards()
+    if not shards:
+        return
     try:
-        response = await core_api_client.post(
-            "/api/orders/sync-status",
-            {"telegram_ids": None},
-            internal=True,
-        )
+        async with circuit_breakers.guard("sync_status"):
+            response = await core_api_client.post(
+                "/api/orders/sync-status",
+                {
+                    "telegram_ids": None,
+                    "shard_count": shard_coordinator.shard_count,
+                    "shards": shards,
+                },
+                internal=True,
+            )
+    except CircuitOpenError as exc:
+        logger.info("Sinkronisasi order ditunda, circuit terbuka", extra={"error": str(exc)})
+        return
     except Exception as exc:  # noqa: BLE001
         logger.exception("Gagal sinkronisasi status order", exc_info=exc)
-        if isinstance(exc, (httpx.HTTPError, asyncio.TimeoutError)):
-            await trigger_deadman("Sinkronisasi order gagal", "order-monitor")
         return
     data = response.get("data", {})
     updated = data.get("updated", 0)
     if updated:
         logger.info("Order status diperbarui", extra={"jumlah": updated})
+    grid_fills = [
+        detail
+        for detail in data.get("details", [])
+        if detail.get("status") == "filled" and detail.get("is_strategy_order")
+    ]
+    if grid_fills:
+        await handle_grid_fills(grid_fills)
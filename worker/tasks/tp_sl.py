@@ -1,15 +1,19 @@
-import asyncio
 import logging
+import time
 from typing import Any
 
-import httpx
 import pendulum
 
 from worker.clients.core_api import core_api_client
 from worker.config import get_settings
+from worker.latency import stamp
+from worker.order_queue import OrderJob, order_queue
 from worker.price_feed import price_feed
+from worker.sharding import shard_coordinator
+from worker.utils.circuit_breaker import CircuitOpenError, circuit_breakers
+from worker.utils.executions import ExecutionLogBatch
 from worker.utils.notifications import send_notification
-from worker.utils.safety import ensure_trading_active, trigger_deadman
+from worker.utils.safety import ensure_trading_active, safety_monitor
 
 logger = logging.getLogger(__name__)
 
@@ -24,30 +28,50 @@ async def monitor_tp_sl() -> None:
         {"strategy_type": "tp_sl"},
         internal=True,
     )
-    strategies = response.get("data", [])
-    for strategy in strategies:
-        config: dict[str, Any] = strategy.get("config_json", {})
-        pair = strategy.get("pair")
-        price = await price_feed.get_price(pair)
-        if price is None:
-            continue
-        entry_price = float(config.get("entry_price", price))
-        tp_pct = float(config.get("take_profit_pct", 0))
-        sl_pct = float(config.get("stop_loss_pct", 0))
-        take_profit_price = entry_price * (1 + tp_pct / 100)
-        stop_loss_price = entry_price * (1 - sl_pct / 100)
-        should_take_profit = tp_pct and price >= take_profit_price
-        should_stop_loss = sl_pct and price <= stop_loss_price
-        if not (should_take_profit or should_stop_loss):
-            continue
-        side = "sell"
-        amount = float(config.get("amount", 0.0) or 0)
-        if amount <= 0:
-            logger.warning("Strategi TP/SL tidak memiliki jumlah valid", extra={"strategy_id": strategy["id"]})
-            continue
-        try:
-            await core_api_client.post(
-                "/api/orders",
+    strategies = [
+        strategy
+        for strategy in response.get("data", [])
+        if shard_coordinator.owns(strategy.get("user_id"))
+        and safety_monitor.paused_for(
+            pair=strategy.get("pair"), user_id=strategy.get("user_id"), strategy_type="tp_sl"
+        )
+        is None
+    ]
+    executions = ExecutionLogBatch(core_api_client)
+    try:
+        for strategy in strategies:
+            config: dict[str, Any] = strategy.get("config_json", {})
+            pair = strategy.get("pair")
+            price = await price_feed.get_price(pair)
+            if price is None:
+                continue
+            tick_at = price_feed.received_at(pair)
+            entry_price = float(config.get("entry_price", price))
+            tp_pct = float(config.get("take_profit_pct", 0))
+            sl_pct = float(config.get("stop_loss_pct", 0))
+            take_profit_price = entry_price * (1 + tp_pct / 100)
+            stop_loss_price = entry_price * (1 - sl_pct / 100)
+            should_take_profit = tp_pct and price >= take_profit_price
+            should_stop_loss = sl_pct and price <= stop_loss_price
+            if not (should_take_profit or should_stop_loss):
+                continue
+            side = "sell"
+            amount = float(config.get("amount", 0.0) or 0)
+            if amount <= 0:
+                logger.warning(
+                    "Strategi TP/SL tidak memiliki jumlah valid",
+                    extra={"strategy_id": strategy["id"]},
+                )
+                continue
+            if not circuit_breakers.available("trade", pair):
+                logger.info(
+                    "TP/SL ditunda, circuit terbuka",
+                    extra={"strategy_id": strategy["id"], "pair": pair},
+                )
+                continue
+            action = "take_profit" if should_take_profit else "stop_loss"
+            job = OrderJob.for_strategy(
+                strategy,
                 {
                     "telegram_id": strategy["telegram_id"],
                     "pair": pair,
@@ -56,45 +80,43 @@ async def monitor_tp_sl() -> None:
                     "amount": amount,
                     "is_strategy_order": True,
                     "strategy_id": strategy["id"],
+                    "timings": stamp(tick_at=tick_at, decided_at=time.time()),
                 },
-                internal=True,
-            )
-            await core_api_client.post(
-                f"/api/strategies/{strategy['id']}/executions",
-                {
-                    "user_id": strategy["user_id"],
-                    "status": "success",
-                    "detail": {
-                        "price": price,
-                        "action": "take_profit" if should_take_profit else "stop_loss",
-                        "timestamp": now.to_iso8601_string(),
-                    },
+                key=f"tp_sl:{strategy['id']}:{action}:{now.format('YYYYMMDDHHmm')}",
+                source="tp_sl",
+                detail={
+                    "price": price,
+                    "action": action,
+                    "timestamp": now.to_iso8601_string(),
                 },
-                internal=True,
-            )
-            await send_notification(
-                strategy["telegram_id"],
-                (
+                event_type="strategy_tp_sl",
+                message=(
                     "TP/SL terpicu\n"
                     f"Pair: {pair}\nHarga: {price:,.0f}\nAksi: {'Take Profit' if should_take_profit else 'Stop Loss'}"
                 ),
-                event_type="strategy_tp_sl_execution",
-            )
-        except Exception as exc:  # noqa: BLE001
-            logger.exception("Gagal eksekusi TP/SL", extra={"strategy_id": strategy.get("id")})
-            await core_api_client.post(
-                f"/api/strategies/{strategy['id']}/executions",
-                {
-                    "user_id": strategy["user_id"],
-                    "status": "failed",
-                    "detail": {"error": str(exc)},
-                },
-                internal=True,
-            )
-            await send_notification(
-                strategy["telegram_id"],
-                f"Eksekusi TP/SL gagal: {exc}",
-                event_type="strategy_tp_sl_failed",
+                failure_message="Eksekusi TP/SL gagal",
+                exclusive=f"tp_sl:{strategy['id']}",
             )
-            if isinstance(exc, (httpx.HTTPError, asyncio.TimeoutError)):
-                await trigger_deadman("Kesalahan komunikasi dengan Indodax", "tp_sl")
+            try:
+                await order_queue.submit(
+                    job,
+                    client=core_api_client,
+                    executions=executions,
+                    notify=send_notification,
+                )
+            except CircuitOpenError as exc:
+                logger.info(
+                    "TP/SL ditunda, circuit terbuka",
+                    extra={"strategy_id": strategy["id"], "error": str(exc)},
+                )
+            except Exception as exc:  # noqa: BLE001
+                logger.exception("Gagal eksekusi TP/SL", extra={"strategy_id": strategy.get("id")})
+                executions.add(strategy, "failed", {"error": str(exc)})
+                await send_notification(
+                    strategy["telegram_id"],
+                    f"Eksekusi TP/SL gagal: {exc}",
+                    event_type="strategy_tp_sl_failed",
+                )
+    finally:
+        # Tetap dikirim bila job dibatalkan deadline runner di tengah loop.
+        await executions.flush()
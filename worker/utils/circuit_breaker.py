@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+import httpx
+
+from worker.config import get_settings
+from worker.metrics import CIRCUIT_STATE, CIRCUIT_TRANSITIONS
+
+logger = logging.getLogger(__name__)
+
+_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+class CircuitOpenError(RuntimeError):
+    def __init__(self, key: str, retry_after: float) -> None:
+        super().__init__(f"Circuit {key} terbuka, coba lagi dalam {retry_after:.0f} detik")
+        self.key = key
+        self.retry_after = retry_after
+
+
+def is_upstream_failure(exc: BaseException) -> bool:
+    """Gangguan upstream (timeout, koneksi, 5xx, 429); penolakan bisnis 4xx tidak dihitung."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return status >= 500 or status == 429
+    return isinstance(exc, (httpx.TransportError, asyncio.TimeoutError))
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        method: str,
+        pair: str,
+        *,
+        window_seconds: float,
+        min_requests: int,
+        failure_rate: float,
+        open_seconds: float,
+        half_open_probes: int,
+    ) -> None:
+        self.method = method
+        self.pair = pair
+        self.key = f"{method}:{pair}"
+        self.state = "closed"
+        self._window_seconds = window_seconds
+        self._min_requests = min_requests
+        self._failure_rate = failure_rate
+        self._open_seconds = open_seconds
+        self._half_open_probes = max(half_open_probes, 1)
+        self._results: deque[tuple[float, bool]] = deque()
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+
+    def _transition(self, state: str, now: float) -> None:
+        previous, self.state = self.state, state
+        if state == "open":
+            self._opened_at = now
+        if state in {"half_open", "closed"}:
+            self._probes = 0
+            self._probe_successes = 0
+        if state == "closed":
+            self._results.clear()
+        CIRCUIT_STATE.labels(self.method, self.pair).set(_STATE_VALUES[state])
+        CIRCUIT_TRANSITIONS.labels(self.method, state).inc()
+        log = logger.warning if state == "open" else logger.info
+        log("Circuit breaker berpindah status", extra={"circuit": self.key, "from": previous, "to": state})
+
+    def _poll(self, now: float) -> None:
+        if self.state == "open" and now - self._opened_at >= self._open_seconds:
+            self._transition("half_open", now)
+
+    def available(self) -> bool:
+        """Cek tanpa efek samping, untuk melewati strategi sebelum menyiapkan order."""
+        self._poll(time.monotonic())
+        if self.state == "closed":
+            return True
+        return self.state == "half_open" and self._probes < self._half_open_probes
+
+    def acquire(self) -> None:
+        now = time.monotonic()
+        if not self.available():
+            retry_after = max(self._opened_at + self._open_seconds - now, 1.0)
+            raise CircuitOpenError(self.key, retry_after)
+        if self.state == "half_open":
+            self._probes += 1
+
+    def release(self) -> None:
+        """Probe dibatalkan sebelum ada hasil; slot probe dikembalikan."""
+        if self.state == "half_open" and self._probes:
+            self._probes -= 1
+
+    def record(self, ok: bool) -> None:
+        now = time.monotonic()
+        if self.state == "half_open":
+            if not ok:
+                self._transition("open", now)
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= self._half_open_probes:
+                self._transition("closed", now)
+            return
+        if self.state == "open":
+            return
+        self._results.append((now, ok))
+        cutoff = now - self._window_seconds
+        while self._results and self._results[0][0] < cutoff:
+            self._results.popleft()
+        failures = sum(1 for _, success in self._results if not success)
+        if (
+            len(self._results) >= self._min_requests
+            and failures / len(self._results) >= self._failure_rate
+        ):
+            self._transition("open", now)
+
+    def snapshot(self) -> dict[str, Any]:
+        self._poll(time.monotonic())
+        failures = sum(1 for _, success in self._results if not success)
+        return {
+            "state": self.state,
+            "requests": len(self._results),
+            "failures": failures,
+            "open_for": round(time.monotonic() - self._opened_at, 1)
+            if self.state == "open"
+            else None,
+        }
+
+
+class CircuitBreakers:
+    """Breaker per method upstream dan pair; status disimpan per proses worker."""
+
+    def __init__(self) -> None:
+        settings = get_settings()
+        self._options = {
+            "window_seconds": settings.circuit_window_seconds,
+            "min_requests": settings.circuit_min_requests,
+            "failure_rate": settings.circuit_failure_rate,
+            "open_seconds": settings.circuit_open_seconds,
+            "half_open_probes": settings.circuit_half_open_probes,
+        }
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, method: str, pair: str | None = None) -> CircuitBreaker:
+        pair_key = (pair or "*").upper()
+        key = f"{method}:{pair_key}"
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = self._breakers[key] = CircuitBreaker(method, pair_key, **self._options)
+        return breaker
+
+    def available(self, method: str, pair: str | None = None) -> bool:
+        return self.get(method, pair).available()
+
+    @asynccontextmanager
+    async def guard(self, method: str, pair: str | None = None) -> AsyncIterator[CircuitBreaker]:
+        breaker = self.get(method, pair)
+        breaker.acquire()
+        try:
+            yield breaker
+        except Exception as exc:
+            breaker.record(not is_upstream_failure(exc))
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        breaker.record(True)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {key: breaker.snapshot() for key, breaker in list(self._breakers.items())}
+
+
+circuit_breakers = CircuitBreakers()
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from worker.clients.core_api import CoreAPIClient
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutionLogBatch:
+    def __init__(self, client: CoreAPIClient) -> None:
+        self._client = client
+        self._entries: list[dict[str, Any]] = []
+
+    def add(
+        self,
+        strategy: dict[str, Any],
+        status: str,
+        detail: dict[str, Any] | None = None,
+    ) -> None:
+        self._entries.append(
+            {
+                "strategy_id": strategy["id"],
+                "user_id": strategy["user_id"],
+                "status": status,
+                "detail": detail or {},
+            }
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def flush(self) -> None:
+        if not self._entries:
+            return
+        entries, self._entries = self._entries, []
+        try:
+            await self._client.post(
+                "/api/strategies/executions/batch",
+                {"executions": entries},
+                internal=True,
+            )
+        except Exception as exc:  # noqa: BLE001
+            logger.exception(
+                "Gagal menyimpan log eksekusi strategi",
+                extra={"jumlah": len(entries)},
+                exc_info=exc,
+            )
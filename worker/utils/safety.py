@@ -1,28 +1,162 @@
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
+import time
+from datetime import datetime
+from typing import Any
 
 from worker.clients.core_api import core_api_client
+from worker.clients.redis_client import redis_client
+from worker.config import get_settings
 
 logger = logging.getLogger(__name__)
 
 
+def _is_newer(candidate: str | None, current: str | None) -> bool:
+    if current is None:
+        return True
+    if candidate is None:
+        return False
+    return datetime.fromisoformat(candidate) > datetime.fromisoformat(current)
+
+
+class SafetyMonitor:
+    """Salinan status dead-man switch di memori, diperbarui lewat pub/sub core."""
+
+    channel = "safety:deadman:events"
+
+    def __init__(self) -> None:
+        self._refresh_seconds = get_settings().safety_refresh_seconds
+        self._status: dict[str, Any] | None = None
+        self._scopes: dict[str, dict[str, Any]] = {}
+        self._events: dict[str, tuple[float, str | None]] = {}
+        self._listening = False
+        self._tasks: list[asyncio.Task[None]] = []
+
+    @property
+    def status(self) -> dict[str, Any] | None:
+        # Tanpa listener, event pause bisa terlewat; pemanggil harus membaca ke core.
+        if not self._listening:
+            return None
+        return self._status
+
+    @property
+    def scopes(self) -> dict[str, dict[str, Any]]:
+        return self._scopes if self._listening else {}
+
+    def paused_for(
+        self,
+        *,
+        pair: str | None = None,
+        user_id: int | None = None,
+        strategy_type: str | None = None,
+    ) -> dict[str, Any] | None:
+        """Pause ber-scope yang mengenai strategi ini; tanpa listener core yang menegakkan."""
+        scopes = self.scopes
+        if not scopes:
+            return None
+        keys = []
+        if pair:
+            keys.append(f"pair:{pair.upper()}")
+        if user_id is not None:
+            keys.append(f"user:{user_id}")
+        if strategy_type:
+            keys.append(f"strategy_type:{strategy_type.lower()}")
+        return next((scopes[key] for key in keys if key in scopes), None)
+
+    def _apply(self, entry: dict[str, Any]) -> None:
+        key = entry.get("scope_key", "global")
+        self._events[key] = (time.monotonic(), entry.get("updated_at"))
+        if key == "global":
+            self._status = entry
+            if entry.get("paused"):
+                logger.warning("Dead-man switch aktif", extra={"reason": entry.get("reason")})
+        elif entry.get("paused"):
+            self._scopes[key] = entry
+            logger.warning("Trading dijeda untuk scope", extra={"scope": key, "reason": entry.get("reason")})
+        else:
+            self._scopes.pop(key, None)
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._listen()),
+            asyncio.create_task(self._refresh_loop()),
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._listening = False
+
+    async def _refresh(self) -> None:
+        started = time.monotonic()
+        status = dict(await get_safety_status())
+        scopes = status.pop("scopes", None) or []
+        snapshot = {entry["scope_key"]: entry for entry in scopes if entry.get("scope_key")}
+        snapshot["global"] = status
+        # Event pub/sub yang tiba selama GET berjalan lebih baru dari respons core.
+        current = {**self._scopes, "global": self._status}
+        for key, (applied_at, updated_at) in list(self._events.items()):
+            if applied_at < started:
+                del self._events[key]
+                continue
+            fresh = snapshot.get(key)
+            if fresh is not None and _is_newer(fresh.get("updated_at"), updated_at):
+                continue
+            if current.get(key) is not None:
+                snapshot[key] = current[key]
+            else:
+                snapshot.pop(key, None)
+        self._status = snapshot.pop("global", None) or status
+        self._scopes = snapshot
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._refresh_seconds)
+            try:
+                await self._refresh()
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Gagal membaca ulang status safety", extra={"error": str(exc)})
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                await self._refresh()
+                self._listening = True
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._apply(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Listener status safety terputus", extra={"error": str(exc)})
+            finally:
+                self._listening = False
+                await pubsub.aclose()
+            await asyncio.sleep(1)
+
+
+safety_monitor = SafetyMonitor()
+
+
 async def get_safety_status() -> dict:
     response = await core_api_client.get("/api/system/status")
     return response.get("data", {})
 
 
 async def ensure_trading_active() -> bool:
-    status = await get_safety_status()
+    status = safety_monitor.status
+    if status is None:
+        status = await get_safety_status()
     if status.get("paused"):
         logger.warning("Strategi dijeda oleh dead-man switch", extra={"reason": status.get("reason")})
         return False
     return True
-
-
-async def trigger_deadman(reason: str, source: str) -> None:
-    await core_api_client.post(
-        "/api/system/pause",
-        {"reason": reason, "source": source},
-        internal=True,
-    )